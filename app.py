@@ -1,11 +1,34 @@
 import os
 import re
 import json
+import hmac
+import base64
+import random
+import time
+import shutil
+import hashlib
+import itertools
+import zipfile
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import Counter, deque
 import docx
 import requests
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, g, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 
+from json_stream import ArrayObjectParser, RecordStream, iter_text
+from rule_extractor import extract_schemes_locally
+from compact_catalogue import CompactScheme, footprint, pool_sizes
+from request_profiler import ProfileRing, finish_capture, new_capture
+from budget_index import BUDGET_CSV, BudgetIndex, load_budget_lines, link_scheme
+from budget_anomalies import SWING_PCT, Z_THRESHOLD, AnomalyTable
+from scheme_search import SchemeSearchIndex, tokenize
+from ward_data import years_between
+from ward_export import COMPRESSIONS, DATASETS, FORMATS, export_stream
+
 # Optional PDF support
 try:
     from pypdf import PdfReader
@@ -13,18 +36,92 @@ try:
 except Exception:
     PDF_OK = False
 
+# Optional MessagePack responses for /check
+try:
+    import msgpack
+    MSGPACK_OK = True
+except Exception:
+    MSGPACK_OK = False
+
 app = Flask(__name__)
 CORS(app)
 
 # ================== CONFIG ==================
-API_URL = "http://134.199.198.69:8000/v1/chat/completions"
-API_TOKEN = "KIxzeM7xhvg9/8j9BY2g3TGgTukXCu8lRIEngdHTCB33i4g8I"  # Put your token locally
-MODEL_NAME = "openai/gpt-oss-120b"
+API_URL = os.environ.get("LLM_API_URL", "http://134.199.198.69:8000/v1/chat/completions")
+API_TOKEN = os.environ.get("LLM_API_TOKEN", "KIxzeM7xhvg9/8j9BY2g3TGgTukXCu8lRIEngdHTCB33i4g8I")  # Put your token locally
+MODEL_NAME = os.environ.get("LLM_MODEL", "openai/gpt-oss-120b")
 TIMEOUT = 80
+STREAM_LLM = True  # ask for SSE completions; non-streaming servers still work
+LOCAL_EXTRACTOR = True  # rule-based fast path before the LLM
+CHANGE_LOG_SIZE = 10000
+COLLISION_REPORT_MAX = 50  # repeated scheme names listed per load summary
+COMPACT_CATALOGUE = True  # store schemes as interned __slots__ records (see compact_catalogue.py)
+FOOTPRINT_SAMPLE = 200    # schemes measured per load for the bytes-per-scheme report
+
+# Streaming JSON / JSONL catalogue uploads
+STREAM_EXTS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+STREAM_MIMETYPES = {"application/json": "json", "application/x-ndjson": "jsonl", "application/jsonl": "jsonl",
+                    "application/x-jsonlines": "jsonl"}
+STREAM_CHUNK_BYTES = 256 * 1024
+STREAM_BATCH = 500                  # schemes upserted per catalogue-lock hold
+STREAM_MAX_OBJECT_CHARS = 1000000   # one scheme object / JSONL line
+
+# /check response modes
+CHECK_SECTIONS = ("eligible", "not_eligible", "questions")
+CHECK_FIELDS = ("scheme_id", "scheme_name", "benefits", "budget", "reasons")
+CHECK_DEFAULT_FIELDS = ("scheme_name", "benefits", "budget", "reasons")
+CHECK_MAX_LIMIT = 1000
+
+# Opt-in request profiling (see request_profiler.py)
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")  # callers sending X-Profile: <token> (or ?_profile=<token>) get profiled
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0") or 0)  # fraction of PROFILE_ROUTES requests
+PROFILE_ROUTES = {"/check", "/load_schemes", "/load_schemes_bulk"}
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_RING_SIZE = 200
+PROFILE_INTERVAL = 0.005  # stack sampler period (seconds)
+PROFILE_WATCH = (
+    "app.py:evaluate_scheme_with_reasons", "app.py:evaluate_criterion", "app.py:evaluate",
+    "app.py:build_missing_questions", "app.py:stream_schemes_with_gpt", "app.py:iter_extracted_schemes",
+    "rule_extractor.py:extract_schemes_locally", "app.py:apply_catalogue", "app.py:iter_apply_catalogue",
+    "app.py:normalize_schemes",
+)
+
+# Bulk ingestion
+BULK_WORKERS = max(1, (os.cpu_count() or 2) - 1)   # document readers (processes)
+BULK_LLM_WORKERS = 4                               # concurrent extraction calls
+BULK_MAX_FILES = 1000          # accepted documents per request
+BULK_MAX_SKIPPED_LISTED = 200  # skipped files listed individually; the rest are only counted
+BULK_MAX_FILE_BYTES = 50 * 1024 * 1024
+BULK_EXTS = {".docx", ".pdf", ".txt", ".json"}
+BULK_DIR_ROOT = os.environ.get("BULK_DIR_ROOT", "")  # server-side directories allowed under this root only
 # ===========================================
 
-schemes_db = []
+schemes_db = {}  # scheme_id -> normalized scheme (CompactScheme or dict), insertion ordered
+catalogue_footprint = {}
 all_criteria_keys = set()
+criteria_key_counts = Counter()
+budget_links = {}  # scheme_id -> budget head + allocation trend
+search_index = SchemeSearchIndex()
+_budget_index = None
+_budget_anomalies = None
+_budget_anomalies_mtime = None
+budget_anomalies_lock = threading.Lock()
+
+extraction_totals = Counter()  # running local-vs-LLM extraction stats, see /health
+extraction_lock = threading.Lock()
+_profile_ring = None
+catalogue_lock = threading.Lock()
+catalogue_version = 0
+change_log = deque(maxlen=CHANGE_LOG_SIZE)
+
+# Shared predicate table: every distinct (key, value) condition in the catalogue
+# is stored once, and each scheme points at a shared signature (tuple of predicates).
+predicate_ids = {}          # frozen (key, value) -> predicate id
+predicate_refs = Counter()  # predicate id -> number of signatures using it
+signature_ids = {}          # tuple of predicate ids -> signature
+signature_refs = Counter()
+scheme_signature = {}       # scheme_id -> signature: ((pid, key, value), ...)
+_predicate_seq = itertools.count()
 
 
 # -----------------------
@@ -71,7 +168,11 @@ def read_any_file(file_path: str, filename: str) -> tuple[str, str]:
 # -----------------------
 # GPT Extraction
 # -----------------------
-def extract_schemes_with_gpt(text: str):
+def stream_schemes_with_gpt(text: str, stats: dict = None):
+    """
+    Yields each scheme object as soon as it closes in the streamed completion.
+    A failed call is logged and, when `stats` is given, recorded as llm_error.
+    """
     system_prompt = (
         "You are an expert on Indian government schemes. "
         "Extract scheme information into strict JSON."
@@ -104,7 +205,8 @@ Text:
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
-        "temperature": 0.2
+        "temperature": 0.2,
+        "stream": STREAM_LLM
     }
 
     headers = {
@@ -113,24 +215,81 @@ Text:
     }
 
     try:
-        r = requests.post(API_URL, headers=headers, json=payload, timeout=TIMEOUT)
-        r.raise_for_status()
-        result = r.json()
-        content = result["choices"][0]["message"]["content"]
-
-        # Strip markdown fences if any
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-
-        parsed = json.loads(content.strip())
-        return parsed if isinstance(parsed, list) else []
+        with requests.post(API_URL, headers=headers, json=payload, timeout=TIMEOUT, stream=True) as r:
+            r.raise_for_status()
+            parser = ArrayObjectParser()
+            for piece in _iter_completion_text(r):
+                yield from parser.feed(piece)
+            parser.close()
+            if parser.errors:
+                print(f"GPT extraction: skipped {parser.errors} malformed scheme object(s)")
     except Exception as e:
         print("GPT extraction error:", e)
-        return []
+        if stats is not None:
+            stats["llm_error"] = str(e)
+
+def _iter_completion_text(r):
+    """Content deltas from an SSE completion stream, or the whole message if the server didn't stream."""
+    if "text/event-stream" not in (r.headers.get("Content-Type") or ""):
+        yield r.json()["choices"][0]["message"]["content"]
+        return
+    r.encoding = "utf-8"
+    for line in r.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            delta = json.loads(data)["choices"][0].get("delta") or {}
+        except (ValueError, KeyError, IndexError):
+            continue
+        if delta.get("content"):
+            yield delta["content"]
+
+def extract_schemes_with_gpt(text: str):
+    """Whole-list form of stream_schemes_with_gpt; a bad object no longer loses the rest."""
+    return list(stream_schemes_with_gpt(text))
+
+
+def iter_extracted_schemes(text: str, stats: dict):
+    """
+    Rule-based extraction first; only the sections it cannot fully explain
+    are sent to the LLM. Yields raw schemes as they become available and
+    fills stats in place once the LLM stream ends.
+    """
+    if not LOCAL_EXTRACTOR:
+        local, unresolved, st = [], text, {"criteria_local": 0, "llm_chars_sent": len(text), "llm_chars_avoided": 0}
+    else:
+        local, unresolved, st = extract_schemes_locally(text)
+    stats.update(st)
+    yield from local
+
+    t0 = time.perf_counter()
+    criteria_llm = 0
+    if unresolved.strip():
+        for raw in stream_schemes_with_gpt(unresolved, stats):
+            crit = raw.get("criteria")
+            criteria_llm += len(crit) if isinstance(crit, dict) else 0
+            yield raw
+    stats["llm_calls"] = 1 if unresolved.strip() else 0
+    stats["llm_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    stats["criteria_llm"] = criteria_llm
+    total = stats["criteria_local"] + stats["criteria_llm"]
+    stats["local_share"] = round(stats["criteria_local"] / total, 3) if total else 0.0
+
+    with extraction_lock:  # bulk ingestion extracts from several threads
+        for k in ("criteria_local", "criteria_llm", "llm_calls", "llm_chars_sent", "llm_chars_avoided"):
+            extraction_totals[k] += stats.get(k, 0)
+        extraction_totals["documents"] += 1
+        if "llm_error" in stats:
+            extraction_totals["llm_errors"] += 1
+
+def extract_schemes(text: str):
+    """Returns (raw schemes, stats); see iter_extracted_schemes."""
+    stats = {}
+    schemes = list(iter_extracted_schemes(text, stats))
+    return schemes, stats
 
 
 # -----------------------
@@ -213,7 +372,9 @@ def normalize_criteria(criteria: dict) -> dict:
         key_l = k.strip().lower()
         canon = _CANON_MAP.get(key_l, key_l)
 
-        v = _to_bool(v)
+        # numbers are limits (age_min: 18), not flags, unless the key is a *_required flag
+        if canon.endswith("_required") or not isinstance(v, (int, float)):
+            v = _to_bool(v)
         v = _to_list(v)
         v = _maybe_number(v)
 
@@ -223,7 +384,24 @@ def normalize_criteria(criteria: dict) -> dict:
         out[canon] = v
     return out
 
-def normalize_schemes(schemes: list) -> list:
+def scheme_id_for(name: str, content: str = "") -> str:
+    """Stable ID from the scheme name (case/whitespace-insensitive), plus content to tell same-named schemes apart."""
+    key = " ".join(str(name).lower().split())
+    if content:
+        key += "\x00" + content
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def normalize_schemes(schemes: list, batch: dict = None) -> list:
+    """
+    `batch` is shared by every call for one upload. The first scheme with a
+    name gets the plain name ID; later ones with the same name get an ID from
+    name + criteria + benefits (plus an ordinal for exact repeats) instead of
+    overwriting it, and are listed in batch["collisions"]. A repeated explicit
+    scheme_id is kept apart the same way and listed in batch["duplicate_ids"];
+    JSON uploads refuse it (see iter_ingest).
+    """
+    batch = {} if batch is None else batch
+    ids = batch.setdefault("ids", set())
     cleaned = []
     for s in schemes or []:
         if not isinstance(s, dict):
@@ -231,9 +409,340 @@ def normalize_schemes(schemes: list) -> list:
         name = str(s.get("scheme_name", "")).strip() or "Unknown Scheme"
         benefits = str(s.get("benefits", "")).strip()
         criteria = normalize_criteria(s.get("criteria", {}) or {})
-        cleaned.append({"scheme_name": name, "criteria": criteria, "benefits": benefits})
+        explicit = str(s.get("scheme_id") or s.get("id") or "").strip()
+        sid = explicit or scheme_id_for(name)
+        if sid in ids:
+            content = json.dumps([criteria, benefits], sort_keys=True, default=str)
+            base = sid
+            sid = scheme_id_for(explicit or name, content)
+            n = 1
+            while sid in ids:
+                n += 1
+                sid = scheme_id_for(explicit or name, f"{content}\x00{n}")
+            if explicit:
+                batch.setdefault("duplicate_ids", []).append(base)
+            else:
+                batch.setdefault("collisions", []).append({"scheme_name": name, "scheme_id": sid})
+        ids.add(sid)
+        cleaned.append({"scheme_id": sid, "scheme_name": name, "criteria": criteria, "benefits": benefits})
     return cleaned
 
+def collision_summary(batch: dict) -> dict:
+    """Load-summary block for names repeated within one upload."""
+    collisions = batch.get("collisions") or []
+    return {"count": len(collisions), "schemes": collisions[:COLLISION_REPORT_MAX]}
+
+
+# -----------------------
+# Catalogue (incremental add / update / delete)
+# -----------------------
+def _index_scheme(sid: str, scheme: dict):
+    keys = (scheme.get("criteria") or {}).keys()
+    criteria_key_counts.update(keys)
+    all_criteria_keys.update(keys)
+    scheme_signature[sid] = _acquire_signature(scheme.get("criteria") or {})
+    search_index.add(sid, scheme)
+    link = link_scheme(get_budget_index(), scheme.get("scheme_name", ""))
+    if link is not None:
+        budget_links[sid] = link
+
+def _unindex_scheme(sid: str, scheme: dict):
+    for k in (scheme.get("criteria") or {}).keys():
+        criteria_key_counts[k] -= 1
+        if criteria_key_counts[k] <= 0:
+            del criteria_key_counts[k]
+            all_criteria_keys.discard(k)
+    sig = scheme_signature.pop(sid, None)
+    if sig is not None:
+        _release_signature(sig)
+    search_index.remove(sid)
+    budget_links.pop(sid, None)
+
+def _record_change(op: str, sid: str, name: str):
+    global catalogue_version
+    catalogue_version += 1
+    change_log.append({"version": catalogue_version, "op": op, "scheme_id": sid, "scheme_name": name})
+
+def upsert_scheme(scheme: dict):
+    """Returns "add" / "update", or None if an identical scheme is already loaded."""
+    sid = scheme["scheme_id"]
+    if COMPACT_CATALOGUE:
+        scheme = CompactScheme.from_dict(scheme)
+    old = schemes_db.get(sid)
+    if old == scheme:
+        _release_record(scheme)
+        return None
+    if old is not None:
+        _unindex_scheme(sid, old)
+        _release_record(old)
+    schemes_db[sid] = scheme
+    _index_scheme(sid, scheme)
+    op = "update" if old is not None else "add"
+    _record_change(op, sid, scheme["scheme_name"])
+    return op
+
+def delete_scheme(sid: str) -> bool:
+    old = schemes_db.pop(sid, None)
+    if old is None:
+        return False
+    _unindex_scheme(sid, old)
+    _release_record(old)
+    _record_change("delete", sid, old["scheme_name"])
+    return True
+
+def _release_record(scheme):
+    if isinstance(scheme, CompactScheme):
+        scheme.release()
+
+def resolve_scheme_refs(refs) -> list:
+    """
+    Delete references are scheme_ids or scheme names. A name matches every
+    loaded scheme with that name (case/whitespace-insensitive), including
+    same-named schemes that were given content-hash IDs. Call under
+    catalogue_lock.
+    """
+    out, names = [], set()
+    for ref in refs:
+        ref = str(ref).strip()
+        if ref in schemes_db:
+            out.append(ref)
+        elif ref:
+            names.add(" ".join(ref.lower().split()))
+    if names:
+        out += [sid for sid, s in schemes_db.items() if " ".join(s["scheme_name"].lower().split()) in names]
+    return out
+
+def apply_catalogue(incoming: list, mode: str = "replace", delete_refs: list = ()) -> dict:
+    """
+    replace: incoming becomes the whole catalogue (schemes not in it are deleted).
+    merge:   incoming is upserted; only delete_refs are removed.
+    Either way only changed schemes touch the derived structures.
+    """
+    global catalogue_footprint
+    summary = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    if incoming and COMPACT_CATALOGUE:
+        catalogue_footprint = footprint(incoming[:FOOTPRINT_SAMPLE])
+    with catalogue_lock:
+        if mode == "replace":
+            keep = {s["scheme_id"] for s in incoming}
+            delete_ids = [sid for sid in schemes_db if sid not in keep]
+        else:
+            delete_ids = resolve_scheme_refs(delete_refs)
+        for sid in delete_ids:
+            if delete_scheme(sid):
+                summary["deleted"] += 1
+        for s in incoming:
+            op = upsert_scheme(s)
+            if op == "add":
+                summary["added"] += 1
+            elif op == "update":
+                summary["updated"] += 1
+            else:
+                summary["unchanged"] += 1
+    return summary
+
+
+def iter_apply_catalogue(schemes, mode: str = "replace", delete_refs: list = ()):
+    """
+    Batched form of apply_catalogue. Upserts in batches of STREAM_BATCH (each
+    under the catalogue lock) and yields the running summary after every
+    batch; the last summary yielded is final.
+    """
+    summary = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    seen = set()
+    batch = []
+    first = True
+
+    def flush():
+        global catalogue_footprint
+        nonlocal first
+        if COMPACT_CATALOGUE and first:
+            catalogue_footprint = footprint(batch[:FOOTPRINT_SAMPLE])
+        first = False
+        with catalogue_lock:
+            for s in batch:
+                op = upsert_scheme(s)
+                summary["added" if op == "add" else "updated" if op == "update" else "unchanged"] += 1
+        batch.clear()
+
+    if mode != "replace" and delete_refs:
+        with catalogue_lock:
+            for sid in resolve_scheme_refs(delete_refs):
+                if delete_scheme(sid):
+                    summary["deleted"] += 1
+
+    for s in schemes:
+        batch.append(s)
+        seen.add(s["scheme_id"])
+        if len(batch) >= STREAM_BATCH:
+            flush()
+            yield summary
+    if batch:
+        flush()
+
+    if mode == "replace":
+        with catalogue_lock:
+            for sid in [sid for sid in schemes_db if sid not in seen]:
+                if delete_scheme(sid):
+                    summary["deleted"] += 1
+    yield summary
+
+
+# -----------------------
+# Streaming JSON / JSONL ingestion
+# -----------------------
+def _count_chars(chunks, stats: dict):
+    for chunk in chunks:
+        stats["bytes"] += len(chunk)
+        yield chunk
+
+def _stream_size(stream):
+    try:
+        pos = stream.tell()
+        size = stream.seek(0, os.SEEK_END)
+        stream.seek(pos)
+        return size - pos
+    except Exception:
+        return None
+
+def iter_ingest(records: RecordStream, ingest: dict, mode: str, delete_refs: list, batch: dict):
+    """
+    Parses and normalizes every scheme from a RecordStream, then applies them.
+    Yields (changes, ingest) after each parsed and each applied batch; the
+    last pair is final. Normalized schemes are spooled to a temporary file
+    until the input has been read to its end (only their ids stay in
+    memory), so a malformed or non-object element, a truncated upload or
+    text after the array raises ValueError with the catalogue untouched.
+    """
+    t0 = time.perf_counter()
+    changes = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    def progress(stage: str):
+        elapsed = time.perf_counter() - t0
+        total = ingest.get("total_bytes")
+        ingest.update({
+            "stage": stage,
+            "format": records.format,
+            "objects": records.count,
+            "errors": records.errors,
+            "truncated": records.truncated,
+            "pct": round(min(100.0, ingest["bytes"] * 100 / total), 1) if total else None,
+            "elapsed_sec": round(elapsed, 3),
+            "schemes_per_sec": round(records.count / elapsed) if elapsed else 0,
+        })
+        return ingest
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for raw in records:
+            for s in normalize_schemes([raw], batch):
+                spool.write(json.dumps(s, ensure_ascii=False) + "\n")
+            if records.count % STREAM_BATCH == 0:
+                yield changes, progress("parsing")
+        progress("parsing")
+        if records.truncated:
+            raise ValueError("the upload ended before the JSON was complete; nothing was applied")
+        if records.errors:
+            raise ValueError(f"{records.errors} array element(s) were not valid scheme objects; nothing was applied")
+        if records.trailing:
+            raise ValueError("unexpected text after the JSON array; nothing was applied")
+        if batch.get("duplicate_ids"):
+            dups = batch["duplicate_ids"]
+            raise ValueError(f"{len(dups)} repeated scheme_id(s), e.g. {dups[0]!r}; nothing was applied")
+
+        spool.seek(0)
+        staged = (json.loads(line) for line in spool)
+        for changes in iter_apply_catalogue(staged, mode, delete_refs):
+            yield changes, progress("applying")
+
+
+# -----------------------
+# Shared predicate table
+# -----------------------
+def _freeze(value):
+    """Hashable identity for a criterion value. Types are kept so 1, 1.0 and True stay distinct."""
+    if isinstance(value, (list, tuple)):
+        return ("list", tuple((type(x).__name__, _freeze(x)) for x in value))
+    try:
+        hash(value)
+        return (type(value).__name__, value)
+    except TypeError:
+        return ("json", json.dumps(value, sort_keys=True, default=str))
+
+def _acquire_signature(criteria) -> tuple:
+    preds = []
+    pids = []
+    for key, value in criteria.items():
+        fk = (key, _freeze(value))
+        pid = predicate_ids.get(fk)
+        if pid is None:
+            pid = predicate_ids[fk] = next(_predicate_seq)
+        pids.append(pid)
+        preds.append((pid, key, value))
+    pids = tuple(pids)
+    sig = signature_ids.get(pids)
+    if sig is None:
+        sig = signature_ids[pids] = tuple(preds)
+        predicate_refs.update(pids)
+    signature_refs[pids] += 1
+    return sig
+
+def _release_signature(sig: tuple):
+    pids = tuple(p[0] for p in sig)
+    signature_refs[pids] -= 1
+    if signature_refs[pids] > 0:
+        return
+    del signature_refs[pids]
+    del signature_ids[pids]
+    for pid, key, value in sig:
+        predicate_refs[pid] -= 1
+        if predicate_refs[pid] <= 0:
+            del predicate_refs[pid]
+            predicate_ids.pop((key, _freeze(value)), None)
+
+def predicate_stats() -> dict:
+    return {
+        "predicates": len(predicate_refs),
+        "signatures": len(signature_refs),
+        "criteria_entries": sum(len(pids) * n for pids, n in signature_refs.items()),
+    }
+
+
+# -----------------------
+# Budget linkage (karnataka_budget.csv)
+# -----------------------
+def get_budget_index() -> BudgetIndex:
+    global _budget_index
+    if _budget_index is None:
+        try:
+            _budget_index = BudgetIndex(load_budget_lines())
+        except Exception as e:
+            print("Budget CSV load error:", e)
+            _budget_index = BudgetIndex([])
+    return _budget_index
+
+def get_budget_anomalies() -> AnomalyTable:
+    """
+    Precomputed anomaly table, refreshed when the CSV changes on disk. Newly
+    appended fiscal-year columns are added to the existing table; any other
+    edit rebuilds it.
+    """
+    global _budget_anomalies, _budget_anomalies_mtime
+    try:
+        mtime = os.path.getmtime(BUDGET_CSV)
+    except OSError:
+        mtime = None
+    with budget_anomalies_lock:
+        if _budget_anomalies is None or mtime != _budget_anomalies_mtime:
+            try:
+                lines = load_budget_lines(BUDGET_CSV)
+            except Exception as e:
+                print("Budget CSV load error:", e)
+                lines = []
+            if _budget_anomalies is None or not _budget_anomalies.extend(lines):
+                _budget_anomalies = AnomalyTable(lines)
+            _budget_anomalies_mtime = mtime
+    return _budget_anomalies
+
 
 # -----------------------
 # Pretty labels for reasons
@@ -281,57 +790,59 @@ def _required_reason(field, required_bool, actual_bool):
     f = pretty_field(field)
     return f"{f} must be {bool_to_yesno(required_bool)} (you entered {bool_to_yesno(actual_bool)})."
 
-def evaluate_scheme_with_reasons(user: dict, criteria: dict):
+def evaluate_criterion(user: dict, key: str, required_value):
     """
-    Returns:
-      status: "eligible" | "needs_info" | "not_eligible"
-      missing: list[str] (base keys)
-      reasons: list[str] (for not_eligible)
+    One condition against the user profile.
+    Returns (missing base key or None, fail reason or None).
     """
-    missing = []
-    reasons = []
-
-    for key, required_value in (criteria or {}).items():
-        base_key = _base_key_for_criterion_key(key)
+    base_key = _base_key_for_criterion_key(key)
 
-        if base_key not in user or user[base_key] is None or user[base_key] == "":
-            if base_key not in missing:
-                missing.append(base_key)
-            continue
+    if base_key not in user or user[base_key] is None or user[base_key] == "":
+        return (base_key, None)
 
-        user_value = user[base_key]
+    user_value = user[base_key]
 
-        # numeric rule
-        if isinstance(required_value, (int, float)):
-            try:
-                uv = float(user_value)
-                rv = float(required_value)
-            except Exception:
-                reasons.append(f"{pretty_field(base_key)} has an invalid value (you entered {user_value}).")
-                continue
-
-            if key.endswith("_min") and uv < rv:
-                reasons.append(_compare_reason(base_key, "≥", required_value, user_value))
-            elif key.endswith("_max") and uv > rv:
-                reasons.append(_compare_reason(base_key, "≤", required_value, user_value))
-            elif (not key.endswith("_min") and not key.endswith("_max")) and uv != rv:
-                reasons.append(_compare_reason(base_key, "=", required_value, user_value))
-
-        # boolean rule
-        elif isinstance(required_value, bool):
-            if bool(user_value) != required_value:
-                reasons.append(_required_reason(base_key, required_value, bool(user_value)))
-
-        # allowed list
-        elif isinstance(required_value, list):
-            allowed = [str(x).strip().lower() for x in required_value]
-            if str(user_value).strip().lower() not in allowed:
-                reasons.append(_allowed_reason(base_key, required_value, user_value))
-
-        # string match
-        elif isinstance(required_value, str):
-            if str(user_value).strip().lower() != required_value.strip().lower():
-                reasons.append(_allowed_reason(base_key, [required_value], user_value))
+    # numeric rule
+    if isinstance(required_value, (int, float)):
+        try:
+            uv = float(user_value)
+            rv = float(required_value)
+        except Exception:
+            return (None, f"{pretty_field(base_key)} has an invalid value (you entered {user_value}).")
+
+        if key.endswith("_min") and uv < rv:
+            return (None, _compare_reason(base_key, "≥", required_value, user_value))
+        if key.endswith("_max") and uv > rv:
+            return (None, _compare_reason(base_key, "≤", required_value, user_value))
+        if (not key.endswith("_min") and not key.endswith("_max")) and uv != rv:
+            return (None, _compare_reason(base_key, "=", required_value, user_value))
+
+    # boolean rule
+    elif isinstance(required_value, bool):
+        if bool(user_value) != required_value:
+            return (None, _required_reason(base_key, required_value, bool(user_value)))
+
+    # allowed list
+    elif isinstance(required_value, (list, tuple)):
+        allowed = [str(x).strip().lower() for x in required_value]
+        if str(user_value).strip().lower() not in allowed:
+            return (None, _allowed_reason(base_key, required_value, user_value))
+
+    # string match
+    elif isinstance(required_value, str):
+        if str(user_value).strip().lower() != required_value.strip().lower():
+            return (None, _allowed_reason(base_key, [required_value], user_value))
+
+    return (None, None)
+
+def _combine_outcomes(outcomes):
+    missing = []
+    reasons = []
+    for miss, reason in outcomes:
+        if reason is not None:
+            reasons.append(reason)
+        elif miss is not None and miss not in missing:
+            missing.append(miss)
 
     if reasons:
         return ("not_eligible", missing, reasons)
@@ -341,6 +852,44 @@ def evaluate_scheme_with_reasons(user: dict, criteria: dict):
 
     return ("eligible", [], [])
 
+def evaluate_scheme_with_reasons(user: dict, criteria: dict):
+    """
+    Returns:
+      status: "eligible" | "needs_info" | "not_eligible"
+      missing: list[str] (base keys)
+      reasons: list[str] (for not_eligible)
+    """
+    return _combine_outcomes(evaluate_criterion(user, k, v) for k, v in (criteria or {}).items())
+
+class PredicateEvaluator:
+    """
+    Per-request view over the shared predicate table. Each distinct predicate
+    is evaluated at most once, and each distinct signature is resolved at most
+    once; schemes sharing a signature reuse the same (status, missing, reasons).
+    """
+
+    def __init__(self, user: dict):
+        self.user = user
+        self.outcomes = {}  # predicate id -> (missing, reason)
+        self.resolved = {}  # id(signature) -> (status, missing, reasons)
+
+    def _outcome(self, pred):
+        pid, key, value = pred
+        out = self.outcomes.get(pid)
+        if out is None:
+            out = self.outcomes[pid] = evaluate_criterion(self.user, key, value)
+        return out
+
+    def evaluate(self, sig: tuple):
+        res = self.resolved.get(id(sig))
+        if res is None:
+            res = self.resolved[id(sig)] = _combine_outcomes(self._outcome(p) for p in sig)
+        return res
+
+    def reason_codes(self, sig: tuple) -> list:
+        """Failed criterion keys of an evaluated signature, e.g. ["age_min", "bpl_required"]."""
+        return [key for pid, key, _value in sig if self.outcomes[pid][1] is not None]
+
 
 # -----------------------
 # Basic form fields (as you requested)
@@ -433,7 +982,7 @@ def pretty_label(key: str) -> str:
     return key.replace("_", " ").strip().title()
 
 def merge_question_constraints(acc: dict, criterion_key: str, criterion_value):
-    if isinstance(criterion_value, list):
+    if isinstance(criterion_value, (list, tuple)):
         acc["input_type"] = "select"
         acc.setdefault("options", set())
         for o in criterion_value:
@@ -485,19 +1034,19 @@ def build_missing_questions(possible_schemes: list, missing_fields: list):
                 merge_question_constraints(agg, ck, cv)
 
             # Special linking: basic fields may be constrained via *_allowed keys
-            if field == "gender" and "gender_allowed" in criteria and isinstance(criteria["gender_allowed"], list):
+            if field == "gender" and "gender_allowed" in criteria and isinstance(criteria["gender_allowed"], (list, tuple)):
                 agg["input_type"] = "select"
                 agg.setdefault("options", set())
                 for o in criteria["gender_allowed"]:
                     agg["options"].add(str(o).strip())
 
-            if field == "category" and "category_allowed" in criteria and isinstance(criteria["category_allowed"], list):
+            if field == "category" and "category_allowed" in criteria and isinstance(criteria["category_allowed"], (list, tuple)):
                 agg["input_type"] = "select"
                 agg.setdefault("options", set())
                 for o in criteria["category_allowed"]:
                     agg["options"].add(str(o).strip())
 
-            if field == "residence_type" and "residence_type_allowed" in criteria and isinstance(criteria["residence_type_allowed"], list):
+            if field == "residence_type" and "residence_type_allowed" in criteria and isinstance(criteria["residence_type_allowed"], (list, tuple)):
                 agg["input_type"] = "select"
                 agg.setdefault("options", set())
                 for o in criteria["residence_type_allowed"]:
@@ -544,6 +1093,209 @@ def build_missing_questions(possible_schemes: list, missing_fields: list):
     return questions
 
 
+# -----------------------
+# Bulk ingestion (ZIP / server-side directory)
+# -----------------------
+_bulk_pool = None
+_bulk_pool_lock = threading.Lock()
+
+def get_bulk_pool() -> ProcessPoolExecutor:
+    global _bulk_pool
+    with _bulk_pool_lock:
+        if _bulk_pool is None:
+            _bulk_pool = ProcessPoolExecutor(max_workers=BULK_WORKERS)
+        return _bulk_pool
+
+def discard_bulk_pool(pool: ProcessPoolExecutor):
+    """Drops a pool whose worker died; the next get_bulk_pool() starts a fresh one."""
+    global _bulk_pool
+    with _bulk_pool_lock:
+        if _bulk_pool is pool:
+            _bulk_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _read_document_job(path: str, filename: str):
+    """Runs in a pool process. Returns (kind, content, error)."""
+    try:
+        kind, content = read_any_file(path, filename)
+        return kind, content, None
+    except Exception as e:
+        return None, "", str(e)
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _bulk_entry(name: str, path=None, status="pending", error=None) -> dict:
+    entry = {"file": name, "path": path, "status": status}
+    if error:
+        entry["error"] = error
+    return entry
+
+class BulkEntries(list):
+    """Per-file entries; only BULK_MAX_FILES documents are accepted and skipped files beyond a cap are just counted."""
+
+    def __init__(self):
+        super().__init__()
+        self.accepted = 0
+        self.skipped = 0
+        self.unlisted = 0
+
+    def full(self) -> bool:
+        return self.accepted >= BULK_MAX_FILES
+
+    def accept(self, name: str, path: str):
+        self.accepted += 1
+        self.append(_bulk_entry(name, path))
+
+    def skip(self, name: str, error: str):
+        self.skipped += 1
+        if self.skipped <= BULK_MAX_SKIPPED_LISTED:
+            self.append(_bulk_entry(name, status="skipped", error=error))
+        else:
+            self.unlisted += 1
+
+def collect_zip(archive_path: str, workdir: str) -> BulkEntries:
+    """Extracts members to unique files under workdir (names never reach the filesystem)."""
+    entries = BulkEntries()
+    with zipfile.ZipFile(archive_path) as zf:
+        for i, info in enumerate(zf.infolist()):
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                continue
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in BULK_EXTS:
+                entries.skip(name, f"unsupported type {ext or '(none)'}")
+                continue
+            if info.file_size > BULK_MAX_FILE_BYTES:
+                entries.skip(name, "file too large")
+                continue
+            if entries.full():
+                entries.skip(name, "file limit reached")
+                continue
+            path = os.path.join(workdir, f"{i:06d}{ext}")
+            with zf.open(info) as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            entries.accept(name, path)
+    return entries
+
+def collect_directory(target: str, root: str) -> BulkEntries:
+    """Documents under target; symlinks that resolve outside root (both realpaths) are skipped."""
+    entries = BulkEntries()
+    for dirpath, _dirnames, filenames in os.walk(target):
+        for fn in sorted(filenames):
+            path = os.path.join(dirpath, fn)
+            name = os.path.relpath(path, target)
+            ext = os.path.splitext(fn)[1].lower()
+            if fn.startswith(".") or ext not in BULK_EXTS:
+                continue
+            real = os.path.realpath(path)
+            if os.path.commonpath([root, real]) != root or not os.path.isfile(real):
+                entries.skip(name, "outside BULK_DIR_ROOT")
+            elif os.path.getsize(real) > BULK_MAX_FILE_BYTES:
+                entries.skip(name, "file too large")
+            elif entries.full():
+                entries.skip(name, "file limit reached")
+            else:
+                entries.accept(name, real)
+    return entries
+
+def _read_documents(jobs: list) -> list:
+    """
+    (entry, (kind, content, error)) per job, read across the process pool.
+    If a reader process dies the pool is replaced and the affected files are
+    retried one at a time, so only the file that kills a worker is an error.
+    """
+    pool = get_bulk_pool()
+    futures = []
+    for e in jobs:
+        try:
+            futures.append((e, pool.submit(_read_document_job, e["path"], e["file"])))
+        except BrokenProcessPool:
+            futures.append((e, None))
+
+    results, retry = {}, []
+    for e, fut in futures:
+        try:
+            if fut is None:
+                raise BrokenProcessPool("pool already broken")
+            results[id(e)] = fut.result()
+        except BrokenProcessPool:
+            retry.append(e)
+
+    if retry:
+        discard_bulk_pool(pool)
+        for e in retry:
+            pool = get_bulk_pool()
+            try:
+                results[id(e)] = pool.submit(_read_document_job, e["path"], e["file"]).result()
+            except BrokenProcessPool:
+                print("Bulk reader crashed on:", e["file"])
+                discard_bulk_pool(pool)
+                results[id(e)] = (None, "", "document reader process crashed")
+    return [(e, results[id(e)]) for e in jobs]
+
+def ingest_documents(entries: list, batch: dict) -> list:
+    """
+    Dedupe by content hash, read documents across the process pool, then run
+    extraction for text documents on a small thread pool. Returns normalized
+    schemes in file order; each entry gets its final status and scheme count.
+    Repeated scheme names across all files are disambiguated through `batch`.
+    """
+    seen = {}
+    jobs = []
+    for e in entries:
+        if e["status"] != "pending":
+            continue
+        digest = _file_sha256(e["path"])
+        e["sha256"] = digest
+        if digest in seen:
+            e["status"] = "duplicate"
+            e["duplicate_of"] = seen[digest]
+            continue
+        seen[digest] = e["file"]
+        jobs.append(e)
+
+    texts = []
+    for e, (kind, content, error) in _read_documents(jobs):
+        if error:
+            e["status"], e["error"] = "error", error
+        elif kind == "json":
+            try:
+                raw = json.loads(content)
+                if not isinstance(raw, list):
+                    raise ValueError("JSON must be an array of schemes")
+                e["schemes"] = normalize_schemes(raw, batch)
+            except Exception as ex:
+                e["status"], e["error"] = "error", f"Invalid JSON file: {ex}"
+        elif not content.strip():
+            e["status"] = "empty"
+            if e["file"].lower().endswith(".pdf") and not PDF_OK:
+                e["error"] = "PDF reading not enabled. Install: pip install pypdf"
+        else:
+            texts.append((e, content))
+
+    if texts:
+        with ThreadPoolExecutor(max_workers=BULK_LLM_WORKERS) as tp:
+            extracted = tp.map(extract_schemes, [t for _e, t in texts])
+            for (e, _t), (raw, stats) in zip(texts, extracted):
+                e["schemes"] = normalize_schemes(raw, batch)
+                e["extraction"] = stats
+
+    incoming = []
+    for e in entries:
+        if "schemes" in e:
+            schemes = e.pop("schemes")
+            e["status"] = "ok" if schemes else "no_schemes"
+            e["schemes_count"] = len(schemes)
+            incoming.extend(schemes)
+        e.pop("path", None)
+    return incoming
+
+
 # -----------------------
 # Routes
 # -----------------------
@@ -553,23 +1305,39 @@ def index():
 
 @app.route("/load_schemes", methods=["POST"])
 def load_schemes():
-    global schemes_db, all_criteria_keys
+    # Programmatic sync can POST the JSON array / JSONL itself as the body, with options in the query string
+    raw_body = request.mimetype in STREAM_MIMETYPES
+    params = request.args if raw_body else request.form
+
+    mode = (params.get("mode") or "replace").strip().lower()
+    if mode not in ("replace", "merge"):
+        return jsonify({"error": "mode must be 'replace' or 'merge'"}), 400
+    delete_refs = _parse_delete_refs(params.get("delete"))
 
     paste_text = (request.form.get("paste_text") or "").strip()
     paste_json = (request.form.get("paste_json") or "").strip()
-
-    if paste_json:
-        try:
-            raw = json.loads(paste_json)
-            if not isinstance(raw, list):
-                return jsonify({"error": "Pasted JSON must be an array of schemes"}), 400
-            schemes_db = normalize_schemes(raw)
-        except Exception as e:
-            return jsonify({"error": f"Invalid JSON: {e}"}), 400
+    want_stream = (params.get("stream") or "").lower() in ("1", "true", "yes") \
+        or "text/event-stream" in (request.headers.get("Accept") or "")
+    incoming = []
+    text = None
+    records = None
+    ingest = None
+
+    if raw_body:
+        ingest = {"bytes": 0, "total_bytes": request.content_length}
+        records = RecordStream(iter_text(request.stream, STREAM_CHUNK_BYTES, ingest), STREAM_MAX_OBJECT_CHARS,
+                               STREAM_MIMETYPES[request.mimetype])
+
+    elif paste_json:
+        ingest = {"bytes": 0, "total_bytes": len(paste_json)}
+        chunks = (paste_json[i:i + STREAM_CHUNK_BYTES] for i in range(0, len(paste_json), STREAM_CHUNK_BYTES))
+        records = RecordStream(_count_chars(chunks, ingest), STREAM_MAX_OBJECT_CHARS)
 
     elif paste_text:
-        extracted = extract_schemes_with_gpt(paste_text)
-        schemes_db = normalize_schemes(extracted)
+        text = paste_text
+
+    elif mode == "merge" and delete_refs and "file" not in request.files:
+        pass  # delete-only merge
 
     else:
         if "file" not in request.files:
@@ -578,97 +1346,584 @@ def load_schemes():
         if not f or f.filename == "":
             return jsonify({"error": "Empty filename"}), 400
 
-        tmp_path = "/tmp/uploaded_input"
-        f.save(tmp_path)
-
-        kind, content = read_any_file(tmp_path, f.filename)
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+        ext = os.path.splitext(f.filename)[1].lower()
+        if ext in STREAM_EXTS:
+            # parsed straight from the spooled upload, one scheme at a time
+            ingest = {"bytes": 0, "total_bytes": _stream_size(f.stream)}
+            records = RecordStream(iter_text(f.stream, STREAM_CHUNK_BYTES, ingest), STREAM_MAX_OBJECT_CHARS,
+                                   STREAM_EXTS[ext])
+        else:
+            fd, tmp_path = tempfile.mkstemp(prefix="uploaded_", suffix=os.path.splitext(f.filename)[1])
+            os.close(fd)
+            f.save(tmp_path)
 
-        if kind == "json":
+            kind, content = read_any_file(tmp_path, f.filename)
             try:
-                raw = json.loads(content)
-                if not isinstance(raw, list):
-                    return jsonify({"error": "Uploaded JSON must be an array of schemes"}), 400
-                schemes_db = normalize_schemes(raw)
-            except Exception as e:
-                return jsonify({"error": f"Invalid JSON file: {e}"}), 400
-        else:
+                os.remove(tmp_path)
+            except Exception:
+                pass
+
             if not content.strip():
                 if f.filename.lower().endswith(".pdf") and not PDF_OK:
                     return jsonify({"error": "PDF reading not enabled. Install: pip install pypdf"}), 400
                 return jsonify({"error": "Could not read text from the file"}), 400
 
-            extracted = extract_schemes_with_gpt(content)
-            schemes_db = normalize_schemes(extracted)
+            text = content
+
+    if records is not None:
+        if want_stream:
+            events = _ingest_events(records, ingest, mode, delete_refs)
+            return Response(stream_with_context(events), mimetype="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        changes = {}
+        batch = {}
+        try:
+            for changes, _progress in iter_ingest(records, ingest, mode, delete_refs, batch):
+                pass
+        except ValueError as e:
+            return jsonify({"error": f"Invalid JSON: {e}", "ingest": ingest}), 400
+        resp = _load_summary(mode, changes, duplicates=collision_summary(batch))
+        resp["ingest"] = ingest
+        return jsonify(resp)
+
+    if want_stream:
+        events = _load_schemes_events(text, incoming, mode, delete_refs)
+        return Response(stream_with_context(events), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    extraction = None
+    batch = {}
+    if text is not None:
+        extracted, extraction = extract_schemes(text)
+        incoming = normalize_schemes(extracted, batch)
+
+    changes = apply_catalogue(incoming, mode, delete_refs)
+    return jsonify(_load_summary(mode, changes, extraction, collision_summary(batch)))
+
+def _load_summary(mode: str, changes: dict, extraction=None, duplicates=None) -> dict:
+    resp = {
+        "message": f"Loaded {len(schemes_db)} schemes",
+        "schemes_count": len(schemes_db),
+        "all_criteria_keys": sorted(list(all_criteria_keys)),
+        "budget_linked_count": len(budget_links),
+        "mode": mode,
+        "changes": changes,
+        "catalogue_version": catalogue_version,
+        "footprint": catalogue_footprint
+    }
+    if extraction is not None:
+        resp["extraction"] = extraction
+    if duplicates and duplicates["count"]:
+        resp["duplicate_names"] = duplicates
+    return resp
 
-    all_criteria_keys.clear()
-    for s in schemes_db:
-        all_criteria_keys.update((s.get("criteria") or {}).keys())
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
+def _load_schemes_events(text, incoming: list, mode: str, delete_refs: list):
+    """
+    Server-sent events for /load_schemes?stream=1:
+      progress {stage}  ->  scheme {index, scheme} per extracted scheme  ->  done {summary} | error {error}
+    The catalogue is only updated once extraction has finished.
+    """
+    try:
+        extraction = None
+        batch = {}
+        if text is not None:
+            yield _sse("progress", {"stage": "extracting", "chars": len(text)})
+            extraction = {}
+            for raw in iter_extracted_schemes(text, extraction):
+                for scheme in normalize_schemes([raw], batch):
+                    incoming.append(scheme)
+                    yield _sse("scheme", {"index": len(incoming) - 1, "scheme": scheme})
+            yield _sse("progress", {"stage": "extracted", "schemes": len(incoming)})
+
+        yield _sse("progress", {"stage": "updating_catalogue"})
+        changes = apply_catalogue(incoming, mode, delete_refs)
+        yield _sse("done", _load_summary(mode, changes, extraction, collision_summary(batch)))
+    except Exception as e:
+        yield _sse("error", {"error": str(e)})
+
+def _ingest_events(records, ingest: dict, mode: str, delete_refs: list):
+    """
+    Server-sent events for a streamed JSON / JSONL upload:
+      progress {stage: "parsing" | "applying", objects, bytes, pct, ...} per batch  ->  done {summary} | error {error}
+    """
+    try:
+        changes = {}
+        batch = {}
+        for changes, progress in iter_ingest(records, ingest, mode, delete_refs, batch):
+            yield _sse("progress", progress)
+        summary = _load_summary(mode, changes, duplicates=collision_summary(batch))
+        summary["ingest"] = ingest
+        yield _sse("done", summary)
+    except ValueError as e:
+        yield _sse("error", {"error": f"Invalid JSON: {e}", "ingest": ingest})
+    except Exception as e:
+        yield _sse("error", {"error": str(e)})
+
+def _parse_delete_refs(raw) -> list:
+    """delete=<JSON array> or a comma-separated list of scheme IDs / names."""
+    raw = (raw or "").strip()
+    if not raw:
+        return []
+    if raw.startswith("["):
+        try:
+            refs = json.loads(raw)
+            return [str(r) for r in refs if str(r).strip()] if isinstance(refs, list) else []
+        except ValueError:
+            pass
+    return [r.strip() for r in raw.split(",") if r.strip()]
+
+@app.route("/load_schemes_bulk", methods=["POST"])
+def load_schemes_bulk():
+    """
+    Batch ingestion: a ZIP upload ("archive") or a server-side "directory"
+    under BULK_DIR_ROOT. All documents feed one catalogue update ("mode" as in
+    /load_schemes) and each file gets its own status.
+    """
+    mode = (request.form.get("mode") or "replace").strip().lower()
+    if mode not in ("replace", "merge"):
+        return jsonify({"error": "mode must be 'replace' or 'merge'"}), 400
+
+    directory = (request.form.get("directory") or "").strip()
+    workdir = None
+    try:
+        if "archive" in request.files and request.files["archive"].filename:
+            workdir = tempfile.mkdtemp(prefix="schemes_bulk_")
+            archive_path = os.path.join(workdir, "upload.zip")
+            request.files["archive"].save(archive_path)
+            try:
+                entries = collect_zip(archive_path, workdir)
+            except zipfile.BadZipFile:
+                return jsonify({"error": "archive is not a valid ZIP file"}), 400
+        elif directory:
+            if not BULK_DIR_ROOT:
+                return jsonify({"error": "Directory ingestion is disabled (set BULK_DIR_ROOT)"}), 403
+            root = os.path.realpath(BULK_DIR_ROOT)
+            target = os.path.realpath(os.path.join(root, directory))
+            if os.path.commonpath([root, target]) != root or not os.path.isdir(target):
+                return jsonify({"error": "directory must be an existing folder under BULK_DIR_ROOT"}), 400
+            entries = collect_directory(target, root)
+        else:
+            return jsonify({"error": "Provide an 'archive' ZIP upload or a 'directory'"}), 400
+
+        t0 = time.perf_counter()
+        batch = {}
+        incoming = ingest_documents(entries, batch)
+        changes = apply_catalogue(incoming, mode)
+        elapsed = time.perf_counter() - t0
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    status_counts = Counter(e["status"] for e in entries)
+    if entries.unlisted:
+        status_counts["skipped"] += entries.unlisted
+    criteria_local = sum(e.get("extraction", {}).get("criteria_local", 0) for e in entries)
+    criteria_llm = sum(e.get("extraction", {}).get("criteria_llm", 0) for e in entries)
+    total = criteria_local + criteria_llm
     return jsonify({
         "message": f"Loaded {len(schemes_db)} schemes",
         "schemes_count": len(schemes_db),
-        "all_criteria_keys": sorted(list(all_criteria_keys))
+        "all_criteria_keys": sorted(list(all_criteria_keys)),
+        "budget_linked_count": len(budget_links),
+        "mode": mode,
+        "changes": changes,
+        "catalogue_version": catalogue_version,
+        "files_total": len(entries) + entries.unlisted,
+        "files_by_status": dict(status_counts),
+        "files_skipped_unlisted": entries.unlisted,
+        "duplicate_names": collision_summary(batch),
+        "extraction": {
+            "criteria_local": criteria_local,
+            "criteria_llm": criteria_llm,
+            "local_share": round(criteria_local / total, 3) if total else 0.0,
+            "llm_calls": sum(e.get("extraction", {}).get("llm_calls", 0) for e in entries)
+        },
+        "elapsed_sec": round(elapsed, 3),
+        "files": entries
     })
 
+@app.route("/changes")
+def catalogue_changes():
+    """
+    Change feed for cache invalidation: ?since=<catalogue_version>.
+    reset=true means the log no longer reaches back that far; drop everything.
+    """
+    try:
+        since = int(request.args.get("since", 0))
+    except ValueError:
+        return jsonify({"error": "since must be an integer"}), 400
+
+    with catalogue_lock:
+        oldest = change_log[0]["version"] if change_log else catalogue_version + 1
+        reset = since < oldest - 1
+        changes = [] if reset else [c for c in change_log if c["version"] > since]
+        version = catalogue_version
+
+    return jsonify({"version": version, "reset": reset, "changes": changes})
+
 @app.route("/check", methods=["POST"])
 def check_eligibility():
+    """
+    Optional query parameters (defaults give the full response):
+      sections=eligible,not_eligible,questions   which parts to return
+      view=ids            scheme_id + reason codes instead of names, benefits and rendered reasons
+      fields=...          entry fields: scheme_id, scheme_name, benefits, budget, reasons
+      reasons=codes|text  failed criterion keys instead of sentences
+      limit=N&cursor=...  page through the eligible / not-eligible entries in catalogue order
+      format=msgpack      (or Accept: application/msgpack) binary response
+    """
     payload = request.get_json() or {}
+    try:
+        opts = parse_check_options(request.args, request.headers.get("Accept") or "")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if opts["format"] == "msgpack" and not MSGPACK_OK:
+        return jsonify({"error": "MessagePack not enabled. Install: pip install msgpack"}), 406
     user_profile = build_user_profile(payload)
 
     eligible = []
     not_eligible = []
-    possible_schemes = []
+    possible_schemes = {}  # id(signature) -> one scheme; question options only depend on the criteria
     missing_counter = {}
 
-    # Evaluate every scheme with reasons
-    for scheme in schemes_db or []:
-        criteria = scheme.get("criteria", {}) or {}
-        status, missing, reasons = evaluate_scheme_with_reasons(user_profile, criteria)
-
-        if status == "eligible":
-            eligible.append({
-                "scheme_name": scheme.get("scheme_name", "Unknown Scheme"),
-                "benefits": scheme.get("benefits", "")
-            })
+    sections = opts["sections"]
+    want_questions = "questions" in sections
+    limit = opts["limit"]
+    taken = 0
+    next_pos = None
+
+    # Evaluate every scheme with reasons, sharing predicate results across schemes
+    with catalogue_lock:
+        rows = [(scheme, scheme_signature[sid]) for sid, scheme in schemes_db.items()]
+        version = catalogue_version
+    start = opts["cursor_pos"]
+    # Questions need every possible scheme; without them the scan starts at the cursor and stops after the page
+    first = 0 if want_questions else start
+    evaluator = PredicateEvaluator(user_profile)
+    for pos, (scheme, sig) in enumerate(itertools.islice(rows, first, None), first):
+        status, missing, reasons = evaluator.evaluate(sig)
+
+        if status == "needs_info":
+            # needs_info: scheme is still possible but missing data (no fail reasons yet)
+            if want_questions:
+                possible_schemes.setdefault(id(sig), scheme)
+                for k in missing:
+                    # Don't ask basic fields in "additional" section
+                    if k in BASIC_FIELDS:
+                        continue
+                    missing_counter[k] = missing_counter.get(k, 0) + 1
             continue
 
-        if status == "not_eligible":
-            not_eligible.append({
-                "scheme_name": scheme.get("scheme_name", "Unknown Scheme"),
-                "benefits": scheme.get("benefits", ""),
-                "reasons": reasons
-            })
+        if pos < start or status not in sections:
+            continue
+        if limit is not None and taken >= limit:
+            if next_pos is None:
+                next_pos = pos
+            if not want_questions:
+                break
             continue
+        taken += 1
 
-        # needs_info: scheme is still possible but missing data (no fail reasons yet)
-        possible_schemes.append(scheme)
-        for k in missing:
-            # Don't ask basic fields in "additional" section
-            if k in BASIC_FIELDS:
-                continue
-            missing_counter[k] = missing_counter.get(k, 0) + 1
+        entry = _check_entry(scheme, opts)
+        if status == "eligible":
+            if "budget" in opts["fields"]:
+                link = budget_links.get(scheme.get("scheme_id"))
+                if link is not None:
+                    entry["budget"] = link
+            eligible.append(entry)
+        else:
+            if "reasons" in opts["fields"]:
+                entry["reasons"] = evaluator.reason_codes(sig) if opts["reasons"] == "codes" else reasons
+            not_eligible.append(entry)
+
+    out = {}
+    if "eligible" in sections:
+        out["eligible_schemes"] = eligible
+    if "not_eligible" in sections:
+        out["not_eligible_schemes"] = not_eligible
+    if want_questions:
+        missing_fields_sorted = sorted(missing_counter.keys(), key=lambda k: missing_counter[k], reverse=True)
+        out["missing_fields"] = missing_fields_sorted
+        out["missing_questions"] = build_missing_questions(list(possible_schemes.values()), missing_fields_sorted)
+    if limit is not None:
+        out["next_cursor"] = encode_check_cursor(version, next_pos) if next_pos is not None else None
+        out["catalogue_version"] = version
+        if opts["cursor_version"] not in (None, version):
+            out["cursor_stale"] = True  # catalogue changed since the previous page
+
+    if opts["format"] == "msgpack":
+        return Response(msgpack.packb(out, use_bin_type=True), mimetype="application/msgpack")
+    return jsonify(out)
+
+def _check_entry(scheme, opts: dict) -> dict:
+    fields = opts["fields"]
+    entry = {}
+    if "scheme_id" in fields:
+        entry["scheme_id"] = scheme.get("scheme_id")
+    if "scheme_name" in fields:
+        entry["scheme_name"] = scheme.get("scheme_name", "Unknown Scheme")
+    if "benefits" in fields:
+        entry["benefits"] = scheme.get("benefits", "")
+    return entry
+
+def _csv_arg(raw, allowed: tuple, name: str) -> tuple:
+    vals = tuple(v.strip() for v in raw.split(",") if v.strip())
+    bad = [v for v in vals if v not in allowed]
+    if bad or not vals:
+        raise ValueError(f"{name} must be a comma-separated subset of: {', '.join(allowed)}")
+    return vals
+
+def encode_check_cursor(version: int, pos: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{pos}".encode()).decode().rstrip("=")
+
+def decode_check_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        version, pos = (int(x) for x in raw.split(":"))
+    except Exception:
+        raise ValueError("invalid cursor") from None
+    return version, max(0, pos)
+
+def parse_check_options(args, accept: str = "") -> dict:
+    view = (args.get("view") or "full").strip().lower()
+    if view not in ("full", "ids"):
+        raise ValueError("view must be 'full' or 'ids'")
+    opts = {
+        "sections": CHECK_SECTIONS,
+        "fields": ("scheme_id", "reasons") if view == "ids" else CHECK_DEFAULT_FIELDS,
+        "reasons": "codes" if view == "ids" else "text",
+        "limit": None,
+        "cursor_pos": 0,
+        "cursor_version": None,
+        "format": "json",
+    }
+    if args.get("sections"):
+        opts["sections"] = _csv_arg(args["sections"], CHECK_SECTIONS, "sections")
+    if args.get("fields"):
+        opts["fields"] = _csv_arg(args["fields"], CHECK_FIELDS, "fields")
+    if args.get("reasons"):
+        opts["reasons"] = args["reasons"].strip().lower()
+        if opts["reasons"] not in ("codes", "text"):
+            raise ValueError("reasons must be 'codes' or 'text'")
+    if args.get("limit") or args.get("cursor"):
+        try:
+            opts["limit"] = max(1, min(int(args.get("limit") or 50), CHECK_MAX_LIMIT))
+        except ValueError:
+            raise ValueError("limit must be an integer") from None
+    if args.get("cursor"):
+        opts["cursor_version"], opts["cursor_pos"] = decode_check_cursor(args["cursor"].strip())
+
+    fmt = (args.get("format") or "").strip().lower()
+    if not fmt:
+        fmt = "msgpack" if ("application/msgpack" in accept or "application/x-msgpack" in accept) else "json"
+    if fmt not in ("json", "msgpack"):
+        raise ValueError("format must be 'json' or 'msgpack'")
+    opts["format"] = fmt
+    return opts
+
+@app.route("/search")
+def search_schemes():
+    """Fuzzy scheme lookup: ?q=<partial or misspelled words>&limit=10. A trailing space ends the last word."""
+    raw = request.args.get("q") or ""
+    q = raw.strip()
+    prefix = not raw.endswith(" ")  # the last word is still being typed
+    try:
+        limit = max(1, min(int(request.args.get("limit", 10)), 100))
+    except ValueError:
+        limit = 10
+
+    with catalogue_lock:  # upserts change the index in place
+        t0 = time.perf_counter()
+        hits = search_index.search(q, limit=limit, prefix=prefix)
+        tokens = tokenize(q)
+        completions = search_index.complete(tokens[-1], limit=8) if tokens and prefix else []
+        took_ms = (time.perf_counter() - t0) * 1000
+
+        results = []
+        for doc_id, score in hits:
+            s = search_index.docs[doc_id]
+            results.append({
+                "scheme_id": doc_id,
+                "scheme_name": s.get("scheme_name", "Unknown Scheme"),
+                "benefits": s.get("benefits", ""),
+                "score": round(score, 4)
+            })
 
-    missing_fields_sorted = sorted(missing_counter.keys(), key=lambda k: missing_counter[k], reverse=True)
-    missing_questions = build_missing_questions(possible_schemes, missing_fields_sorted)
+    return jsonify({
+        "query": q,
+        "results": results,
+        "completions": completions,
+        "took_ms": round(took_ms, 3)
+    })
 
+@app.route("/budget/anomalies")
+def budget_anomalies():
+    """Ranked year-on-year budget swings: ?limit=20&sector=State|District&flag=outlier|swing|started|zeroed&min_score=2"""
+    try:
+        limit = max(1, min(int(request.args.get("limit", 50)), 1000))
+        min_score = float(request.args.get("min_score") or 0)
+    except ValueError:
+        return jsonify({"error": "limit and min_score must be numbers"}), 400
+
+    table = get_budget_anomalies()
+    with budget_anomalies_lock:  # a refresh appends columns in place
+        rows = table.query(limit, request.args.get("sector"), request.args.get("flag"), min_score)
     return jsonify({
-        "eligible_schemes": eligible,
-        "not_eligible_schemes": not_eligible,
-        "missing_fields": missing_fields_sorted,
-        "missing_questions": missing_questions
+        "years": table.years,
+        "appended_years": table.appended,
+        "heads": len(table.heads),
+        "z_threshold": Z_THRESHOLD,
+        "swing_pct": SWING_PCT,
+        "anomalies": rows
     })
 
+# -----------------------
+# Request profiling (opt-in)
+# -----------------------
+def get_profile_ring() -> ProfileRing:
+    global _profile_ring
+    if _profile_ring is None:
+        _profile_ring = ProfileRing(PROFILE_DIR, PROFILE_RING_SIZE)
+    return _profile_ring
+
+def _profile_authorized() -> bool:
+    token = request.headers.get("X-Profile") or request.args.get("_profile") or ""
+    return bool(PROFILE_TOKEN) and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+@app.before_request
+def _start_profile():
+    if request.path.startswith("/profiles"):
+        return
+    if _profile_authorized():
+        trigger = "flag"
+        mode = (request.headers.get("X-Profile-Mode") or request.args.get("_profile_mode") or "sample").lower()
+    elif PROFILE_SAMPLE_RATE > 0 and request.path in PROFILE_ROUTES and random.random() < PROFILE_SAMPLE_RATE:
+        trigger, mode = "sampled", "sample"
+    else:
+        return
+    mode = "cprofile" if mode == "cprofile" else "sample"
+    g.profile = {"capture": new_capture(mode, PROFILE_INTERVAL), "mode": mode, "trigger": trigger,
+                 "t0": time.perf_counter(), "started": time.time()}
+
+@app.after_request
+def _finish_profile(response):
+    prof = g.pop("profile", None)
+    if prof is None:
+        return response
+    pid = get_profile_ring().reserve()
+    response.headers["X-Profile-Id"] = str(pid)
+    meta = {"route": request.path, "method": request.method, "mode": prof["mode"], "trigger": prof["trigger"],
+            "started": round(prof["started"], 3)}
+
+    def save():
+        meta["status"] = response.status_code
+        meta["duration_ms"] = round((time.perf_counter() - prof["t0"]) * 1000, 1)
+        try:
+            get_profile_ring().save(pid, *finish_capture(prof["capture"], PROFILE_WATCH, meta))
+        except Exception as e:
+            print("Profile save error:", e)
+
+    if response.is_streamed:
+        # SSE work happens while the body is iterated; keep profiling until it is done
+        body = response.response
+
+        def profiled_body():
+            try:
+                yield from body
+            finally:
+                save()
+        response.response = profiled_body()
+    else:
+        save()
+    return response
+
+@app.route("/profiles")
+def list_profiles():
+    if not _profile_authorized():
+        return jsonify({"error": "profiling token required (X-Profile header)"}), 403
+    return jsonify({"profiles": get_profile_ring().list()})
+
+@app.route("/profiles/<int:pid>")
+def get_profile(pid):
+    """format=collapsed (default; flamegraph.pl / speedscope), pstats (cProfile captures) or json (metadata)."""
+    if not _profile_authorized():
+        return jsonify({"error": "profiling token required (X-Profile header)"}), 403
+    ring = get_profile_ring()
+    meta = ring.get(pid)
+    if meta is None:
+        return jsonify({"error": "profile not found (it may have rotated out)"}), 404
+    fmt = (request.args.get("format") or "collapsed").lower()
+    if fmt == "json":
+        return jsonify(meta)
+    ext = {"collapsed": "collapsed", "pstats": "prof"}.get(fmt)
+    if ext is None or not os.path.exists(ring.path(pid, ext)):
+        return jsonify({"error": f"format {fmt} not available for this profile"}), 400
+    with open(ring.path(pid, ext), "rb") as f:
+        data = f.read()
+    mimetype = "text/plain; charset=utf-8" if ext == "collapsed" else "application/octet-stream"
+    return Response(data, mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename=profile-{pid}.{ext}"})
+
 @app.route("/health")
 def health():
     return jsonify({
         "ok": True,
         "schemes_loaded": len(schemes_db),
-        "pdf_supported": PDF_OK
+        "pdf_supported": PDF_OK,
+        "extraction_totals": _extraction_summary(),
+        "catalogue_footprint": catalogue_footprint,
+        "intern_pools": pool_sizes(),
+        "predicate_table": predicate_stats()
     })
 
+def _extraction_summary() -> dict:
+    with extraction_lock:
+        out = dict(extraction_totals)
+    total = out.get("criteria_local", 0) + out.get("criteria_llm", 0)
+    out["local_share"] = round(out.get("criteria_local", 0) / total, 3) if total else 0.0
+    return out
+
+@app.route("/export/<dataset>")
+def export_dataset(dataset):
+    """
+    Streams ward/district datasets with chunked transfer encoding.
+    Query: format=csv|jsonl|columnar, from=2016-17, to=2020-21, compress=gzip|none
+    (gzip defaults on when the client sends Accept-Encoding: gzip).
+    """
+    if dataset not in DATASETS:
+        return jsonify({"error": f"Unknown dataset. Use one of: {', '.join(DATASETS)}"}), 404
+
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Unknown format. Use one of: {', '.join(FORMATS)}"}), 400
+
+    try:
+        years = years_between(request.args.get("from"), request.args.get("to"))
+    except ValueError:
+        return jsonify({"error": "Unknown fiscal year in from/to"}), 400
+    if not years:
+        return jsonify({"error": "Empty year range"}), 400
+
+    compress = (request.args.get("compress") or "").lower()
+    if compress and compress not in COMPRESSIONS:
+        return jsonify({"error": f"Unknown compress value. Use one of: {', '.join(COMPRESSIONS)}"}), 400
+    if compress:
+        use_gzip = compress == "gzip"
+    else:
+        use_gzip = "gzip" in (request.headers.get("Accept-Encoding") or "").lower()
+
+    mimetype, ext = FORMATS[fmt]
+    span = years[0] if len(years) == 1 else f"{years[0]}_{years[-1]}"
+    headers = {"Content-Disposition": f'attachment; filename="{dataset}_{span}.{ext}"'}
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+
+    body = export_stream(dataset, fmt, years, gzip=use_gzip)
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,205 @@
+import math
+import operator
+import statistics
+from array import array
+
+# Year-on-year anomaly table over karnataka_budget.csv. Allocations are held
+# column-major (one array per fiscal year, one slot per Head_of_Account), so
+# growth, cross-head z-scores and the per-head running sums behind volatility
+# are computed a whole column at a time. Appending a fiscal year only
+# computes the new column; re-ranking then only sorts the per-head scores,
+# and row dicts are built for the rows a query actually returns.
+
+# ================== CONFIG ==================
+Z_THRESHOLD = 3.5   # |robust z| of a year's growth against every head's growth that year
+SWING_PCT = 50.0    # year-on-year change (either way) reported as a swing
+# ===========================================
+
+_NAN = float("nan")
+
+
+def _column(values) -> array:
+    """Allocations as floats; a missing or negative figure becomes NaN."""
+    return array("d", (_NAN if v is None or v < 0 else float(v) for v in values))
+
+def _pct(a: float, b: float):
+    return (b - a) / a * 100 if a > 0 else None  # NaN compares False, so missing figures give None
+
+def _round(v, nd: int):
+    return None if v is None or v != v else round(v, nd)
+
+
+class AnomalyTable:
+    """
+    Growth rates, z-score outliers, CAGR and volatility for every budget head.
+
+    Growth is the log ratio of consecutive years, so a 60000 -> 4000 cut and
+    a 4000 -> 60000 jump are equally large. Each year's growth is z-scored
+    across all heads with positive figures in both years, using the median
+    and MAD so that a handful of extreme heads do not mask every other swing;
+    a head's score is its largest |z|. Heads funded from zero or cut to zero
+    have no ratio and are flagged ("started" / "zeroed") instead.
+    """
+
+    def __init__(self, lines: list):
+        n = len(lines)
+        self.heads = [ln["head_of_account"] for ln in lines]
+        self.names = [ln["name"] for ln in lines]
+        self.sectors = [ln["sector"] for ln in lines]
+        self.years = []
+        self.raw = []       # per year: the allocations as loaded, to detect edits on refresh
+        self.columns = []   # per year: array of lakhs
+        self.appended = []  # years added after the initial build
+        self._log_prev = None
+        # per-head running state
+        self.first = array("d", [_NAN]) * n      # first positive figure
+        self.first_idx = array("l", [-1]) * n
+        self.last = array("d", [_NAN]) * n       # latest figure
+        self.last_idx = array("l", [-1]) * n
+        self.g_n = array("l", [0]) * n           # count / sum / sum of squares of growth
+        self.g_sum = array("d", [0.0]) * n
+        self.g_sq = array("d", [0.0]) * n
+        self.peak_z = array("d", [0.0]) * n
+        self.peak_idx = array("l", [-1]) * n
+        self.max_swing = array("d", [0.0]) * n   # largest |% change|
+        self.started_idx = array("l", [-1]) * n  # last year funded from zero
+        self.order = []     # head indices, highest score first
+        self._rows = {}     # head index -> row dict, filled as queries ask for rows
+        years = list(lines[0]["allocations"]) if lines else []
+        for year in years:
+            self._append(year, [ln["allocations"].get(year) for ln in lines])
+        self._rank()
+
+    # -----------------------
+    # Column passes
+    # -----------------------
+    def _append(self, year: str, values: list):
+        col = _column(values)
+        log_col = array("d", (math.log(v) if v > 0 else _NAN for v in col))
+        idx = len(self.years)
+        if self._log_prev is None:
+            growth = array("d", [_NAN]) * len(col)
+        else:
+            growth = array("d", map(operator.sub, log_col, self._log_prev))
+
+        valid = [g for g in growth if g == g]
+        scale = 0.0
+        if len(valid) > 1:
+            mid = statistics.median(valid)
+            dev = [abs(g - mid) for g in valid]
+            mad = statistics.median(dev)
+            # MAD / 0.6745 estimates the std; fall back to the mean deviation when over half the heads sit on the median
+            scale = mad / 0.6745 if mad else math.fsum(dev) / len(dev) * 1.2533
+        z = array("d", ((g - mid) / scale for g in growth)) if scale else array("d", [_NAN]) * len(col)
+
+        prev = self.columns[-1] if self.columns else None
+        for i, v in enumerate(col):
+            if v == v:
+                if self.first_idx[i] < 0 and v > 0:
+                    self.first[i], self.first_idx[i] = v, idx
+                self.last[i], self.last_idx[i] = v, idx
+            if prev is not None and prev[i] == 0 and v > 0:
+                self.started_idx[i] = idx
+            g = growth[i]
+            if g == g:
+                self.g_n[i] += 1
+                self.g_sum[i] += g
+                self.g_sq[i] += g * g
+            change = _pct(prev[i], v) if prev is not None else None
+            if change is not None and abs(change) > self.max_swing[i]:
+                self.max_swing[i] = abs(change)
+            if abs(z[i]) > abs(self.peak_z[i]):
+                self.peak_z[i], self.peak_idx[i] = z[i], idx
+
+        self.years.append(year)
+        self.raw.append(list(values))
+        self.columns.append(col)
+        self._log_prev = log_col
+
+    def _rank(self):
+        key = [(-abs(z), -swing) for z, swing in zip(self.peak_z, self.max_swing)]
+        self.order = sorted(range(len(self.heads)), key=key.__getitem__)
+        self._rows = {}
+
+    def flags(self, i: int) -> list:
+        flags = []
+        if abs(self.peak_z[i]) >= Z_THRESHOLD:
+            flags.append("outlier")
+        if self.max_swing[i] >= SWING_PCT:
+            flags.append("swing")
+        if self.started_idx[i] >= 0:
+            flags.append("started")
+        if self.last[i] == 0 and self.first_idx[i] >= 0:
+            flags.append("zeroed")
+        return flags
+
+    def row(self, i: int) -> dict:
+        n = self.g_n[i]
+        volatility = None
+        if n > 1:
+            mean = self.g_sum[i] / n
+            volatility = math.sqrt(max(self.g_sq[i] / n - mean * mean, 0.0))
+        cagr = None
+        span = self.last_idx[i] - self.first_idx[i]
+        if self.first_idx[i] >= 0 and span > 0:
+            cagr = ((self.last[i] / self.first[i]) ** (1 / span) - 1) * 100
+        peak = self.peak_idx[i]
+        cols = self.columns
+        return {
+            "head_of_account": self.heads[i],
+            "name": self.names[i],
+            "sector": self.sectors[i],
+            "score": round(abs(self.peak_z[i]), 2),
+            "peak_year": self.years[peak] if peak >= 0 else None,
+            "peak_z": _round(self.peak_z[i], 2) if peak >= 0 else None,
+            "peak_change_pct": _round(_pct(cols[peak - 1][i], cols[peak][i]), 1) if peak > 0 else None,
+            "latest_year": self.years[self.last_idx[i]] if self.last_idx[i] >= 0 else None,
+            "latest_lakhs": _round(self.last[i], 2),
+            "latest_change_pct": _round(_pct(cols[-2][i], cols[-1][i]), 1) if len(cols) > 1 else None,
+            "cagr_pct": _round(cagr, 1),
+            "volatility": _round(volatility, 3),
+            "flags": self.flags(i),
+        }
+
+    # -----------------------
+    # Refresh
+    # -----------------------
+    def extend(self, lines: list) -> bool:
+        """
+        Appends fiscal years that `lines` has beyond this table's. Returns
+        False (and changes nothing) when the heads or any existing year's
+        figures differ, in which case the caller rebuilds.
+        """
+        years = list(lines[0]["allocations"]) if lines else []
+        if [ln["head_of_account"] for ln in lines] != self.heads or years[:len(self.years)] != self.years:
+            return False
+        for k, year in enumerate(self.years):
+            if [ln["allocations"].get(year) for ln in lines] != self.raw[k]:
+                return False
+        new_years = years[len(self.years):]
+        for year in new_years:
+            self._append(year, [ln["allocations"].get(year) for ln in lines])
+            self.appended.append(year)
+        if new_years:
+            self._rank()
+        return True
+
+    def query(self, limit: int = None, sector: str = None, flag: str = None, min_score: float = 0.0) -> list:
+        """Ranked rows, highest score first; stops scanning once `limit` rows match."""
+        order, rows = self.order, self._rows
+        sector = sector.lower() if sector else None
+        out = []
+        for rank, i in enumerate(order, 1):
+            if abs(self.peak_z[i]) < min_score:
+                break  # order is by score
+            if sector and self.sectors[i].lower() != sector:
+                continue
+            if flag and flag not in self.flags(i):
+                continue
+            row = rows.get(i)
+            if row is None:
+                row = rows[i] = dict(self.row(i), rank=rank)
+            out.append(row)
+            if limit and len(out) >= limit:
+                break
+        return out
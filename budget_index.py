@@ -0,0 +1,139 @@
+import os
+import re
+import csv
+
+# ================== CONFIG ==================
+BUDGET_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "data", "karnataka_budget.csv")
+MATCH_THRESHOLD = 0.55   # Dice similarity over name trigrams
+# ===========================================
+
+_YEAR_COL = re.compile(r"^(\d{4})_(\d{2})")
+_HEAD_OF_ACCOUNT = re.compile(r"\b\d{4}_\d{2}_\d{3}_\d_\d{2}\b")
+_STOPWORDS = {"of", "the", "and", "or", "for", "to", "in", "scheme", "schemes", "yojane", "yojana", "yojna"}
+
+
+# -----------------------
+# Budget CSV
+# -----------------------
+def fiscal_year_label(column: str):
+    """'2016_17  Rupees_in_Lakhs' -> '2016-17'; None for non-year columns."""
+    m = _YEAR_COL.match(column.strip())
+    return f"{m.group(1)}-{m.group(2)}" if m else None
+
+def _to_number(v):
+    v = (v or "").strip().replace(",", "")
+    try:
+        return float(v) if "." in v else int(v)
+    except ValueError:
+        return None
+
+def load_budget_lines(path: str = BUDGET_CSV) -> list:
+    """Budget heads with per-year allocations; subtotal rows are skipped."""
+    lines = []
+    sector = "State"
+    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        years = [(i, fiscal_year_label(h)) for i, h in enumerate(header)]
+        years = [(i, y) for i, y in years if y]
+        for row in reader:
+            if len(row) < 3:
+                continue
+            name, head = row[1].strip(), row[2].strip()
+            if not head:
+                if "district sector" in name.lower():
+                    sector = "District"
+                continue
+            lines.append({
+                "name": " ".join(name.split()),
+                "head_of_account": head,
+                "sector": sector,
+                "allocations": {y: _to_number(row[i]) if i < len(row) else None for i, y in years},
+            })
+    return lines
+
+
+# -----------------------
+# Trigram index
+# -----------------------
+def _normalize(name: str) -> str:
+    words = re.sub(r"[^a-z0-9 ]+", " ", (name or "").lower()).split()
+    return " ".join(w for w in words if w not in _STOPWORDS)
+
+def trigrams(name: str) -> set:
+    s = _normalize(name)
+    if not s:
+        return set()
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class BudgetIndex:
+    """
+    Inverted trigram index over budget head names. A lookup only touches the
+    postings of the query's own trigrams, so it never compares against every line.
+    """
+
+    def __init__(self, lines: list):
+        self.lines = lines
+        self.by_head = {ln["head_of_account"]: i for i, ln in enumerate(lines)}
+        self.sizes = []
+        self.postings = {}
+        for i, ln in enumerate(lines):
+            grams = trigrams(ln["name"])
+            self.sizes.append(len(grams))
+            for g in grams:
+                self.postings.setdefault(g, []).append(i)
+
+    def match(self, scheme_name: str, threshold: float = MATCH_THRESHOLD):
+        """Returns (line, score) for the best budget head, or None."""
+        m = _HEAD_OF_ACCOUNT.search(scheme_name or "")
+        if m and m.group(0) in self.by_head:
+            return self.lines[self.by_head[m.group(0)]], 1.0
+
+        grams = trigrams(scheme_name)
+        if not grams:
+            return None
+        shared = {}
+        for g in grams:
+            for i in self.postings.get(g, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        best, best_score = None, 0.0
+        for i, n in shared.items():
+            score = 2 * n / (len(grams) + self.sizes[i])
+            if score > best_score:
+                best, best_score = i, score
+        if best is None or best_score < threshold:
+            return None
+        return self.lines[best], round(best_score, 3)
+
+
+# -----------------------
+# Linking
+# -----------------------
+def budget_trend(allocations: dict) -> dict:
+    years = [y for y, v in allocations.items() if v is not None]
+    if not years:
+        return {"direction": "unknown"}
+    first, last = allocations[years[0]], allocations[years[-1]]
+    out = {"first_year": years[0], "last_year": years[-1]}
+    if first:
+        out["change_pct"] = round((last - first) / first * 100, 1)
+    out["direction"] = "rising" if last > first else "falling" if last < first else "flat"
+    return out
+
+def link_scheme(index: BudgetIndex, scheme_name: str):
+    """Precomputed /check fragment for one scheme, or None if unmatched."""
+    hit = index.match(scheme_name)
+    if hit is None:
+        return None
+    line, score = hit
+    return {
+        "budget_head": line["name"],
+        "head_of_account": line["head_of_account"],
+        "sector": line["sector"],
+        "match_score": score,
+        "allocations_lakhs": line["allocations"],
+        "trend": budget_trend(line["allocations"]),
+    }
@@ -0,0 +1,172 @@
+import sys
+from collections import Counter
+from collections.abc import Mapping
+
+# Compact in-memory scheme records. Criterion keys and categorical values are
+# interned, each distinct key layout is stored once and shared by every scheme
+# that uses it, and allowed-value lists become shared frozen tuples. Records
+# keep the read-only dict API (get / [] / "criteria" mapping) that the rest of
+# app.py already uses, and to_dict() gives the plain JSON view. The shared
+# tuples are reference counted: a record's release() drops its references and
+# a tuple no live record uses leaves the table. Tables are keyed by
+# (type, value) pairs, so (1,), (1.0,) and (True,) stay distinct.
+
+_key_layouts = {}   # typed key -> the shared tuple of keys
+_allowed_pool = {}  # typed key -> the shared tuple of values
+_key_refs = Counter()
+_allowed_refs = Counter()
+
+
+def _typed(v):
+    """Equality key that keeps 1, 1.0 and True apart, also inside tuples."""
+    if isinstance(v, tuple):
+        return (tuple, tuple(_typed(x) for x in v))
+    return (type(v), v)
+
+def _acquire(pool: dict, refs: Counter, t: tuple) -> tuple:
+    key = _typed(t)
+    shared = pool.setdefault(key, t)
+    refs[key] += 1
+    return shared
+
+def _release(pool: dict, refs: Counter, t: tuple):
+    key = _typed(t)
+    refs[key] -= 1
+    if refs[key] <= 0:
+        del refs[key]
+        pool.pop(key, None)
+
+def _intern_value(v):
+    if isinstance(v, str):
+        return sys.intern(v)
+    if isinstance(v, (list, tuple)):
+        t = tuple(sys.intern(x) if isinstance(x, str) else x for x in v)
+        return _acquire(_allowed_pool, _allowed_refs, t)
+    return v
+
+def pool_sizes() -> dict:
+    """Distinct shared key layouts and allowed-value tuples currently held."""
+    return {"key_layouts": len(_key_layouts), "allowed_values": len(_allowed_pool)}
+
+
+class CriteriaView(Mapping):
+    """Read-only mapping over a scheme's (keys, values) tuples."""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: tuple, values: tuple):
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        return self._keys
+
+    def items(self):
+        return zip(self._keys, self._values)
+
+
+class CompactScheme:
+    __slots__ = ("scheme_id", "scheme_name", "benefits", "criteria_keys", "criteria_values")
+
+    def __init__(self, scheme_id: str, scheme_name: str, benefits: str, criteria: dict):
+        self.scheme_id = scheme_id
+        self.scheme_name = scheme_name
+        self.benefits = sys.intern(benefits) if len(benefits) <= 64 else benefits
+        keys = tuple(sys.intern(k) for k in criteria)
+        self.criteria_keys = _acquire(_key_layouts, _key_refs, keys)
+        self.criteria_values = tuple(_intern_value(v) for v in criteria.values())
+
+    def release(self):
+        """Drops this record's references to the shared tuples; call once, when it leaves the catalogue."""
+        _release(_key_layouts, _key_refs, self.criteria_keys)
+        for v in self.criteria_values:
+            if isinstance(v, tuple):
+                _release(_allowed_pool, _allowed_refs, v)
+
+    @classmethod
+    def from_dict(cls, scheme: dict) -> "CompactScheme":
+        return cls(scheme["scheme_id"], scheme["scheme_name"], scheme.get("benefits", ""), scheme.get("criteria") or {})
+
+    @property
+    def criteria(self) -> CriteriaView:
+        return CriteriaView(self.criteria_keys, self.criteria_values)
+
+    # dict-style read access
+    def get(self, key, default=None):
+        if key == "criteria":
+            return self.criteria
+        if key in self.__slots__[:3]:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key):
+        if key == "criteria" or key in self.__slots__[:3]:
+            return self.get(key)
+        raise KeyError(key)
+
+    def __eq__(self, other):
+        # typed, so a criterion changing from True to 1 counts as an update
+        if isinstance(other, CompactScheme):
+            return (self.scheme_id, self.scheme_name, self.benefits, self.criteria_keys, _typed(self.criteria_values)) == \
+                (other.scheme_id, other.scheme_name, other.benefits, other.criteria_keys, _typed(other.criteria_values))
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.scheme_id, self.criteria_keys, _typed(self.criteria_values)))
+
+    def to_dict(self) -> dict:
+        return {
+            "scheme_id": self.scheme_id,
+            "scheme_name": self.scheme_name,
+            "criteria": {k: list(v) if isinstance(v, tuple) else v for k, v in zip(self.criteria_keys, self.criteria_values)},
+            "benefits": self.benefits,
+        }
+
+
+# -----------------------
+# Footprint
+# -----------------------
+def deep_sizeof(obj, seen: set) -> int:
+    """Size of obj and everything it references, counting shared objects once."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(x, seen) for x in obj)
+    elif isinstance(obj, CompactScheme):
+        size += sum(deep_sizeof(getattr(obj, a), seen) for a in obj.__slots__)
+    return size
+
+def footprint(dict_schemes: list) -> dict:
+    """Average bytes per scheme as normalized dicts vs compact records."""
+    if not dict_schemes:
+        return {"sample": 0}
+    compact = [CompactScheme.from_dict(s) for s in dict_schemes]
+    before = deep_sizeof(dict_schemes, set()) - sys.getsizeof(dict_schemes)
+    after = deep_sizeof(compact, set()) - sys.getsizeof(compact)
+    for c in compact:
+        c.release()
+    return {
+        "sample": len(dict_schemes),
+        "dict_bytes_per_scheme": round(before / len(dict_schemes)),
+        "compact_bytes_per_scheme": round(after / len(compact)),
+        "saving_pct": round((1 - after / before) * 100, 1) if before else 0.0,
+    }
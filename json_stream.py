@@ -0,0 +1,318 @@
+import re
+import json
+import codecs
+
+_STRUCT = re.compile(r'[{}\[\]"]')
+_STR_SPECIAL = re.compile(r'["\\]')
+_ARRAY_START = re.compile(r"\[\s*([{\]])?")
+_NON_BLANK = re.compile(r"\S")
+_ELEMENT = re.compile(r"[^\s,]")  # next element, or the closing "]"
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+_SCALAR = re.compile(r'[^\s,\[\]{}"]+')
+_decoder = json.JSONDecoder()
+
+
+class BadElement:
+    """Placeholder that feed() returns, with mark_errors=True, where an element was skipped."""
+
+    __slots__ = ("reason",)
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def __repr__(self):
+        return f"BadElement({self.reason!r})"
+
+
+class ArrayObjectParser:
+    """
+    Incremental parser for a JSON array of objects, fed text in arbitrary
+    chunks. Each top-level object is returned from feed() as soon as its
+    closing brace arrives. Only the current element is buffered.
+
+    With chatter=True (model output) text before the array is dropped, and
+    the array starts at the first "[" whose next non-blank character is "{"
+    or "]", so a bracket in the chatter ("Here you go [list]: [...]") is
+    skipped. With chatter=False the input must start with the array.
+
+    Strings, numbers and nested arrays are tokenized as elements, so a "]"
+    inside a string does not end the array. Every element that is not an
+    object, and every object that fails to parse, is counted in .errors and
+    skipped; the objects around it are still returned. Once the array has
+    closed, .rest holds the text that followed "]" in the same chunk. With
+    mark_errors=True a BadElement is returned in place of each skipped one.
+    """
+
+    def __init__(self, max_object_chars: int = None, chatter: bool = True, mark_errors: bool = False):
+        self.max_object_chars = max_object_chars
+        self.chatter = chatter
+        self.mark_errors = mark_errors
+        self.rest = ""
+        self.text = ""
+        self.i = 0
+        self.start = 0
+        self.depth = 0
+        self.in_str = False
+        self.started = False
+        self.done = False
+        self.errors = 0
+        self.count = 0
+
+    def feed(self, chunk: str) -> list:
+        out = []
+        text = self.text + chunk  # self.text only holds the unconsumed tail
+        i = self.i
+        while not self.done:
+            if self.depth == 0:
+                if not self.started and not self.chatter:
+                    m = _NON_BLANK.search(text, i)
+                    if not m:
+                        i = len(text)
+                        break
+                    if m.group() != "[":
+                        raise ValueError("JSON must be an array")
+                    self.started = True
+                    i = m.end()
+                    continue
+                if not self.started:
+                    m = _ARRAY_START.search(text, i)
+                    if not m:
+                        i = len(text)
+                        break
+                    if m.group(1):
+                        self.started = True
+                        i = m.start(1)
+                    elif m.end() == len(text):
+                        i = m.start()  # only blanks after the "[" so far; decide on the next chunk
+                        break
+                    else:
+                        i = m.start() + 1
+                    continue
+                m = _ELEMENT.search(text, i)
+                if not m:
+                    i = len(text)
+                    break
+                c = m.group()
+                if c == "]":
+                    self.done = True
+                    self.rest = text[m.end():]
+                    break
+                if c == '"' or c not in "{[":
+                    # a string or scalar element: skip it whole, or wait for the rest of it
+                    tok = (_STRING if c == '"' else _SCALAR).match(text, m.start())
+                    if tok is None and c != '"':
+                        tok = m  # a stray "}" or similar
+                    if tok is None or (c != '"' and tok.end() == len(text)):
+                        i = m.start()
+                        break
+                    what = "a string" if c == '"' else repr(text[tok.start():tok.end()][:40])
+                    self._bad(f"expected an object, got {what}", out)
+                    i = tok.end()
+                    continue
+                if c == "[":
+                    # nested array: scan to its close; _emit counts it as an error
+                    self.start = m.start()
+                    i = m.end()
+                    self.depth = 1
+                    continue
+                # fast path: a complete, valid object decodes in one C call
+                try:
+                    obj, end = _decoder.raw_decode(text, m.start())
+                except ValueError:
+                    pass
+                else:
+                    self.count += 1
+                    out.append(obj)
+                    i = end
+                    continue
+                # incomplete or malformed: scan for its closing brace
+                self.start = m.start()
+                i = m.end()
+                self.depth = 1
+                continue
+
+            if self.in_str:
+                m = _STR_SPECIAL.search(text, i)
+                if not m:
+                    i = len(text)
+                    break
+                if m.group() == "\\":
+                    if m.end() >= len(text):
+                        i = m.start()  # escape split across chunks; rescan next time
+                        break
+                    i = m.end() + 1
+                    continue
+                self.in_str = False
+                i = m.end()
+                continue
+
+            m = _STRUCT.search(text, i)
+            if not m:
+                i = len(text)
+                break
+            c = m.group()
+            i = m.end()
+            if c == '"':
+                self.in_str = True
+            elif c in "{[":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    self._emit(text[self.start:i], out)
+
+        # Offsets instead of re-slicing after every object keeps large chunks linear
+        if self.done:
+            self.text, self.i = "", 0
+        elif self.depth:
+            self.text, self.i, self.start = text[self.start:], i - self.start, 0
+        else:
+            self.text, self.i = text[i:], 0
+        if self.max_object_chars and len(self.text) > self.max_object_chars:
+            raise ValueError(f"JSON element larger than {self.max_object_chars} characters")
+        return out
+
+    def _emit(self, raw: str, out: list):
+        try:
+            obj = json.loads(raw)
+        except ValueError:
+            self._bad("malformed JSON object", out)
+            return
+        if isinstance(obj, dict):
+            self.count += 1
+            out.append(obj)
+        else:
+            self._bad(f"expected an object, got {type(obj).__name__}", out)
+
+    def _bad(self, reason: str, out: list):
+        self.errors += 1
+        if self.mark_errors:
+            out.append(BadElement(reason))
+
+    def close(self) -> list:
+        """Call at end of input; a half-received element counts as an error (and is marked)."""
+        out = []
+        if self.depth or (self.started and not self.done and self.text[self.i:].strip(" \t\r\n,")):
+            self._bad("input ended inside an element", out)
+        self.text, self.i, self.depth, self.in_str = "", 0, 0, False
+        return out
+
+
+def iter_array_objects(chunks, max_object_chars: int = None):
+    """Yields objects from an iterable of text chunks; returns the parser's error count."""
+    parser = ArrayObjectParser(max_object_chars)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+    return parser.errors
+
+
+class RecordStream:
+    """
+    Objects from a JSON array (fmt="json") or from JSONL (fmt="jsonl"),
+    arriving as text chunks. The caller picks the format from the file
+    extension or mimetype; a "json" input that is not an array is rejected.
+    Iterating yields one dict at a time; only the current object or line is
+    buffered. .count / .errors are updated as it goes (elements that are not
+    objects count as errors), .truncated is set when the input ends inside
+    the array or inside an object, and .trailing when anything but
+    whitespace follows the array.
+    """
+
+    def __init__(self, chunks, max_object_chars: int = None, fmt: str = "json"):
+        if fmt not in ("json", "jsonl"):
+            raise ValueError(f"unknown record format {fmt!r}")
+        self.chunks = chunks
+        self.max_object_chars = max_object_chars
+        self.format = fmt
+        self.count = 0
+        self.errors = 0
+        self.truncated = False
+        self.trailing = False
+
+    def __iter__(self):
+        chunks = iter(self.chunks)
+        head = ""
+        for chunk in chunks:
+            head += chunk
+            if head.strip():
+                break
+        head = head.lstrip()
+        if not head:
+            raise ValueError("empty input")
+        if self.format == "jsonl":
+            yield from self._iter_lines(head, chunks)
+        elif head[0] == "[":
+            yield from self._iter_array(head, chunks)
+        else:
+            raise ValueError("JSON must be an array of scheme objects")
+
+    def _iter_array(self, head: str, chunks):
+        parser = ArrayObjectParser(self.max_object_chars, chatter=False)
+        for chunk in _chain(head, chunks):
+            for obj in parser.feed(chunk):
+                self.count += 1
+                yield obj
+            self.errors = parser.errors
+            if parser.done:
+                break
+        truncated = not parser.done
+        parser.close()
+        self.errors = parser.errors
+        self.truncated = truncated
+        if parser.done:
+            self.trailing = bool(parser.rest.strip()) or any(chunk.strip() for chunk in chunks)
+
+    def _iter_lines(self, head: str, chunks):
+        buf = ""
+        for chunk in _chain(head, chunks):
+            buf += chunk
+            lines = buf.split("\n")
+            buf = lines.pop()
+            if self.max_object_chars and len(buf) > self.max_object_chars:
+                raise ValueError(f"JSON line longer than {self.max_object_chars} characters")
+            for line in lines:
+                obj = self._parse_line(line)
+                if obj is not None:
+                    yield obj
+        obj = self._parse_line(buf, last=True)
+        if obj is not None:
+            yield obj
+
+    def _parse_line(self, line: str, last: bool = False):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            self.errors += 1
+            self.truncated = last  # a cut-off final line means the upload was cut short
+            return None
+        if not isinstance(obj, dict):
+            self.errors += 1
+            return None
+        self.count += 1
+        return obj
+
+
+def _chain(head: str, chunks):
+    yield head
+    yield from chunks
+
+
+def iter_text(stream, chunk_size: int = 256 * 1024, stats: dict = None):
+    """Decodes a binary file-like object as UTF-8 in chunks; stats["bytes"] tracks bytes read."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        if stats is not None:
+            stats["bytes"] = stats.get("bytes", 0) + len(data)
+        text = decoder.decode(data)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
@@ -1,43 +1,75 @@
 import os
+import re
+import csv
+import sys
 import tempfile
 import time
 import asyncio
+import hashlib
+import importlib
 import inspect
 import json
+import argparse
+import threading
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-from gtts import gTTS
-import pygame
 import requests
 
-# Optional mic support
-try:
-    import speech_recognition as sr
-    HAS_SR = True
-except ImportError:
-    HAS_SR = False
-
-try:
-    from googletrans import Translator
-except ImportError:
-    raise SystemExit("googletrans not installed. Run: pip install googletrans==4.0.0-rc1")
-
-# Optional PDF support (for reading scheme file locally)
-try:
-    from pypdf import PdfReader
-    PDF_OK = True
-except Exception:
-    PDF_OK = False
-
-# Optional DOCX support
-try:
-    import docx
-    DOCX_OK = True
-except Exception:
-    DOCX_OK = False
-
-translator = Translator()
+from json_stream import ArrayObjectParser, BadElement
 
 DEFAULT_APP_BASE_URL = "http://127.0.0.1:5000"  # Your Flask app.py
+NOTICE_ITEMS = 10  # schemes / questions spoken per section
+NO_RESULT_KN = "ಯಾವುದೇ ಫಲಿತಾಂಶ ಲಭ್ಯವಿಲ್ಲ."
+DEFAULT_DAEMON_PORT = 8765
+DAEMON_TRANSLATORS = 4  # warm googletrans clients the daemon's handler threads share
+TRANSLATION_CACHE = 4096
+
+
+# ---------------------------
+# Lazy dependencies (each mode imports only what it uses)
+# ---------------------------
+_modules = {}
+_translator = None
+_session = None
+_mixer_warm = False  # daemon mode keeps the pygame mixer open between clips
+
+
+def _optional(module: str):
+    """Imports module on first use; None if it is not installed."""
+    if module not in _modules:
+        try:
+            _modules[module] = importlib.import_module(module)
+        except ImportError:
+            _modules[module] = None
+    return _modules[module]
+
+
+def _require(module: str, install: str):
+    mod = _optional(module)
+    if mod is None:
+        raise RuntimeError(f"{module} not installed. Run: pip install {install}")
+    return mod
+
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        gt = _optional("googletrans")
+        if gt is None:
+            raise SystemExit("googletrans not installed. Run: pip install googletrans==4.0.0-rc1")
+        _translator = gt.Translator()
+    return _translator
+
+
+def get_session() -> requests.Session:
+    """One keep-alive session to app.py, reused by every call_check / check_app_health."""
+    global _session
+    if _session is None:
+        _session = _pooled_session(4)
+    return _session
 
 
 # ---------------------------
@@ -70,6 +102,10 @@ def translate_to_kannada(text: str) -> str:
     """
     if not text:
         return ""
+    return _translate_with(get_translator(), text)
+
+
+def _translate_with(translator, text: str) -> str:
     result = translator.translate(text, dest="kn")
     if inspect.iscoroutine(result):
         result = _run_async(result)
@@ -81,26 +117,37 @@ def speak_kannada(kannada_text: str):
     if not kannada_text.strip():
         return
 
-    tts = gTTS(text=kannada_text, lang="kn")
+    tts = _require("gtts", "gTTS").gTTS(text=kannada_text, lang="kn")
 
     with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
         audio_path = fp.name
         tts.save(audio_path)
 
-    pygame.mixer.init()
+    play_mp3(audio_path)
+    os.remove(audio_path)
+
+
+def play_mp3(audio_path: str):
+    pygame = _require("pygame", "pygame")
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
     pygame.mixer.music.load(audio_path)
     pygame.mixer.music.play()
 
     while pygame.mixer.music.get_busy():
         time.sleep(0.1)
 
-    pygame.mixer.quit()
-    os.remove(audio_path)
+    if _mixer_warm:
+        if hasattr(pygame.mixer.music, "unload"):
+            pygame.mixer.music.unload()  # release the file, keep the device open
+    else:
+        pygame.mixer.quit()
 
 
 def listen_english() -> str:
     """Listen from microphone and convert English speech to text."""
-    if not HAS_SR:
+    sr = _optional("speech_recognition")
+    if sr is None:
         print("❌ SpeechRecognition not installed. Use text mode or install it:")
         print("   pip install SpeechRecognition")
         return ""
@@ -125,8 +172,7 @@ def listen_english() -> str:
 # Local file reading (scheme file -> text)
 # ---------------------------
 def read_docx(path: str) -> str:
-    if not DOCX_OK:
-        raise RuntimeError("python-docx not installed. Run: pip install python-docx")
+    docx = _require("docx", "python-docx")
     d = docx.Document(path)
     parts = []
     for p in d.paragraphs:
@@ -142,9 +188,7 @@ def read_txt(path: str) -> str:
 
 
 def read_pdf(path: str) -> str:
-    if not PDF_OK:
-        raise RuntimeError("pypdf not installed. Run: pip install pypdf")
-    reader = PdfReader(path)
+    reader = _require("pypdf", "pypdf").PdfReader(path)
     out = []
     for page in reader.pages:
         try:
@@ -174,14 +218,14 @@ def read_scheme_file_any(path: str) -> str:
 # ---------------------------
 def check_app_health(base_url: str) -> bool:
     try:
-        r = requests.get(f"{base_url}/health", timeout=5)
+        r = get_session().get(f"{base_url}/health", timeout=5)
         return r.ok
     except Exception:
         return False
 
 
-def call_check(base_url: str, payload: dict) -> dict:
-    r = requests.post(f"{base_url}/check", json=payload, timeout=25)
+def call_check(base_url: str, payload: dict, session=None, params: dict = None) -> dict:
+    r = (session or get_session()).post(f"{base_url}/check", json=payload, params=params, timeout=25)
     r.raise_for_status()
     return r.json()
 
@@ -189,7 +233,8 @@ def call_check(base_url: str, payload: dict) -> dict:
 # ---------------------------
 # Kannada summary builders
 # ---------------------------
-def build_kannada_summary_from_check(resp: dict) -> str:
+def summary_segments(resp: dict) -> list:
+    """English (partly Kannada) lines of the spoken summary, before translation."""
     eligible = resp.get("eligible_schemes", []) or []
     not_eligible = resp.get("not_eligible_schemes", []) or []
     missing_questions = resp.get("missing_questions", []) or []
@@ -198,7 +243,7 @@ def build_kannada_summary_from_check(resp: dict) -> str:
 
     if eligible:
         parts.append("ನೀವು ಅರ್ಹರಾಗಿರುವ ಯೋಜನೆಗಳು:")
-        for s in eligible[:10]:
+        for s in eligible[:NOTICE_ITEMS]:
             name = s.get("scheme_name", "ಯೋಜನೆ")
             ben = s.get("benefits", "")
             # Keep TTS short
@@ -208,7 +253,7 @@ def build_kannada_summary_from_check(resp: dict) -> str:
 
     if not_eligible:
         parts.append("ನೀವು ಅರ್ಹರಾಗಿಲ್ಲದ ಯೋಜನೆಗಳು ಮತ್ತು ಕಾರಣಗಳು:")
-        for s in not_eligible[:10]:
+        for s in not_eligible[:NOTICE_ITEMS]:
             name = s.get("scheme_name", "ಯೋಜನೆ")
             parts.append(f"- {name}.")
             reasons = s.get("reasons", []) or []
@@ -218,11 +263,16 @@ def build_kannada_summary_from_check(resp: dict) -> str:
 
     if missing_questions:
         parts.append("ಇನ್ನಷ್ಟು ಮಾಹಿತಿಯ ಅಗತ್ಯವಿದೆ. ದಯವಿಟ್ಟು ಕೆಳಗಿನ ಪ್ರಶ್ನೆಗಳಿಗೆ ಉತ್ತರಿಸಿ:")
-        for q in missing_questions[:10]:
+        for q in missing_questions[:NOTICE_ITEMS]:
             parts.append(f"- {q.get('question', q.get('key', 'ಪ್ರಶ್ನೆ'))}")
 
+    return parts
+
+
+def build_kannada_summary_from_check(resp: dict) -> str:
+    parts = summary_segments(resp)
     if not parts:
-        return "ಯಾವುದೇ ಫಲಿತಾಂಶ ಲಭ್ಯವಿಲ್ಲ."
+        return NO_RESULT_KN
 
     # This summary is still English in parts (scheme names/reasons). We translate it fully below.
     english_text = "\n".join(parts)
@@ -373,7 +423,572 @@ def chunk_text(text: str, max_len: int):
     return chunks
 
 
+# ---------------------------
+# Headless batch notices
+# ---------------------------
+BASIC_PROFILE_FIELDS = ("age", "income", "bpl", "category", "gender", "residence_type", "disability", "disability_percentage")
+BOOL_FIELDS = ("bpl", "disability")
+TEXT_FIELDS = ("category", "gender", "residence_type")
+ID_FIELDS = ("id", "beneficiary_id", "profile_id")
+
+
+def _coerce(v, key: str):
+    """
+    CSV cells are strings. Yes/no columns become bools (y/n only for the
+    basic bool fields, so gender "N" stays "N"), numbers become numbers and
+    the text fields are kept as text.
+    """
+    if not isinstance(v, str):
+        return v
+    s = v.strip()
+    if s == "":
+        return None
+    if key in TEXT_FIELDS:
+        return s
+    flags = ("true", "yes", "y", "false", "no", "n") if key in BOOL_FIELDS else ("true", "yes", "false", "no")
+    if s.lower() in flags:
+        return s.lower() in ("true", "yes", "y")
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return s
+
+
+def _safe_id(pid: str) -> str:
+    """File-name-safe id; a hash suffix keeps ids that only differ in replaced characters apart."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", pid)
+    if safe != pid:
+        safe = f"{safe}-{hashlib.sha1(pid.encode('utf-8')).hexdigest()[:8]}"
+    return safe
+
+
+def profile_from_row(row: dict, n: int) -> tuple:
+    """(profile id, /check payload) from a CSV row or JSON object; extra columns go to "extra"."""
+    pid = next((str(row[k]).strip() for k in ID_FIELDS if str(row.get(k) or "").strip()), f"row{n}")
+    payload = {"extra": dict(row.get("extra") or {})}
+    for k, v in row.items():
+        if k in ID_FIELDS or k == "extra" or k is None:
+            continue
+        v = _coerce(v, k)
+        if k in BASIC_PROFILE_FIELDS:
+            payload[k] = v
+        elif v is not None:
+            payload["extra"][k] = v
+    return _safe_id(pid), payload
+
+
+def _profile_or_error(row, n: int) -> tuple:
+    try:
+        if not isinstance(row, dict):
+            raise ValueError(f"expected an object, got {type(row).__name__}")
+        return profile_from_row(row, n) + (None,)
+    except Exception as e:
+        return f"row{n}", None, str(e)
+
+
+def iter_profiles(path: str):
+    """
+    Yields (id, payload, error) from CSV, JSONL or a JSON array. A row that
+    cannot be parsed comes through as ("row<n>", None, error) so the batch
+    records it and carries on.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if ext == ".csv":
+            for n, row in enumerate(csv.DictReader(f), 1):
+                yield _profile_or_error(row, n)
+        elif ext == ".json":
+            # element by element, so one bad element does not sink the file
+            parser = ArrayObjectParser(chatter=False, mark_errors=True)
+            n = 0
+            try:
+                for line in f:
+                    for obj in parser.feed(line):
+                        n += 1
+                        if isinstance(obj, BadElement):
+                            yield f"row{n}", None, obj.reason
+                        else:
+                            yield _profile_or_error(obj, n)
+            except ValueError:
+                raise ValueError(f"{path} is not a JSON array of profiles") from None
+            for bad in parser.close():
+                n += 1
+                yield f"row{n}", None, bad.reason
+            if not parser.started:
+                raise ValueError(f"{path} is not a JSON array of profiles")
+        else:
+            for n, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield f"row{n}", None, f"malformed JSON line: {e}"
+                    continue
+                yield _profile_or_error(row, n)
+
+
+class BatchState:
+    """
+    On-disk state of a batch run, so an interrupted run resumes where it stopped:
+      manifest.jsonl      one line per finished profile (last line per id wins)
+      translations.jsonl  English segment -> Kannada, shared by all profiles
+      segments/           one mp3 per distinct Kannada segment
+    """
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.segment_dir = os.path.join(out_dir, "segments")
+        os.makedirs(self.segment_dir, exist_ok=True)
+        self.manifest_path = os.path.join(out_dir, "manifest.jsonl")
+        self.translations_path = os.path.join(out_dir, "translations.jsonl")
+        self.lock = threading.Lock()
+        self.done = {}
+        self.translations = {}
+        for rec in self._read_jsonl(self.manifest_path):
+            self.done[rec["id"]] = rec
+        for rec in self._read_jsonl(self.translations_path):
+            self.translations[rec["en"]] = rec["kn"]
+
+    @staticmethod
+    def _read_jsonl(path: str):
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    pass  # a line cut off by a crash
+
+    def _append(self, path: str, rec: dict):
+        with self.lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def is_done(self, pid: str) -> bool:
+        return self.done.get(pid, {}).get("status") == "ok"
+
+    def record(self, rec: dict):
+        self.done[rec["id"]] = rec
+        self._append(self.manifest_path, rec)
+
+    def add_translation(self, en: str, kn: str):
+        self.translations[en] = kn
+        self._append(self.translations_path, {"en": en, "kn": kn})
+
+    def segment_audio_path(self, kn: str) -> str:
+        return os.path.join(self.segment_dir, hashlib.sha1(kn.encode("utf-8")).hexdigest() + ".mp3")
+
+
+_thread_local = threading.local()
+
+
+def _translate_in_thread(text: str) -> str:
+    # googletrans clients are not shared between worker threads
+    t = getattr(_thread_local, "translator", None)
+    if t is None:
+        t = _thread_local.translator = _require("googletrans", "googletrans==4.0.0-rc1").Translator()
+    return _translate_with(t, text)
+
+
+def _atomic_write(path: str, write):
+    tmp = path + ".part"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _synthesize_segment(kn: str, path: str):
+    if not os.path.exists(path):
+        gtts = _require("gtts", "gTTS")
+        _atomic_write(path, lambda f: gtts.gTTS(text=kn, lang="kn").write_to_fp(f))
+
+
+def _pooled_session(workers: int) -> requests.Session:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _check_for_notice(base_url: str, session, payload: dict) -> dict:
+    """Two small /check pages instead of the full response; older servers ignore the params."""
+    resp = call_check(base_url, payload, session, {"sections": "eligible", "limit": NOTICE_ITEMS})
+    rest = call_check(base_url, payload, session, {"sections": "not_eligible,questions", "limit": NOTICE_ITEMS})
+    resp.update({k: rest[k] for k in ("not_eligible_schemes", "missing_questions") if k in rest})
+    return resp
+
+
+def run_batch(profiles_path: str, out_dir: str, base_url: str, check_workers: int = 8,
+              translate_workers: int = 4, tts_workers: int = 4, audio: bool = True, chunk: int = 200) -> dict:
+    """
+    Kannada notices for every profile in profiles_path: <out_dir>/<id>.kn.txt
+    (and <id>.mp3). Profiles go through in chunks: concurrent /check over a
+    pooled session, then each new distinct segment is translated once and
+    synthesized once, and each notice is assembled from the shared pieces.
+    Profiles already marked ok in the manifest are skipped.
+    """
+    state = BatchState(out_dir)
+    session = _pooled_session(check_workers)
+    totals = {"profiles": 0, "ok": 0, "errors": 0, "skipped": 0, "checks": 0,
+              "segments_translated": 0, "segments_synthesized": 0}
+    t0 = time.perf_counter()
+
+    check_pool = ThreadPoolExecutor(max_workers=check_workers)
+    translate_pool = ThreadPoolExecutor(max_workers=translate_workers)
+    tts_pool = ThreadPoolExecutor(max_workers=tts_workers)
+    try:
+        pending = []
+        for pid, payload, error in iter_profiles(profiles_path):
+            totals["profiles"] += 1
+            if state.is_done(pid):
+                totals["skipped"] += 1
+                continue
+            if error:
+                rec = {"id": pid, "status": "error", "stage": "parse", "error": error}
+                if state.done.get(pid) != rec:
+                    state.record(rec)
+                totals["errors"] += 1
+                continue
+            pending.append((pid, payload))
+            if len(pending) >= chunk:
+                _run_chunk(pending, state, base_url, session, check_pool, translate_pool, tts_pool, audio, totals)
+                pending = []
+                _print_progress(totals, t0)
+        if pending:
+            _run_chunk(pending, state, base_url, session, check_pool, translate_pool, tts_pool, audio, totals)
+    finally:
+        check_pool.shutdown()
+        translate_pool.shutdown()
+        tts_pool.shutdown()
+        session.close()
+
+    totals["elapsed_sec"] = round(time.perf_counter() - t0, 2)
+    done = totals["ok"] + totals["errors"]
+    totals["profiles_per_min"] = round(done * 60 / totals["elapsed_sec"], 1) if totals["elapsed_sec"] else 0.0
+    return totals
+
+
+def _run_chunk(pending, state, base_url, session, check_pool, translate_pool, tts_pool, audio, totals):
+    # 1) /check concurrently
+    futures = [(pid, check_pool.submit(_check_for_notice, base_url, session, payload)) for pid, payload in pending]
+    results = []
+    for pid, fut in futures:
+        try:
+            results.append((pid, summary_segments(fut.result())))
+            totals["checks"] += 1
+        except Exception as e:
+            state.record({"id": pid, "status": "error", "stage": "check", "error": str(e)})
+            totals["errors"] += 1
+
+    # 2) translate each distinct segment once (cached across chunks and runs)
+    new = sorted({seg for _pid, segs in results for seg in segs if seg not in state.translations})
+    failed = {}
+    for en, fut in [(en, translate_pool.submit(_translate_in_thread, en)) for en in new]:
+        try:
+            state.add_translation(en, fut.result())
+            totals["segments_translated"] += 1
+        except Exception as e:
+            failed[en] = e
+    if failed:
+        print(f"  ❌ {len(failed)} segment translations failed ({next(iter(failed.values()))})")
+
+    notices = []
+    for pid, segs in results:
+        if any(seg in failed for seg in segs):
+            state.record({"id": pid, "status": "error", "stage": "translate", "error": "segment translation failed"})
+            totals["errors"] += 1
+        else:
+            notices.append((pid, [state.translations[seg] for seg in segs] or [NO_RESULT_KN]))
+
+    # 3) synthesize each distinct Kannada segment once
+    bad_audio = {}
+    if audio:
+        kn_new = {kn for _pid, kn_segs in notices for kn in kn_segs if kn.strip()}
+        kn_new = [kn for kn in kn_new if not os.path.exists(state.segment_audio_path(kn))]
+        for kn, fut in [(kn, tts_pool.submit(_synthesize_segment, kn, state.segment_audio_path(kn))) for kn in kn_new]:
+            try:
+                fut.result()
+                totals["segments_synthesized"] += 1
+            except Exception as e:
+                bad_audio[kn] = e
+        if bad_audio:
+            print(f"  ❌ {len(bad_audio)} segment syntheses failed ({next(iter(bad_audio.values()))})")
+
+    # 4) assemble notices from the shared pieces
+    for pid, kn_segs in notices:
+        if audio and any(kn in bad_audio for kn in kn_segs):
+            state.record({"id": pid, "status": "error", "stage": "tts", "error": "segment synthesis failed"})
+            totals["errors"] += 1
+            continue
+        rec = {"id": pid, "status": "ok", "segments": len(kn_segs)}
+        text_path = os.path.join(state.out_dir, f"{pid}.kn.txt")
+        _atomic_write(text_path, lambda f: f.write("\n".join(kn_segs).encode("utf-8")))
+        rec["text"] = os.path.basename(text_path)
+        if audio:
+            # MP3 frames concatenate cleanly, so a notice is its segment files back to back
+            audio_path = os.path.join(state.out_dir, f"{pid}.mp3")
+            paths = [state.segment_audio_path(kn) for kn in kn_segs if kn.strip()]
+            _atomic_write(audio_path, lambda f: _concat_files(paths, f))
+            rec["audio"] = os.path.basename(audio_path)
+        state.record(rec)
+        totals["ok"] += 1
+
+
+def _concat_files(paths: list, out):
+    for path in paths:
+        with open(path, "rb") as f:
+            out.write(f.read())
+
+
+def _print_progress(totals: dict, t0: float):
+    elapsed = time.perf_counter() - t0
+    done = totals["ok"] + totals["errors"]
+    rate = done * 60 / elapsed if elapsed else 0.0
+    print(f"  ✅ {done} notices ({totals['errors']} errors, {totals['skipped']} already done) - {rate:.1f} profiles/min")
+
+
+# ---------------------------
+# Warm daemon (kiosk mode)
+# ---------------------------
+class Daemon:
+    """
+    Long-running local service: the translator, gTTS, the pygame mixer and a
+    keep-alive session to app.py are loaded once, so each kiosk interaction
+    only pays for the network calls it actually needs. Audio is played by a
+    single background player so requests return as soon as the clip is ready.
+    Handler threads borrow one of a few warm translators, so uncached lines
+    for different visitors are translated in parallel.
+    """
+
+    ROUTES = ("/translate", "/speak", "/check")
+
+    def __init__(self, base_url: str, audio: bool = True, translators: int = DAEMON_TRANSLATORS):
+        self.base_url = base_url
+        self.audio = audio
+        self.started = time.time()
+        self.clips = queue.Queue()
+        self.stats = {"requests": 0, "checks": 0, "translations": 0, "clips": 0, "errors": 0}
+        self.lock = threading.Lock()  # guards stats and the translation cache, never held across a call
+        self.cache = OrderedDict()    # English line -> Kannada, least recently used first
+        self.n_translators = max(1, translators)
+        self.translators = queue.Queue()  # googletrans clients are not shared between threads
+
+    def count(self, key: str, n: int = 1):
+        with self.lock:
+            self.stats[key] += n
+
+    def warm_up(self):
+        global _mixer_warm
+        self.translators.put(get_translator())
+        gt = _require("googletrans", "googletrans==4.0.0-rc1")
+        for _ in range(self.n_translators - 1):
+            self.translators.put(gt.Translator())
+        self.app_ok = check_app_health(self.base_url)  # also opens the pooled connection
+        if self.audio:
+            _require("gtts", "gTTS")
+            _require("pygame", "pygame").mixer.init()
+            _mixer_warm = True
+            threading.Thread(target=self._player, daemon=True).start()
+
+    def translate(self, text: str) -> str:
+        if not text:
+            return ""
+        with self.lock:
+            kn = self.cache.get(text)
+            if kn is not None:
+                self.cache.move_to_end(text)
+                return kn
+        translator = self.translators.get()
+        try:
+            kn = _translate_with(translator, text)
+        finally:
+            self.translators.put(translator)
+        with self.lock:
+            self.stats["translations"] += 1
+            self.cache[text] = kn
+            if len(self.cache) > TRANSLATION_CACHE:
+                self.cache.popitem(last=False)
+        return kn
+
+    def translate_lines(self, lines: list) -> str:
+        # headings, scheme names and benefits repeat between visitors; translate line by line so they cache
+        return "\n".join(self.translate(line) for line in lines) if lines else NO_RESULT_KN
+
+    def speak(self, kannada_text: str):
+        if not self.audio or not kannada_text.strip():
+            return
+        for ch in chunk_text(kannada_text, 900):
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
+                _optional("gtts").gTTS(text=ch, lang="kn").write_to_fp(fp)
+            self.clips.put(fp.name)
+
+    def _player(self):
+        while True:
+            path = self.clips.get()
+            try:
+                play_mp3(path)
+                self.count("clips")
+            except Exception as e:
+                print("❌ playback error:", e)
+            finally:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def handle(self, route: str, body: dict) -> dict:
+        """Runs one of ROUTES; the caller answers 404 for anything else."""
+        self.count("requests")
+        if route == "/translate":
+            return {"kannada": self.translate(str(body.get("text", "")))}
+        if route == "/speak":
+            text = str(body.get("text", ""))
+            kn = self.translate(text) if body.get("translate", True) else text
+            self.speak(kn)
+            return {"kannada": kn, "queued": self.audio}
+        if route == "/check":
+            profile = body.get("profile", body)
+            resp = call_check(self.base_url, profile)
+            self.count("checks")
+            kn = self.translate_lines(summary_segments(resp))
+            if body.get("speak", True):
+                self.speak(kn)
+            return {
+                "kannada_summary": kn,
+                "eligible": [s.get("scheme_name") for s in resp.get("eligible_schemes", [])],
+                "missing_fields": resp.get("missing_fields", []),
+            }
+        raise ValueError(f"unknown route {route}")
+
+    def health(self) -> dict:
+        with self.lock:
+            stats, cached = dict(self.stats), len(self.cache)
+        return {
+            "ok": True,
+            "app_base_url": self.base_url,
+            "app_reachable": check_app_health(self.base_url),
+            "audio": self.audio,
+            "queued_clips": self.clips.qsize(),
+            "cached_translations": cached,
+            "uptime_sec": round(time.time() - self.started, 1),
+            **stats,
+        }
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    daemon = None
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, code: int, obj: dict):
+        out = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            return self._json(200, self.daemon.health())
+        self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self.close_connection = True  # the body cannot be skipped reliably
+            return self._json(400, {"error": "invalid Content-Length"})
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._json(400, {"error": "invalid JSON"})
+        if not isinstance(body, dict):
+            return self._json(400, {"error": "request body must be a JSON object"})
+        route = self.path.rstrip("/")
+        if route not in self.daemon.ROUTES:
+            return self._json(404, {"error": "not found"})
+        t0 = time.perf_counter()
+        try:
+            out = self.daemon.handle(route, body)
+        except Exception as e:
+            self.daemon.count("errors")
+            return self._json(502, {"error": str(e)})
+        out["took_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        self._json(200, out)
+
+
+def serve_main(argv: list):
+    p = argparse.ArgumentParser(description="Warm Kannada companion service for kiosks.")
+    p.add_argument("--serve", action="store_true", required=True)
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=DEFAULT_DAEMON_PORT)
+    p.add_argument("--base-url", default=DEFAULT_APP_BASE_URL)
+    p.add_argument("--no-audio", action="store_true", help="translate only; never touch the sound device")
+    p.add_argument("--translators", type=int, default=DAEMON_TRANSLATORS, help="warm translators for concurrent requests")
+    args = p.parse_args(argv)
+
+    daemon = Daemon(args.base_url, audio=not args.no_audio, translators=args.translators)
+    t0 = time.perf_counter()
+    daemon.warm_up()
+    if not daemon.app_ok:
+        print(f"⚠️  Flask app not reachable at {args.base_url} yet; /check will fail until it is.")
+    DaemonHandler.daemon = daemon
+    srv = ThreadingHTTPServer((args.host, args.port), DaemonHandler)
+    srv.daemon_threads = True
+    print(f"✅ Kannada companion warm in {time.perf_counter() - t0:.1f}s on http://{args.host}:{args.port} "
+          "(POST /check, /translate, /speak; GET /health)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+
+
+def batch_main(argv: list):
+    p = argparse.ArgumentParser(description="Headless Kannada eligibility notices for a list of profiles.")
+    p.add_argument("--batch", metavar="PROFILES", required=True, help="CSV, JSONL or JSON array of profiles")
+    p.add_argument("--out", default="notices", help="output directory (re-run with the same one to resume)")
+    p.add_argument("--base-url", default=DEFAULT_APP_BASE_URL)
+    p.add_argument("--check-workers", type=int, default=8)
+    p.add_argument("--translate-workers", type=int, default=4)
+    p.add_argument("--tts-workers", type=int, default=4)
+    p.add_argument("--chunk", type=int, default=200, help="profiles per pipeline round")
+    p.add_argument("--no-audio", action="store_true", help="write Kannada text only")
+    args = p.parse_args(argv)
+
+    if not check_app_health(args.base_url):
+        raise SystemExit(f"❌ Flask app not reachable at {args.base_url}. Start app.py first.")
+
+    print(f"\n🔄 Generating notices for {args.batch} -> {args.out}/")
+    totals = run_batch(args.batch, args.out, args.base_url, args.check_workers, args.translate_workers,
+                       args.tts_workers, audio=not args.no_audio, chunk=max(1, args.chunk))
+    print(f"\n✅ {totals['ok']} notices, {totals['errors']} errors, {totals['skipped']} already done "
+          f"in {totals['elapsed_sec']}s ({totals['profiles_per_min']} profiles/min)")
+    print(f"   {totals['segments_translated']} segments translated, {totals['segments_synthesized']} synthesized")
+    if totals["errors"]:
+        print("   Re-run the same command to retry the failed profiles.")
+
+
 def main():
+    if len(sys.argv) > 1:
+        if "--serve" in sys.argv:
+            serve_main(sys.argv[1:])
+        else:
+            batch_main(sys.argv[1:])
+        return
+
     print("\n========== Kannada Companion (for app.py) ==========")
     print("This tool works alongside your Flask app.py.")
     print("\nChoose:")
@@ -0,0 +1,246 @@
+import json
+import math
+import urllib.parse
+import time
+import random
+import argparse
+import threading
+
+import requests
+
+# Concurrent driver for app.py. Replays a weighted mix of routes and reports
+# throughput and latency percentiles per route. Run the app against
+# mock_llm.py so text uploads never hit the real model endpoint.
+
+DEFAULT_BASE_URL = "http://127.0.0.1:5000"
+DEFAULT_MIX = "check=85,search=5,load_json=8,load_text=2"
+UPSERT_POOL = 200     # load_json requests upsert schemes with these fixed ids
+UPSERT_BATCH = 5
+
+CATEGORIES = ["General", "OBC", "SC", "ST"]
+GENDERS = ["Male", "Female", "Other"]
+RESIDENCE = ["Rural", "Urban"]
+
+SAMPLE_TEXT = """Scheme: Widow Pension Scheme
+Financial assistance of Rs 800 per month. Applicants should be widows belonging to BPL families, aged 18 years and above.
+
+Mukhyamantri Raitha Vidya Nidhi
+Applicants must hold a valid land record (RTC) in their own name; awards are decided by a district committee."""
+
+
+# -----------------------
+# Request builders
+# -----------------------
+def random_profile(rng: random.Random) -> dict:
+    disabled = rng.random() < 0.1
+    return {
+        "age": rng.randint(16, 85),
+        "income": rng.choice([0, 50000, 120000, 200000, 350000, 800000]),
+        "bpl": rng.random() < 0.35,
+        "category": rng.choice(CATEGORIES),
+        "gender": rng.choice(GENDERS),
+        "residence_type": rng.choice(RESIDENCE),
+        "disability": disabled,
+        "disability_percentage": rng.choice([40, 60, 80]) if disabled else None,
+    }
+
+def load_profiles(path: str) -> list:
+    """Profiles from JSONL (one object per line) or a JSON array."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def synthetic_schemes(rng: random.Random, n: int, pool: int = 0) -> list:
+    """
+    n schemes with ids loadtest-0 .. loadtest-(n-1), or n distinct ids drawn
+    from the first `pool`, so repeated merges update schemes instead of adding.
+    """
+    out = []
+    for k in (rng.sample(range(pool), min(n, pool)) if pool else range(n)):
+        criteria = {"age_min": rng.choice([18, 21, 60])}
+        if rng.random() < 0.5:
+            criteria["income_max"] = rng.choice([100000, 200000, 250000])
+        if rng.random() < 0.3:
+            criteria["category_allowed"] = rng.sample(CATEGORIES, 2)
+        if rng.random() < 0.3:
+            criteria["bpl_required"] = True
+        out.append({
+            "scheme_id": f"loadtest-{k}",
+            "scheme_name": f"Load Test Scheme {k}",
+            "benefits": "Synthetic benefit text",
+            "criteria": criteria,
+        })
+    return out
+
+
+class Driver:
+    def __init__(self, base_url: str, profiles: list, text: str, seed: int, check_params: dict = None,
+                 upsert_pool: int = UPSERT_POOL):
+        self.base_url = base_url.rstrip("/")
+        self.profiles = profiles
+        self.text = text
+        self.seed = seed
+        self.check_params = check_params or {}
+        self.upsert_pool = upsert_pool
+
+    def request(self, session: requests.Session, route: str, rng: random.Random, timeout: float):
+        if route == "check":
+            payload = rng.choice(self.profiles) if self.profiles else random_profile(rng)
+            return session.post(f"{self.base_url}/check", params=self.check_params, json=payload, timeout=timeout)
+        if route == "search":
+            q = rng.choice(["pension", "krishi", "scholarship", "widow", "farm", "disab"])
+            return session.get(f"{self.base_url}/search", params={"q": q}, timeout=timeout)
+        if route == "load_json":
+            data = {"paste_json": json.dumps(synthetic_schemes(rng, UPSERT_BATCH, self.upsert_pool)), "mode": "merge"}
+            return session.post(f"{self.base_url}/load_schemes", data=data, timeout=timeout)
+        if route == "load_text":
+            return session.post(f"{self.base_url}/load_schemes", data={"paste_text": self.text, "mode": "merge"}, timeout=timeout)
+        raise ValueError(f"unknown route {route}")
+
+    @staticmethod
+    def outcome(route: str, resp) -> str:
+        """"ok", "error", or "llm_error" for a text upload whose model call failed."""
+        if not resp.ok:
+            return "error"
+        if route == "load_text":
+            try:
+                extraction = resp.json().get("extraction") or {}
+            except ValueError:
+                return "error"
+            if extraction.get("llm_error"):
+                return "llm_error"
+        return "ok"
+
+
+# -----------------------
+# Stats
+# -----------------------
+def percentile(sorted_vals: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals), math.ceil(pct / 100 * len(sorted_vals))) - 1)
+    return sorted_vals[k]
+
+def summarize(results: dict, elapsed: float) -> dict:
+    out = {}
+    for route, (lat, errors, llm_errors) in sorted(results.items()):
+        lat = sorted(lat)
+        n = len(lat) + errors
+        out[route] = {
+            "requests": n,
+            "errors": errors,
+            "llm_errors": llm_errors,
+            "rps": round(n / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(lat, 50) * 1000, 1),
+            "p95_ms": round(percentile(lat, 95) * 1000, 1),
+            "p99_ms": round(percentile(lat, 99) * 1000, 1),
+            "max_ms": round((lat[-1] if lat else 0) * 1000, 1),
+        }
+    return out
+
+def print_report(summary: dict, elapsed: float, concurrency: int):
+    total = sum(r["requests"] for r in summary.values())
+    print(f"\n{total} requests in {elapsed:.1f}s with {concurrency} workers ({total / elapsed:.1f} req/s)\n")
+    print(f"{'route':<11}{'reqs':>7}{'errs':>6}{'llm':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for route, r in summary.items():
+        print(f"{route:<11}{r['requests']:>7}{r['errors']:>6}{r['llm_errors']:>6}{r['rps']:>9}"
+              f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['max_ms']:>9}")
+
+
+# -----------------------
+# Run
+# -----------------------
+def parse_mix(spec: str) -> list:
+    mix = []
+    for part in spec.split(","):
+        route, _, weight = part.partition("=")
+        if route.strip() and float(weight or 1) > 0:
+            mix.append((route.strip(), float(weight or 1)))
+    return mix
+
+def run(driver: Driver, mix: list, concurrency: int, duration: float, max_requests: int, timeout: float):
+    routes = [r for r, _ in mix]
+    weights = [w for _, w in mix]
+    results = {r: ([], 0, 0) for r in routes}  # latencies of ok requests, errors, of which LLM errors
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.monotonic() + duration
+
+    def worker(idx: int):
+        rng = random.Random(driver.seed + idx)
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            with lock:
+                if max_requests and issued[0] >= max_requests:
+                    return
+                issued[0] += 1
+            route = rng.choices(routes, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                outcome = driver.outcome(route, driver.request(session, route, rng, timeout))
+            except requests.RequestException:
+                outcome = "error"
+            dt = time.perf_counter() - t0
+            with lock:
+                lat, errors, llm_errors = results[route]
+                if outcome == "ok":
+                    lat.append(dt)
+                else:
+                    results[route] = (lat, errors + 1, llm_errors + (outcome == "llm_error"))
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.monotonic() - start
+
+
+def main():
+    p = argparse.ArgumentParser(description="Replay a /check + /load_schemes mix against app.py and report latency percentiles.")
+    p.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    p.add_argument("--mix", default=DEFAULT_MIX, help=f"route weights (default {DEFAULT_MIX})")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    p.add_argument("--requests", type=int, default=0, help="stop after this many requests (0 = duration only)")
+    p.add_argument("--timeout", type=float, default=120.0)
+    p.add_argument("--profiles", metavar="FILE", help="JSONL/JSON profiles for /check (default: random)")
+    p.add_argument("--text", metavar="FILE", help="document text for load_text requests")
+    p.add_argument("--check-params", default="", help='/check query string, e.g. "view=ids&limit=50"')
+    p.add_argument("--seed-schemes", type=int, default=200, help="synthetic schemes to load before the run (0 to skip)")
+    p.add_argument("--upsert-pool", type=int, default=UPSERT_POOL, help="distinct scheme ids load_json requests upsert")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = p.parse_args()
+
+    profiles = load_profiles(args.profiles) if args.profiles else []
+    text = SAMPLE_TEXT
+    if args.text:
+        with open(args.text, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+    check_params = dict(urllib.parse.parse_qsl(args.check_params))
+    driver = Driver(args.base_url, profiles, text, args.seed, check_params, max(args.upsert_pool, UPSERT_BATCH))
+
+    try:
+        requests.get(f"{driver.base_url}/health", timeout=5).raise_for_status()
+    except requests.RequestException as e:
+        raise SystemExit(f"App not reachable at {driver.base_url}: {e}")
+
+    if args.seed_schemes:
+        catalogue = synthetic_schemes(random.Random(args.seed), args.seed_schemes)
+        requests.post(f"{driver.base_url}/load_schemes", data={"paste_json": json.dumps(catalogue)}, timeout=args.timeout)
+
+    results, elapsed = run(driver, parse_mix(args.mix), args.concurrency, args.duration, args.requests, args.timeout)
+    summary = summarize(results, elapsed)
+    if args.json:
+        print(json.dumps({"elapsed_sec": round(elapsed, 3), "concurrency": args.concurrency, "routes": summary}, indent=2))
+    else:
+        print_report(summary, elapsed, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
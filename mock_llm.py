@@ -0,0 +1,157 @@
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the OpenAI-compatible chat-completions endpoint used by
+# app.py. Point the app at it with:
+#   LLM_API_URL=http://127.0.0.1:8900/v1/chat/completions python app.py
+
+DEFAULT_SCHEMES = [
+    {
+        "scheme_name": "Krishi Bhagya Yojane",
+        "benefits": "Subsidy for farm ponds and protective irrigation",
+        "criteria": {"farmer_required": True, "age_min": 18, "income_max": 200000, "residence_type_allowed": ["Rural"]},
+    },
+    {
+        "scheme_name": "Widow Pension Scheme",
+        "benefits": "Monthly pension of Rs 800",
+        "criteria": {"widow_required": True, "bpl_required": True, "age_min": 18, "gender_allowed": ["Female"]},
+    },
+    {
+        "scheme_name": "Post-Matric Scholarship for SC/ST Students",
+        "benefits": "Tuition fee reimbursement and maintenance allowance",
+        "criteria": {"student_required": True, "category_allowed": ["SC", "ST"], "income_max": 250000},
+    },
+    {
+        "scheme_name": "Disability Maintenance Allowance",
+        "benefits": "Monthly allowance of Rs 1,400",
+        "criteria": {"disability_required": True, "disability_percentage_min": 40},
+    },
+]
+
+config = {
+    "latency_ms": 800.0,
+    "jitter_ms": 200.0,
+    "error_rate": 0.0,
+    "malformed_rate": 0.0,
+    "stream_chunk": 24,
+    "schemes": DEFAULT_SCHEMES,
+}
+stats = {"requests": 0, "errors": 0, "streamed": 0}
+
+
+def _latency() -> float:
+    return max(0.0, random.gauss(config["latency_ms"], config["jitter_ms"])) / 1000
+
+def _content() -> str:
+    body = json.dumps(config["schemes"], ensure_ascii=False)
+    if random.random() < config["malformed_rate"]:
+        body = body[:-1] + ',{"scheme_name": "broken" "criteria"}]'
+    return f"```json\n{body}\n```"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, code: int, obj: dict):
+        out = json.dumps(obj).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            return self._json(200, {"ok": True, **stats, **{k: v for k, v in config.items() if k != "schemes"}})
+        self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._json(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._json(400, {"error": "invalid JSON"})
+
+        stats["requests"] += 1
+        delay = _latency()
+        if random.random() < config["error_rate"]:
+            stats["errors"] += 1
+            time.sleep(delay / 4)
+            return self._json(503, {"error": {"message": "mock upstream error", "type": "server_error"}})
+
+        content = _content()
+        model = payload.get("model", "mock")
+        if not payload.get("stream"):
+            time.sleep(delay)
+            return self._json(200, {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            })
+
+        # SSE: spread the configured latency across the deltas
+        stats["streamed"] += 1
+        step = max(1, config["stream_chunk"])
+        pieces = [content[i:i + step] for i in range(0, len(content), step)]
+        pause = delay / max(1, len(pieces))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for piece in pieces:
+            time.sleep(pause)
+            chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+def main():
+    p = argparse.ArgumentParser(description="Mock OpenAI-compatible chat-completions server for load tests.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8900)
+    p.add_argument("--latency-ms", type=float, default=config["latency_ms"], help="mean completion latency")
+    p.add_argument("--jitter-ms", type=float, default=config["jitter_ms"], help="latency standard deviation")
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    p.add_argument("--malformed-rate", type=float, default=0.0, help="fraction of completions with a broken trailing object")
+    p.add_argument("--stream-chunk", type=int, default=config["stream_chunk"], help="characters per streamed delta")
+    p.add_argument("--schemes", metavar="FILE.json", help="canned scheme array to return")
+    args = p.parse_args()
+
+    config.update({
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "malformed_rate": args.malformed_rate,
+        "stream_chunk": args.stream_chunk,
+    })
+    if args.schemes:
+        with open(args.schemes, "r", encoding="utf-8") as f:
+            config["schemes"] = json.load(f)
+
+    srv = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    srv.daemon_threads = True
+    print(f"Mock LLM on http://{args.host}:{args.port}/v1/chat/completions "
+          f"(latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, error rate {args.error_rate:.0%})")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+
+
+if __name__ == "__main__":
+    main()
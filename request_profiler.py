@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import time
+import marshal
+import cProfile
+import threading
+from collections import Counter, deque
+
+# Per-request profiles for app.py. A capture is either a wall-clock stack
+# sampler (default; sees time spent waiting on the LLM as well as CPU) or
+# cProfile. Both are exported as collapsed stacks ("a;b;c <value>" per line),
+# which flamegraph.pl, speedscope and inferno read directly.
+
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_short_names = {}
+
+
+def _short_file(filename: str) -> str:
+    """"app.py" for this repo's modules, "flask/app.py" for libraries, so names stay unambiguous."""
+    short = _short_names.get(filename)
+    if short is None:
+        path = os.path.abspath(filename)
+        if os.path.dirname(path) == _HERE:
+            short = os.path.basename(path)
+        else:
+            short = "/".join(path.split(os.sep)[-2:])
+        short = _short_names[filename] = short
+    return short
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({_short_file(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+def _func_name(func: tuple) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name.replace(";", ":")  # built-ins
+    return f"{name} ({_short_file(filename)}:{lineno})".replace(";", ":")
+
+
+# -----------------------
+# Captures
+# -----------------------
+class StackSampler:
+    """Samples one thread's Python stack every interval seconds from a helper thread."""
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.t0 = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                if frame.f_code.co_filename != __file__:
+                    names.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.t0
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def hotspots(self, watch: tuple) -> dict:
+        """Approximate inclusive milliseconds per watched "file.py:function"."""
+        out = {}
+        # samples land less often than the interval under GIL contention, so scale by the real spacing
+        ms_per_sample = self.elapsed * 1000 / self.samples if self.samples else 0.0
+        for spec in watch:
+            filename, _, name = spec.partition(":")
+            tag = f"{name} ({filename}:"
+            hits = sum(n for stack, n in self.stacks.items() if tag in stack)
+            if hits:
+                out[spec] = round(hits * ms_per_sample, 1)
+        return out
+
+
+class CProfileCapture:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+        return self
+
+    def stop(self):
+        self.profile.disable()
+        self.profile.create_stats()
+
+    def pstats_bytes(self) -> bytes:
+        return marshal.dumps(self.profile.stats)
+
+    def collapsed(self, max_depth: int = 64) -> str:
+        """
+        cProfile only keeps caller -> callee edges, so stacks are rebuilt by
+        walking down from the roots and splitting each function's time across
+        its callees in proportion to the edge times (values in microseconds).
+        """
+        stats = self.profile.stats
+        children = {}
+        for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+            for caller, edge in callers.items():
+                children.setdefault(caller, []).append((func, edge[3]))
+        roots = [f for f, st in stats.items() if not st[4]]
+        out = Counter()
+
+        def walk(func, path, share):
+            if stats[func][3] * share < 1e-5:
+                return  # prune paths under 10 us so large call graphs stay cheap to export
+            tt = stats[func][2]
+            names = path + (_func_name(func),)
+            if tt * share >= 1e-6:
+                out[";".join(names)] += int(tt * share * 1e6)
+            if len(names) >= max_depth:
+                return
+            for child, edge_ct in children.get(func, ()):
+                child_ct = stats[child][3]
+                if child_ct <= 0 or _func_name(child) in names:
+                    continue
+                walk(child, names, share * edge_ct / child_ct)
+
+        for root in roots:
+            walk(root, (), 1.0)
+        return "".join(f"{stack} {v}\n" for stack, v in out.most_common() if v > 0)
+
+    def hotspots(self, watch: tuple) -> dict:
+        """Inclusive milliseconds per watched "file.py:function"."""
+        out = {}
+        for (filename, _lineno, name), st in self.profile.stats.items():
+            spec = f"{_short_file(filename)}:{name}"
+            if spec in watch:
+                out[spec] = round(out.get(spec, 0) + st[3] * 1000, 1)
+        return out
+
+
+# -----------------------
+# On-disk ring
+# -----------------------
+class ProfileRing:
+    """
+    Keeps the newest `size` profiles in `directory`, one <id>.json metadata
+    file plus <id>.collapsed (and <id>.prof for cProfile captures) each.
+    """
+
+    def __init__(self, directory: str, size: int = 200):
+        self.directory = directory
+        self.size = size
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        ids = sorted(int(f[:-5]) for f in os.listdir(directory) if f.endswith(".json") and f[:-5].isdigit())
+        self.ids = deque(ids)
+        self.seq = ids[-1] if ids else 0
+        self._trim()
+
+    def reserve(self) -> int:
+        with self.lock:
+            self.seq += 1
+            return self.seq
+
+    def path(self, pid: int, ext: str) -> str:
+        return os.path.join(self.directory, f"{pid:08d}.{ext}")
+
+    def _write(self, path: str, data: bytes):
+        tmp = path + ".part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def save(self, pid: int, meta: dict, collapsed: str, pstats_data: bytes = None):
+        meta = dict(meta, id=pid)
+        self._write(self.path(pid, "collapsed"), collapsed.encode("utf-8"))
+        if pstats_data is not None:
+            self._write(self.path(pid, "prof"), pstats_data)
+        self._write(self.path(pid, "json"), json.dumps(meta).encode("utf-8"))  # last: marks the profile complete
+        with self.lock:
+            self.ids.append(pid)
+            self._trim()
+
+    def _trim(self):
+        while len(self.ids) > self.size:
+            old = self.ids.popleft()
+            for ext in ("json", "collapsed", "prof"):
+                try:
+                    os.remove(self.path(old, ext))
+                except OSError:
+                    pass
+
+    def list(self) -> list:
+        out = []
+        for pid in reversed(list(self.ids)):
+            meta = self.get(pid)
+            if meta is not None:
+                out.append(meta)
+        return out
+
+    def get(self, pid: int):
+        try:
+            with open(self.path(pid, "json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def new_capture(mode: str, interval: float):
+    return CProfileCapture().start() if mode == "cprofile" else StackSampler(interval).start()
+
+
+def finish_capture(capture, watch: tuple, meta: dict) -> tuple:
+    """Stops a capture; returns (meta with hotspots, collapsed text, pstats bytes or None)."""
+    t0 = time.perf_counter()
+    capture.stop()
+    meta = dict(meta)
+    meta["hotspots_ms"] = capture.hotspots(watch)
+    if isinstance(capture, StackSampler):
+        meta["samples"] = capture.samples
+        meta["interval_ms"] = capture.interval * 1000
+        collapsed, raw = capture.collapsed(), None
+    else:
+        collapsed, raw = capture.collapsed(), capture.pstats_bytes()
+    meta["export_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return meta, collapsed, raw
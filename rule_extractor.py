@@ -0,0 +1,304 @@
+import re
+import time
+
+# Deterministic fast path for boilerplate eligibility language. Produces the
+# same criteria conventions as the LLM prompt in app.py (*_min / *_max /
+# *_required / *_allowed), so output goes through normalize_schemes unchanged.
+# Sections it cannot fully explain are handed back for LLM extraction.
+
+_F = re.IGNORECASE
+_NUM = r"(\d[\d,]*(?:\.\d+)?)"
+_RS = r"(?:rs\.?|₹|inr|rupees)?\s*"
+_UNIT = r"\s*(lakhs?|lacs?|crores?)?"
+_CATS = r"(?:SC|ST|OBC|EWS|General|Scheduled\s+Castes?|Scheduled\s+Tribes?)"
+
+_SCHEME_WORD = re.compile(r"\b(scheme|yojana|yojane|yojna|programme|program|mission|nidhi|pension|scholarship|bhagya|abhiyan)\b", _F)
+_NAME_LINE = re.compile(r"^\s*(?:\d+[.)]\s*)?(?:name\s+of\s+(?:the\s+)?scheme|scheme\s+name|scheme)\s*[:\-]\s*(.+?)\s*$", _F)
+_BENEFIT_LINE = re.compile(r"^\s*benefits?\s*[:\-]\s*(.+?)\s*$", _F)
+_BENEFIT_SENTENCE = re.compile(r"\b(?:financial\s+assistance|assistance|subsidy|grant|pension|scholarship|loan|incentive|honorarium)\s+of\s+" + _RS + r"\d", _F)
+_ELIGIBILITY_HINT = re.compile(
+    r"\b(eligib\w*|applicants?|aged?|income|only|must|should|belong\w*|beneficiar\w*|bpl|poverty|categor\w*|caste|resident\w*|domicile|criteria)\b", _F)
+_SENTENCE_SPLIT = re.compile(r"(?<![Rr]s)(?<!\d)\.(?!\d)\s*|;\s*|\n+")
+# Sentences that negate, soften or merely describe a condition go to the LLM as a whole
+_NEGATION = re.compile(r"\b(?:not|no|never|non|nor|neither|cannot|can't|except\w*|exclud\w*|ineligible|unless|barring|other\s+than)\b", _F)
+_SOFT = re.compile(
+    r"\b(?:prefer\w*|priorit\w*|relax\w*|concession\w*|weightage|reserv\w*|quota|help(?:s|ed|ing)?|aim(?:s|ed)?|"
+    r"intend\w*|design\w*|encourag\w*|promot\w*|support\w*|such\s+as|including|e\.g)\b", _F)
+# Words that may be left over once every rule match is removed from a sentence
+_FILLER = set("""
+a an the of and or to in for from with by as at on per this these that who whose which their his her
+be is are was were should must shall will can may also only all any open available eligible eligibility apply
+applicant applicants candidate candidates beneficiary beneficiaries person persons people individual individuals
+family families household households member members belong belonging belongs card holder holders cardholders
+age aged year years old annual annum month income criteria scheme
+""".split())
+_WORD = re.compile(r"[a-z]+|\d+")
+
+_AGE_RANGE = [
+    re.compile(r"\bage(?:d|\s+group)?\s*(?:of\s*|should\s+be\s*|must\s+be\s*|:\s*)?(?:between|from)\s*(\d{1,3})\s*(?:years?\s*)?(?:and|to|-)\s*(\d{1,3})", _F),
+    re.compile(r"\b(\d{1,3})\s*(?:-|to)\s*(\d{1,3})\s*years?\s*(?:of\s+age|old|age)", _F),
+]
+_AGE_MIN = [
+    re.compile(r"\bage(?:d)?\s*(?:should\s+be\s*|must\s+be\s*|of\s*)?(?:above|over|at\s+least|minimum(?:\s+of)?|not\s+less\s+than|more\s+than)\s*(\d{1,3})", _F),
+    re.compile(r"\b(\d{1,3})\s*years?\s*(?:of\s+age\s*)?(?:and\s+above|or\s+(?:above|more|older))", _F),
+]
+_AGE_MAX = [
+    re.compile(r"\bage(?:d)?\s*(?:should\s+be\s*|must\s+be\s*|of\s*)?(?:below|under|less\s+than|not\s+more\s+than|not\s+exceeding|up\s*to|maximum(?:\s+of)?)\s*(\d{1,3})", _F),
+]
+_INCOME_MAX = re.compile(
+    r"\bincome\b([^.;\n]{0,60}?)(?:not\s+exceed(?:ing)?|does\s+not\s+exceed|should\s+not\s+exceed|must\s+not\s+exceed|below|less\s+than|up\s*to|within|under|maximum(?:\s+of)?|ceiling\s+of|limit\s+of)\s*"
+    + _RS + _NUM + _UNIT, _F)
+_CATEGORY = re.compile(
+    r"\b(" + _CATS + r"(?:\s*(?:/|,|&|\band\b|\bor\b)\s*" + _CATS + r")*)\s*(?:only|categor(?:y|ies)|communit(?:y|ies)|candidates|families|households|persons|beneficiaries|applicants)\b")
+_BPL = re.compile(r"\b(?<!non-)(?:BPL|below\s+(?:the\s+)?poverty\s+line)\b", _F)
+_FEMALE = re.compile(r"(?:only|exclusively)\s+(?:for\s+)?(?:women|females?|girls?)\b|\b(?:women|females?|girls?)\s+(?:only|applicants|beneficiaries)\b|\bgirl\s+child\b", _F)
+_WIDOW = re.compile(r"\bwidows?\b", _F)
+_DISABILITY_PCT = [
+    re.compile(r"(\d{1,3})\s*%\s*(?:or\s+more\s+|and\s+above\s+|or\s+above\s+)?(?:of\s+)?disabilit\w*", _F),
+    re.compile(r"disabilit\w*[^.;\n]{0,30}?(?:at\s+least|minimum(?:\s+of)?|not\s+less\s+than|of)\s*(\d{1,3})\s*%", _F),
+]
+_DISABILITY = re.compile(r"\b(?:disabled|disabilit(?:y|ies)|differently[-\s]abled|divyang\w*|PwDs?)\b", _F)
+_RESIDENCE = re.compile(r"\b(rural|urban)\s+(?:areas?|residents?|households?|families|applicants)\b", _F)
+_STATE = re.compile(r"\b(?:residents?|domiciles?|domiciled)\s+(?:of|in)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)")
+_STUDENT = re.compile(r"\bstudents?\b", _F)
+_FARMER = re.compile(r"\bfarmers?\b", _F)
+
+_UNIT_MULT = {"lakh": 100000, "lakhs": 100000, "lac": 100000, "lacs": 100000, "crore": 10000000, "crores": 10000000}
+_CAT_CANON = {"scheduled caste": "SC", "scheduled castes": "SC", "scheduled tribe": "ST", "scheduled tribes": "ST", "general": "General"}
+
+
+# -----------------------
+# Helpers
+# -----------------------
+def _amount(num: str, unit: str):
+    v = float(num.replace(",", "")) * _UNIT_MULT.get((unit or "").lower(), 1)
+    return int(v) if v.is_integer() else v
+
+def _categories(span: str) -> list:
+    out = []
+    for c in re.findall(_CATS, span):
+        c = " ".join(c.split())
+        c = _CAT_CANON.get(c.lower(), c.upper() if len(c) <= 3 else c)
+        if c not in out:
+            out.append(c)
+    return out
+
+def _set_min(criteria: dict, key: str, v):
+    criteria[key] = max(criteria.get(key, v), v)
+
+def _set_max(criteria: dict, key: str, v):
+    criteria[key] = min(criteria.get(key, v), v)
+
+def _add_allowed(criteria: dict, key: str, values: list):
+    cur = criteria.setdefault(key, [])
+    for v in values:
+        if v not in cur:
+            cur.append(v)
+
+
+# -----------------------
+# Sentence-level rules
+# -----------------------
+def match_sentence(sentence: str, criteria: dict, spans: list = None) -> int:
+    """Applies every rule to one sentence; returns how many fired. Matched spans are appended to `spans`."""
+    spans = [] if spans is None else spans
+    hits = 0
+
+    for rx in _AGE_RANGE:
+        for m in rx.finditer(sentence):
+            lo, hi = sorted((int(m.group(1)), int(m.group(2))))
+            _set_min(criteria, "age_min", lo)
+            _set_max(criteria, "age_max", hi)
+            spans.append(m.span())
+            hits += 1
+    if not hits:
+        for rx in _AGE_MIN:
+            for m in rx.finditer(sentence):
+                _set_min(criteria, "age_min", int(m.group(1)))
+                spans.append(m.span())
+                hits += 1
+        for rx in _AGE_MAX:
+            for m in rx.finditer(sentence):
+                _set_max(criteria, "age_max", int(m.group(1)))
+                spans.append(m.span())
+                hits += 1
+
+    for m in _INCOME_MAX.finditer(sentence):
+        if _NEGATION.search(m.group(1)):
+            continue  # "income should not be below ..." is not a ceiling
+        _set_max(criteria, "income_max", _amount(m.group(2), m.group(3)))
+        spans.append(m.span())
+        hits += 1
+
+    for m in _CATEGORY.finditer(sentence):
+        cats = _categories(m.group(1))
+        if cats:
+            _add_allowed(criteria, "category_allowed", cats)
+            spans.append(m.span())
+            hits += 1
+
+    for m in _BPL.finditer(sentence):
+        criteria["bpl_required"] = True
+        spans.append(m.span())
+        hits += 1
+    for m in _FEMALE.finditer(sentence):
+        _add_allowed(criteria, "gender_allowed", ["Female"])
+        spans.append(m.span())
+        hits += 1
+    for m in _WIDOW.finditer(sentence):
+        criteria["widow_required"] = True
+        spans.append(m.span())
+        hits += 1
+
+    disability = False
+    for rx in _DISABILITY_PCT:
+        for m in rx.finditer(sentence):
+            _set_min(criteria, "disability_percentage_min", int(m.group(1)))
+            spans.append(m.span())
+            disability = True
+    for m in _DISABILITY.finditer(sentence):
+        spans.append(m.span())
+        disability = True
+    if disability:
+        criteria["disability_required"] = True
+        hits += 1
+
+    for m in _RESIDENCE.finditer(sentence):
+        _add_allowed(criteria, "residence_type_allowed", [m.group(1).title()])
+        spans.append(m.span())
+        hits += 1
+    for m in _STATE.finditer(sentence):
+        _add_allowed(criteria, "state_allowed", [m.group(1)])
+        spans.append(m.span())
+        hits += 1
+    for m in _STUDENT.finditer(sentence):
+        criteria["student_required"] = True
+        spans.append(m.span())
+        hits += 1
+    for m in _FARMER.finditer(sentence):
+        criteria["farmer_required"] = True
+        spans.append(m.span())
+        hits += 1
+
+    return hits
+
+def residual_words(sentence: str, spans: list) -> list:
+    """Words of the sentence outside every matched span that are not filler."""
+    chars = list(sentence.lower())
+    for a, b in spans:
+        chars[a:b] = " " * (b - a)
+    return [w for w in _WORD.findall("".join(chars)) if w not in _FILLER]
+
+def sentence_resolved(sentence: str, criteria: dict) -> bool:
+    """
+    Matches one sentence into a scratch dict and merges it into `criteria`
+    only if every clause was explained: no negation, no preference,
+    relaxation or descriptive wording, and nothing left over once the
+    rule matches are removed.
+    """
+    scratch, spans = {}, []
+    if not match_sentence(sentence, scratch, spans) or _SOFT.search(sentence):
+        return False
+    if residual_words(sentence, spans):  # negation words are never filler
+        return False
+    for key, v in scratch.items():
+        if key.endswith("_min"):
+            _set_min(criteria, key, v)
+        elif key.endswith("_max"):
+            _set_max(criteria, key, v)
+        elif key.endswith("_allowed"):
+            _add_allowed(criteria, key, v)
+        else:
+            criteria[key] = v
+    return True
+
+
+# -----------------------
+# Sections
+# -----------------------
+def _heading_name(line: str):
+    m = _NAME_LINE.match(line)
+    if m:
+        return m.group(1).strip(" .:-")
+    s = line.strip().lstrip("0123456789.) ").strip()
+    if s and len(s.split()) <= 12 and not s.endswith(".") and _SCHEME_WORD.search(s) and ":" not in s:
+        return s
+    return None
+
+def split_sections(text: str) -> list:
+    """[(name or None, body)] split at scheme heading lines."""
+    sections = []
+    name, body = None, []
+    for line in (text or "").splitlines():
+        heading = _heading_name(line)
+        if heading:
+            if name or any(b.strip() for b in body):
+                sections.append((name, "\n".join(body)))
+            name, body = heading, []
+        else:
+            body.append(line)
+    if name or any(b.strip() for b in body):
+        sections.append((name, "\n".join(body)))
+    return sections
+
+def extract_section(name: str, body: str):
+    """Returns (scheme or None, resolved). Resolved means every clause of every eligibility sentence was matched."""
+    criteria = {}
+    benefits = []
+    unresolved = 0
+    for line in body.splitlines():
+        m = _BENEFIT_LINE.match(line)
+        if m:
+            benefits.append(m.group(1))
+            continue
+        for sentence in _SENTENCE_SPLIT.split(line):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            m = _BENEFIT_LINE.match(sentence)
+            if m:
+                benefits.append(m.group(1))
+                continue
+            if _BENEFIT_SENTENCE.search(sentence) and not _ELIGIBILITY_HINT.search(sentence):
+                benefits.append(sentence)
+                continue
+            if sentence_resolved(sentence, criteria):
+                continue
+            if match_sentence(sentence, {}) or _ELIGIBILITY_HINT.search(sentence) or _NEGATION.search(sentence):
+                unresolved += 1
+
+    if not name or not criteria:
+        return None, False
+    scheme = {"scheme_name": name, "benefits": ". ".join(b.rstrip(". ") for b in benefits), "criteria": criteria}
+    return scheme, unresolved == 0
+
+
+# -----------------------
+# Public entry point
+# -----------------------
+def extract_schemes_locally(text: str):
+    """
+    Returns (schemes, unresolved_text, stats).
+    unresolved_text holds the sections that still need the LLM ("" if none).
+    """
+    t0 = time.perf_counter()
+    schemes, leftovers = [], []
+    sections = split_sections(text)
+    for name, body in sections:
+        scheme, resolved = extract_section(name, body)
+        if resolved:
+            schemes.append(scheme)
+        else:
+            leftovers.append(f"{name}\n{body}" if name else body)
+
+    unresolved_text = "\n\n".join(leftovers).strip()
+    stats = {
+        "sections": len(sections),
+        "sections_local": len(schemes),
+        "sections_llm": len(leftovers),
+        "criteria_local": sum(len(s["criteria"]) for s in schemes),
+        "llm_chars_sent": len(unresolved_text),
+        "llm_chars_avoided": max(0, len(text or "") - len(unresolved_text)),
+        "local_ms": round((time.perf_counter() - t0) * 1000, 3),
+    }
+    return schemes, unresolved_text, stats
@@ -0,0 +1,199 @@
+import re
+import math
+import heapq
+import bisect
+
+# ================== CONFIG ==================
+FIELD_WEIGHTS = {"scheme_name": 2.0, "benefits": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_IDF = 0.1          # near-stopword terms are skipped when the query has better ones
+FUZZY_MIN = 0.45       # Dice similarity for misspelled-term expansion
+FUZZY_EXPANSIONS = 3
+PREFIX_EXPANSIONS = 20
+LARGE_POSTINGS = 2000  # above this, a term only re-scores candidates...
+CHAMPIONS = 500        # ...or, if it is the rarest query term, its best-impact docs
+# ===========================================
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN.findall((text or "").lower())
+
+def term_trigrams(term: str) -> set:
+    s = f"  {term} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class SchemeSearchIndex:
+    """
+    Inverted token index + term trigram index over scheme_name and benefits.
+    Documents can be added or removed one at a time; BM25 statistics are kept
+    as running totals so nothing is rebuilt.
+    """
+
+    def __init__(self):
+        self.docs = {}         # doc_id -> scheme dict
+        self.doc_terms = {}    # doc_id -> {term: weighted tf}
+        self.doc_len = {}
+        self.total_len = 0.0
+        self.postings = {}     # term -> {doc_id: weighted tf}
+        self.gram_terms = {}   # trigram -> set(term)
+        self.vocab = []        # sorted, for prefix completion
+        self.champions = {}    # term -> [impact floor, set of best-impact doc_ids], built lazily, kept up to date
+
+    def __len__(self):
+        return len(self.docs)
+
+    # ---- updates ----
+    def add(self, doc_id, scheme: dict):
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        tf = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for t in tokenize(scheme.get(field, "")):
+                tf[t] = tf.get(t, 0.0) + weight
+        self.docs[doc_id] = scheme
+        self.doc_terms[doc_id] = tf
+        self.doc_len[doc_id] = sum(tf.values())
+        self.total_len += self.doc_len[doc_id]
+        norm, slope = self._bm25_params()
+        for t, n in tf.items():
+            champ = self.champions.get(t)
+            if champ is not None and n / (n + norm + slope * self.doc_len[doc_id]) > champ[0]:
+                champ[1].add(doc_id)
+                if len(champ[1]) > 2 * CHAMPIONS:
+                    del self.champions[t]  # rebuilt on next use, once per CHAMPIONS additions at most
+            plist = self.postings.get(t)
+            if plist is None:
+                plist = self.postings[t] = {}
+                bisect.insort(self.vocab, t)
+                for g in term_trigrams(t):
+                    self.gram_terms.setdefault(g, set()).add(t)
+            plist[doc_id] = n
+
+    def remove(self, doc_id):
+        if doc_id not in self.docs:
+            return
+        for t in self.doc_terms.pop(doc_id):
+            plist = self.postings[t]
+            del plist[doc_id]
+            champ = self.champions.get(t)
+            if champ is not None:
+                champ[1].discard(doc_id)
+                if len(champ[1]) < CHAMPIONS // 2 and len(plist) > len(champ[1]):
+                    del self.champions[t]
+            if not plist:
+                del self.postings[t]
+                del self.vocab[bisect.bisect_left(self.vocab, t)]
+                for g in term_trigrams(t):
+                    terms = self.gram_terms[g]
+                    terms.discard(t)
+                    if not terms:
+                        del self.gram_terms[g]
+        self.total_len -= self.doc_len.pop(doc_id)
+        del self.docs[doc_id]
+
+    # ---- query expansion ----
+    def complete(self, prefix: str, limit: int = PREFIX_EXPANSIONS) -> list:
+        """Vocabulary terms starting with prefix, most frequent first."""
+        if not prefix:
+            return []
+        i = bisect.bisect_left(self.vocab, prefix)
+        out = []
+        while i < len(self.vocab) and self.vocab[i].startswith(prefix):
+            out.append(self.vocab[i])
+            i += 1
+        out.sort(key=lambda t: len(self.postings[t]), reverse=True)
+        return out[:limit]
+
+    def fuzzy(self, term: str) -> list:
+        """(vocab term, similarity) pairs for a term that may be misspelled."""
+        grams = term_trigrams(term)
+        shared = {}
+        for g in grams:
+            for t in self.gram_terms.get(g, ()):
+                shared[t] = shared.get(t, 0) + 1
+        scored = []
+        for t, n in shared.items():
+            sim = 2 * n / (len(grams) + len(t) + 1)  # a term of length L has L + 1 trigrams
+            if sim >= FUZZY_MIN:
+                scored.append((t, sim))
+        return heapq.nlargest(FUZZY_EXPANSIONS, scored, key=lambda x: x[1])
+
+    def _expand(self, tokens: list, prefix_last: bool) -> dict:
+        weights = {}
+        for i, tok in enumerate(tokens):
+            cands = []
+            if tok in self.postings:
+                cands.append((tok, 1.0))
+            else:
+                cands.extend(self.fuzzy(tok))
+            if prefix_last and i == len(tokens) - 1:
+                cands.extend((t, 0.8) for t in self.complete(tok) if t != tok)
+            for t, w in cands:
+                weights[t] = max(weights.get(t, 0.0), w)
+        return weights
+
+    # ---- ranking ----
+    def _bm25_params(self) -> tuple:
+        avgdl = self.total_len / len(self.docs) if self.docs else 1.0
+        return BM25_K1 * (1 - BM25_B), BM25_K1 * BM25_B / (avgdl or 1.0)
+
+    def _champion_docs(self, term: str, norm: float, slope: float) -> set:
+        """
+        The CHAMPIONS best-impact docs for a term. Adds and removes keep the
+        set current (a new doc joins if it beats the floor), so it is only
+        rebuilt when it has grown or shrunk by about CHAMPIONS / 2.
+        """
+        champ = self.champions.get(term)
+        if champ is None:
+            plist, dl = self.postings[term], self.doc_len
+            impact = {d: tf / (tf + norm + slope * dl[d]) for d, tf in plist.items()}
+            docs = heapq.nlargest(CHAMPIONS, impact, key=impact.get)
+            champ = self.champions[term] = [min(impact[d] for d in docs), set(docs)]
+        return champ[1]
+
+    def search(self, query: str, limit: int = 10, prefix: bool = True) -> list:
+        """
+        BM25 over expanded terms. Returns [(doc_id, score)] best first.
+
+        Terms are visited rarest first. Terms with more than LARGE_POSTINGS
+        docs never scan their full postings: they only add to existing
+        candidates, or seed candidates from their champion list. Common-word
+        queries therefore cost the same as rare ones, and for very frequent
+        terms the ranking is approximate.
+        """
+        tokens = tokenize(query)
+        if not tokens or not self.docs:
+            return []
+        prefix_last = prefix and not query.endswith(" ")
+        weights = self._expand(tokens, prefix_last)
+
+        n_docs = len(self.docs)
+        terms = []
+        for t, w in weights.items():
+            df = len(self.postings[t])
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            terms.append((df, t, w, idf))
+        if any(idf >= MIN_IDF for *_rest, idf in terms):
+            terms = [x for x in terms if x[3] >= MIN_IDF]
+        terms.sort()
+
+        scores = {}
+        norm, slope = self._bm25_params()
+        dl = self.doc_len
+        for df, t, w, idf in terms:
+            plist = self.postings[t]
+            if df <= LARGE_POSTINGS:
+                docs = plist
+            elif scores:
+                docs = [d for d in scores if d in plist]
+            else:
+                docs = self._champion_docs(t, norm, slope)
+            factor = w * idf * (BM25_K1 + 1)
+            for doc_id in docs:
+                tf = plist[doc_id]
+                scores[doc_id] = scores.get(doc_id, 0.0) + factor * tf / (tf + norm + slope * dl[doc_id])
+        return heapq.nlargest(limit, scores.items(), key=lambda x: x[1])
@@ -0,0 +1,21 @@
+import os
+import sys
+
+# The Python modules live flat at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def app_module():
+    """app.py with an empty catalogue."""
+    import app
+    app.apply_catalogue([], "replace")
+    yield app
+    app.apply_catalogue([], "replace")
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,91 @@
+import csv
+import os
+import random
+
+import pytest
+
+from budget_anomalies import AnomalyTable
+from budget_index import load_budget_lines
+
+YEARS = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21", "2021-22"]
+
+
+def synthetic_lines(n: int = 40, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        base = rng.choice([0, 500, 4000, 60000])
+        alloc = {}
+        for y in YEARS:
+            alloc[y] = None if rng.random() < 0.05 else max(0, round(base * rng.uniform(0.6, 1.5)))
+            if rng.random() < 0.1:
+                base = rng.choice([0, 10, 90000])
+        lines.append({"name": f"Head {i}", "head_of_account": f"2401_00_{i:03d}_0_01",
+                      "sector": "District" if i % 3 == 0 else "State", "allocations": alloc})
+    return lines
+
+
+def upto(lines: list, k: int) -> list:
+    return [dict(ln, allocations={y: ln["allocations"][y] for y in YEARS[:k]}) for ln in lines]
+
+
+@pytest.mark.parametrize("start", [1, 2, 4])
+def test_extending_matches_a_full_rebuild(start):
+    lines = synthetic_lines()
+    table = AnomalyTable(upto(lines, start))
+    table.query(10)  # rows cached before the refresh must not leak into the new ranking
+    assert table.extend(lines)
+    assert table.appended == YEARS[start:]
+
+    full = AnomalyTable(lines)
+    assert table.years == full.years
+    assert table.query() == full.query()
+    for flag in ("outlier", "swing", "started", "zeroed"):
+        assert table.query(5, sector="state", flag=flag) == full.query(5, sector="state", flag=flag)
+
+
+def test_extend_refuses_edits_and_leaves_the_table_alone():
+    lines = synthetic_lines()
+    table = AnomalyTable(upto(lines, 3))
+    before = table.query()
+
+    edited = upto(lines, 4)
+    edited[7]["allocations"][YEARS[1]] = 123456
+    assert not table.extend(edited)
+    assert not table.extend(upto(lines, 4)[1:])  # a head removed
+    assert table.years == YEARS[:3] and table.query() == before
+    assert table.extend(upto(lines, 3)) and table.appended == []
+
+
+def write_csv(path, lines: list, years: list):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["No", "Name of Scheme", "Head_of_Account"] + [y.replace("-", "_") for y in years])
+        for i, ln in enumerate(lines, 1):
+            w.writerow([i, ln["name"], ln["head_of_account"]] + [ln["allocations"][y] if ln["allocations"][y] is not None else "" for y in years])
+
+
+def test_route_extends_on_appended_columns_and_rebuilds_on_edits(client, app_module, monkeypatch, tmp_path):
+    path = tmp_path / "budget.csv"
+    lines = synthetic_lines()
+    write_csv(path, lines, YEARS[:4])
+    monkeypatch.setattr(app_module, "BUDGET_CSV", str(path))
+    monkeypatch.setattr(app_module, "_budget_anomalies", None)
+
+    first = client.get("/budget/anomalies?limit=5").get_json()
+    table = app_module._budget_anomalies
+    assert first["years"] == YEARS[:4] and first["appended_years"] == []
+
+    write_csv(path, lines, YEARS)
+    os.utime(path, (1, 1))
+    body = client.get("/budget/anomalies?limit=1000").get_json()
+    assert app_module._budget_anomalies is table
+    assert body["appended_years"] == YEARS[4:]
+    assert body["anomalies"] == AnomalyTable(load_budget_lines(str(path))).query(1000)
+
+    lines[0]["allocations"][YEARS[0]] = 999999
+    write_csv(path, lines, YEARS)
+    os.utime(path, (2, 2))
+    body = client.get("/budget/anomalies?limit=5").get_json()
+    assert app_module._budget_anomalies is not table
+    assert body["appended_years"] == []
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from budget_index import MATCH_THRESHOLD, BudgetIndex, budget_trend, fiscal_year_label, load_budget_lines, trigrams
+
+
+@pytest.fixture(scope="module")
+def index():
+    return BudgetIndex(load_budget_lines())
+
+
+def brute_force(lines: list, name: str):
+    grams = trigrams(name)
+    best, best_score = None, 0.0
+    for ln in lines:
+        other = trigrams(ln["name"])
+        score = 2 * len(grams & other) / (len(grams) + len(other)) if grams and other else 0.0
+        if score > best_score:
+            best, best_score = ln, score
+    return (best, round(best_score, 3)) if best is not None and best_score >= MATCH_THRESHOLD else None
+
+
+def test_index_agrees_with_comparing_every_head(index):
+    queries = [ln["name"] for ln in index.lines[::3]]
+    queries += ["Krishi Bhagya Yojana", "Organic farming scheme", "Crop insurence", "Widow Pension", "", "of the"]
+    for q in queries:
+        hit, expected = index.match(q), brute_force(index.lines, q)
+        assert (hit is None) == (expected is None), q
+        if hit is not None:
+            assert hit[1] == expected[1], q  # equal-scoring heads may tie either way
+            assert brute_force([hit[0]], q) == (hit[0], hit[1]), q
+
+
+def test_head_of_account_in_the_name_wins(index):
+    line = index.lines[5]
+    assert index.match(f"Scheme under {line['head_of_account']}") == (line, 1.0)
+
+
+def test_csv_parsing():
+    assert fiscal_year_label("2016_17  Rupees_in_Lakhs") == "2016-17"
+    assert fiscal_year_label("Name of Scheme") is None
+    lines = load_budget_lines()
+    assert lines and all(ln["head_of_account"] for ln in lines)
+    assert budget_trend({"2016-17": 100, "2017-18": None, "2018-19": 150}) == {
+        "first_year": "2016-17", "last_year": "2018-19", "change_pct": 50.0, "direction": "rising"}
+
+
+def test_check_reports_the_linked_budget(client, app_module, index):
+    line = index.lines[0]
+    schemes = [{"scheme_name": line["name"], "benefits": "x", "criteria": {}},
+               {"scheme_name": "Zzqx Unmatched", "benefits": "y", "criteria": {}}]
+    client.post("/load_schemes", data={"paste_json": json.dumps(schemes)})
+    eligible = client.post("/check", json={}).get_json()["eligible_schemes"]
+    linked = {e["scheme_name"]: e.get("budget") for e in eligible}
+    assert linked[line["name"]]["head_of_account"] == line["head_of_account"]
+    assert linked["Zzqx Unmatched"] is None
+    assert len(app_module.budget_links) == 1
+
+    client.post("/load_schemes", data={"paste_json": json.dumps(schemes[1:]), "mode": "replace"})
+    assert app_module.budget_links == {}
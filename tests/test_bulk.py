@@ -0,0 +1,62 @@
+import os
+import zipfile
+
+import pytest
+
+
+def fake_reader(path, filename):
+    if filename.endswith("crash.txt"):
+        os._exit(1)  # kills the pool worker
+    return "text", ""
+
+
+@pytest.fixture
+def bulk(app_module, monkeypatch, tmp_path):
+    root = tmp_path / "root"
+    (root / "docs").mkdir(parents=True)
+    monkeypatch.setattr(app_module, "BULK_DIR_ROOT", str(root))
+    monkeypatch.setattr(app_module, "read_any_file", fake_reader)  # pool workers fork after this
+    if app_module._bulk_pool is not None:
+        app_module.discard_bulk_pool(app_module._bulk_pool)
+    yield root / "docs"
+    if app_module._bulk_pool is not None:
+        app_module.discard_bulk_pool(app_module._bulk_pool)
+
+
+def statuses(body):
+    return {e["file"]: e["status"] for e in body["files"]}
+
+
+def test_crashed_reader_marks_only_that_file(client, bulk):
+    for name in ("a.txt", "crash.txt", "b.txt"):
+        (bulk / name).write_text(name)
+    r = client.post("/load_schemes_bulk", data={"directory": "docs", "mode": "merge"})
+    assert r.status_code == 200
+    assert statuses(r.get_json()) == {"a.txt": "empty", "crash.txt": "error", "b.txt": "empty"}
+
+    # the pool was replaced, so the next request still works
+    (bulk / "crash.txt").unlink()
+    r = client.post("/load_schemes_bulk", data={"directory": "docs", "mode": "merge"})
+    assert statuses(r.get_json()) == {"a.txt": "empty", "b.txt": "empty"}
+
+
+def test_symlinks_out_of_root_are_skipped(client, bulk, tmp_path):
+    outside = tmp_path / "secret.txt"
+    outside.write_text("secret")
+    os.symlink(outside, bulk / "link.txt")
+    (bulk / "a.txt").write_text("a")
+    body = client.post("/load_schemes_bulk", data={"directory": "docs", "mode": "merge"}).get_json()
+    assert statuses(body) == {"a.txt": "empty", "link.txt": "skipped"}
+
+
+def test_file_limit_counts_accepted_files_and_caps_skipped_list(app_module, monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, "BULK_MAX_FILES", 2)
+    monkeypatch.setattr(app_module, "BULK_MAX_SKIPPED_LISTED", 1)
+    archive = tmp_path / "a.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name in ("x.exe", "y.exe", "1.txt", "2.txt", "3.txt"):
+            zf.writestr(name, "text")
+    entries = app_module.collect_zip(str(archive), str(tmp_path))
+    assert entries.accepted == 2
+    assert [e["file"] for e in entries if e["status"] == "pending"] == ["1.txt", "2.txt"]
+    assert entries.skipped == 3 and entries.unlisted == 2 and len(entries) == 3
@@ -0,0 +1,78 @@
+import io
+import json
+
+import pytest
+
+
+def names(app_module):
+    return sorted(s["scheme_name"] for s in app_module.schemes_db.values())
+
+
+@pytest.fixture
+def loaded(client, app_module):
+    schemes = [{"scheme_name": f"Scheme {i}", "criteria": {"age_min": 18 + i}} for i in range(3)]
+    r = client.post("/load_schemes", data={"paste_json": json.dumps(schemes)})
+    assert r.status_code == 200
+    return names(app_module)
+
+
+@pytest.mark.parametrize("body", [
+    '[{"scheme_name": "B1"}, {"scheme_name": oops}, {"scheme_name": "B3"}]',
+    '[{"scheme_name": "B1"}, {"scheme_name": "B2"',
+    '{"scheme_name": "B1"}',
+    '{"schemes": [{"scheme_name": "B1"}]}',
+    '[{"scheme_name": "B1"}, "note: see ] below", {"scheme_name": "B2"}]',
+    '[{"scheme_name": "B1"}, 7, {"scheme_name": "B2"}]',
+    '[{"scheme_name": "B1"}] {"scheme_name": "B2"}',
+])
+@pytest.mark.parametrize("mode", ["replace", "merge"])
+def test_bad_paste_json_changes_nothing(client, app_module, loaded, body, mode):
+    r = client.post("/load_schemes", data={"paste_json": body, "mode": mode})
+    assert r.status_code == 400
+    assert names(app_module) == loaded
+
+
+def test_bad_jsonl_body_changes_nothing(client, app_module, loaded):
+    body = '{"scheme_name": "B1"}\n{"scheme_name": oops}\n'
+    r = client.post("/load_schemes?mode=replace", data=body, content_type="application/x-ndjson")
+    assert r.status_code == 400
+    assert names(app_module) == loaded
+
+
+def test_json_file_must_be_an_array(client, app_module, loaded):
+    data = {"file": (io.BytesIO(b'{"scheme_name": "B1"}'), "catalogue.json")}
+    r = client.post("/load_schemes", data=data, content_type="multipart/form-data")
+    assert r.status_code == 400
+    assert names(app_module) == loaded
+
+
+def test_jsonl_file_replaces(client, app_module, loaded):
+    body = b'{"scheme_name": "B1"}\n{"scheme_name": "B2"}\n'
+    data = {"file": (io.BytesIO(body), "catalogue.jsonl")}
+    r = client.post("/load_schemes", data=data, content_type="multipart/form-data")
+    assert r.status_code == 200
+    assert r.get_json()["changes"]["deleted"] == 3
+    assert names(app_module) == ["B1", "B2"]
+
+
+def test_streamed_error_event_changes_nothing(client, app_module, loaded):
+    r = client.post("/load_schemes", data={"paste_json": '[{"scheme_name": "B1"}, {"x": oops}]', "stream": "1"})
+    events = r.get_data(as_text=True)
+    assert "event: error" in events and "event: done" not in events
+    assert names(app_module) == loaded
+
+
+def test_staged_schemes_are_spooled_not_held(client, app_module, monkeypatch):
+    held = []
+    real = app_module.iter_apply_catalogue
+
+    def spy(schemes, *args):
+        held.append(isinstance(schemes, list))
+        return real(schemes, *args)
+
+    monkeypatch.setattr(app_module, "iter_apply_catalogue", spy)
+    schemes = [{"scheme_name": f"S{i}", "criteria": {"age_min": i}} for i in range(30)]
+    r = client.post("/load_schemes", data={"paste_json": json.dumps(schemes) + "\n"})
+    assert r.status_code == 200 and held == [False]
+    assert names(app_module) == sorted(f"S{i}" for i in range(30))
+    assert app_module.schemes_db[app_module.scheme_id_for("S7")]["criteria"]["age_min"] == 7
@@ -0,0 +1,138 @@
+import json
+import random
+
+import pytest
+
+PROFILES = [
+    {"age": 30, "income": 120000, "bpl": True, "category": "SC", "gender": "Female", "residence_type": "Rural"},
+    {"age": 70, "income": 50000, "bpl": False, "category": "General", "gender": "Male", "residence_type": "Urban",
+     "disability": True, "disability_percentage": 60},
+    {"age": 19, "extra": {"widow": True, "occupation": "Farmer"}},
+    {},
+]
+
+
+def synthetic_catalogue(n: int, seed: int = 3) -> list:
+    """Schemes drawn from a few criteria so that many share predicates and whole signatures."""
+    rng = random.Random(seed)
+    names = ["Krishi Bhagya Yojane", "Organic Farming", "Widow Pension", "Scholarship", "Crop Insurance Scheme"]
+    out = []
+    for i in range(n):
+        criteria = {"age_min": rng.choice([18, 21, 60])}
+        if rng.random() < 0.5:
+            criteria["income_max"] = rng.choice([100000, 200000])
+        if rng.random() < 0.4:
+            criteria["category_allowed"] = rng.choice([["SC", "ST"], ["OBC"], ["General", "OBC"]])
+        if rng.random() < 0.3:
+            criteria["bpl_required"] = True
+        if rng.random() < 0.3:
+            criteria["widow_required"] = True
+        if rng.random() < 0.3:
+            criteria["occupation_allowed"] = rng.choice([["Farmer"], ["Weaver", "Farmer"]])
+        out.append({"scheme_name": f"{rng.choice(names)} {i}", "benefits": f"Benefit {i}", "criteria": criteria})
+    return out
+
+
+def reference_check(app, profile: dict) -> bytes:
+    """/check as it was before predicates were shared: every scheme evaluated on its own."""
+    user = app.build_user_profile(profile)
+    eligible, not_eligible, possible, missing_counter = [], [], [], {}
+    for scheme in list(app.schemes_db.values()):
+        status, missing, reasons = app.evaluate_scheme_with_reasons(user, scheme.get("criteria", {}) or {})
+        if status == "eligible":
+            entry = {"scheme_name": scheme.get("scheme_name", "Unknown Scheme"), "benefits": scheme.get("benefits", "")}
+            link = app.budget_links.get(scheme.get("scheme_id"))
+            if link is not None:
+                entry["budget"] = link
+            eligible.append(entry)
+        elif status == "not_eligible":
+            not_eligible.append({"scheme_name": scheme.get("scheme_name", "Unknown Scheme"),
+                                 "benefits": scheme.get("benefits", ""), "reasons": reasons})
+        else:
+            possible.append(scheme)
+            for k in missing:
+                if k not in app.BASIC_FIELDS:
+                    missing_counter[k] = missing_counter.get(k, 0) + 1
+    fields = sorted(missing_counter, key=lambda k: missing_counter[k], reverse=True)
+    with app.app.test_request_context():
+        return app.jsonify({
+            "eligible_schemes": eligible,
+            "not_eligible_schemes": not_eligible,
+            "missing_fields": fields,
+            "missing_questions": app.build_missing_questions(possible, fields),
+        }).get_data()
+
+
+@pytest.fixture
+def catalogue(client):
+    resp = client.post("/load_schemes", data={"paste_json": json.dumps(synthetic_catalogue(120))})
+    assert resp.status_code == 200
+    return client
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_default_response_is_byte_identical_to_per_scheme_evaluation(catalogue, app_module, profile):
+    assert catalogue.post("/check", json=profile).data == reference_check(app_module, profile)
+
+
+def test_shared_signatures_follow_catalogue_changes(catalogue, app_module):
+    schemes = synthetic_catalogue(120)
+    catalogue.post("/load_schemes", data={"paste_json": json.dumps(schemes[:40]), "mode": "replace"})
+    catalogue.post("/load_schemes", data={"paste_json": json.dumps(synthetic_catalogue(30, seed=9)), "mode": "merge"})
+    assert len(app_module.signature_refs) == len({tuple(p[0] for p in s) for s in app_module.scheme_signature.values()})
+    assert sum(app_module.signature_refs.values()) == len(app_module.schemes_db)
+    for profile in PROFILES:
+        assert catalogue.post("/check", json=profile).data == reference_check(app_module, profile)
+
+
+def pages(client, profile, query: str):
+    out, cursor = [], None
+    while True:
+        url = f"/check?{query}" + (f"&cursor={cursor}" if cursor else "")
+        body = client.post(url, json=profile).get_json()
+        out.append(body)
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return out
+
+
+def test_pages_cover_the_full_response_in_catalogue_order(catalogue):
+    profile = PROFILES[0]
+    full = catalogue.post("/check", json=profile).get_json()
+    got = pages(catalogue, profile, "limit=7")
+    assert all(len(p["eligible_schemes"]) + len(p["not_eligible_schemes"]) <= 7 for p in got)
+    assert [e for p in got for e in p["eligible_schemes"]] == full["eligible_schemes"]
+    assert [e for p in got for e in p["not_eligible_schemes"]] == full["not_eligible_schemes"]
+    assert all(p["missing_questions"] == full["missing_questions"] for p in got)
+
+    eligible_only = pages(catalogue, profile, "limit=5&sections=eligible")
+    assert [e for p in eligible_only for e in p["eligible_schemes"]] == full["eligible_schemes"]
+    assert all(set(p) == {"eligible_schemes", "next_cursor", "catalogue_version"} for p in eligible_only)
+
+
+def test_ids_view_uses_reason_codes(catalogue, app_module):
+    body = catalogue.post("/check?view=ids&sections=not_eligible", json={"age": 19, "income": 150000}).get_json()
+    assert body["not_eligible_schemes"]
+    for entry in body["not_eligible_schemes"]:
+        assert set(entry) == {"scheme_id", "reasons"}
+        criteria = app_module.schemes_db[entry["scheme_id"]]["criteria"]
+        assert entry["reasons"] and set(entry["reasons"]) <= set(criteria)
+
+
+def test_cursor_is_flagged_stale_after_a_catalogue_change(catalogue):
+    first = catalogue.post("/check?limit=5", json=PROFILES[0]).get_json()
+    assert "cursor_stale" not in first
+    catalogue.post("/load_schemes", data={"paste_json": json.dumps(synthetic_catalogue(3, seed=11)), "mode": "merge"})
+    second = catalogue.post(f"/check?limit=5&cursor={first['next_cursor']}", json=PROFILES[0]).get_json()
+    assert second["cursor_stale"] is True
+    assert second["catalogue_version"] > first["catalogue_version"]
+
+
+@pytest.mark.parametrize("query", ["view=bogus", "sections=eligible,nope", "limit=x", "cursor=%%%", "format=xml"])
+def test_bad_options_are_rejected(client, query):
+    assert client.post(f"/check?{query}", json={}).status_code == 400
+
+
+def test_msgpack_without_the_package_is_406(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "MSGPACK_OK", False)
+    assert client.post("/check", json={}, headers={"Accept": "application/msgpack"}).status_code == 406
@@ -0,0 +1,60 @@
+import json
+
+import compact_catalogue
+from compact_catalogue import CompactScheme, footprint, pool_sizes
+
+
+def scheme(sid, criteria):
+    return {"scheme_id": sid, "scheme_name": sid, "benefits": "", "criteria": criteria}
+
+
+def test_records_share_tuples_and_release_them():
+    before = pool_sizes()
+    a = CompactScheme.from_dict(scheme("a", {"age_min": 18, "zz_allowed": ["X", "Y"]}))
+    b = CompactScheme.from_dict(scheme("b", {"age_min": 60, "zz_allowed": ["X", "Y"]}))
+    assert a.criteria_keys is b.criteria_keys
+    assert a.criteria["zz_allowed"] is b.criteria["zz_allowed"]
+    assert pool_sizes() == {k: v + 1 for k, v in before.items()}
+    assert a.to_dict()["criteria"] == {"age_min": 18, "zz_allowed": ["X", "Y"]}
+
+    a.release()
+    assert compact_catalogue._typed(("X", "Y")) in compact_catalogue._allowed_pool
+    b.release()
+    assert compact_catalogue._typed(("X", "Y")) not in compact_catalogue._allowed_pool
+    assert pool_sizes() == before
+
+
+def test_footprint_sample_leaves_no_entries():
+    before = pool_sizes()
+    footprint([scheme(f"s{i}", {f"k{i}_allowed": [f"v{i}"]}) for i in range(20)])
+    assert pool_sizes() == before
+
+
+def test_catalogue_churn_does_not_grow_the_pools(app_module):
+    base = pool_sizes()
+    for round_ in range(20):
+        batch = [scheme(f"s{i}", {f"layout{round_}_{i}_allowed": [f"v{round_}"]}) for i in range(10)]
+        app_module.apply_catalogue(batch, "replace")
+        assert pool_sizes() == {k: v + 10 if k == "key_layouts" else v + 1 for k, v in base.items()}
+    app_module.apply_catalogue(batch, "merge")  # unchanged upserts release their new records
+    app_module.apply_catalogue([], "replace")
+    assert pool_sizes() == base
+
+
+def test_equal_values_of_different_types_are_not_merged():
+    recs = [CompactScheme.from_dict(scheme(f"t{i}", {"zz_allowed": [v], "zz_flag": v})) for i, v in enumerate([1, 1.0, True])]
+    assert [type(r.to_dict()["criteria"]["zz_allowed"][0]) for r in recs] == [int, float, bool]
+    assert recs[0] != CompactScheme.from_dict(scheme("t0", {"zz_allowed": [True], "zz_flag": 1}))
+    for r in recs:
+        r.release()
+
+
+def test_catalogue_keeps_value_types(client, app_module):
+    schemes = [scheme("a", {"zz_allowed": [1]}), scheme("b", {"zz_allowed": [True]})]
+    client.post("/load_schemes", data={"paste_json": json.dumps(schemes)})
+    assert app_module.schemes_db["b"].to_dict()["criteria"]["zz_allowed"] == [True]
+    assert type(app_module.schemes_db["a"]["criteria"]["zz_allowed"][0]) is int
+
+    schemes[0]["criteria"]["zz_allowed"] = [True]
+    r = client.post("/load_schemes", data={"paste_json": json.dumps(schemes), "mode": "merge"})
+    assert r.get_json()["changes"]["updated"] == 1
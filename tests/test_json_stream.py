@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from json_stream import ArrayObjectParser, BadElement, RecordStream
+
+OBJECTS = [
+    {"scheme_name": "Widow Pension", "criteria": {"age_min": 18}},
+    {"scheme_name": "Brace { in } name \"quoted\" \\ slash", "criteria": {"category_allowed": ["SC", "ST"]}},
+    {"scheme_name": "Nested", "criteria": {"x": [{"a": [1, 2]}, {}]}},
+]
+
+
+def chunked(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_array_parser_is_chunk_size_independent(size):
+    text = "Here you go:\n```json\n" + json.dumps(OBJECTS, indent=1) + "\n```"
+    parser = ArrayObjectParser()
+    out = [obj for chunk in chunked(text, size) for obj in parser.feed(chunk)]
+    assert out == OBJECTS
+    assert parser.done and parser.errors == 0
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 100000])
+def test_array_parser_skips_brackets_in_chatter(size):
+    text = "Here you go [list]: [ \n " + json.dumps(OBJECTS)[1:] + " and [1] more"
+    parser = ArrayObjectParser()
+    out = [obj for chunk in chunked(text, size) for obj in parser.feed(chunk)]
+    assert out == OBJECTS and parser.done
+
+    empty = ArrayObjectParser()
+    assert [o for chunk in chunked("None found [see notes]: [\n]", size) for o in empty.feed(chunk)] == []
+    assert empty.done
+
+
+def test_array_parser_skips_a_malformed_object():
+    text = '[{"scheme_name": "A"}, {"scheme_name": oops}, {"scheme_name": "C"}]'
+    parser = ArrayObjectParser()
+    out = [obj for chunk in chunked(text, 5) for obj in parser.feed(chunk)]
+    assert [o["scheme_name"] for o in out] == ["A", "C"]
+    assert parser.errors == 1
+
+
+@pytest.mark.parametrize("size", [1, 5, 4096])
+def test_record_stream_array_and_jsonl(size):
+    array = RecordStream(chunked(json.dumps(OBJECTS), size))
+    assert list(array) == OBJECTS and array.format == "json" and not array.truncated
+
+    lines = "\n".join(json.dumps(o) for o in OBJECTS) + "\n"
+    jsonl = RecordStream(chunked(lines, size), fmt="jsonl")
+    assert list(jsonl) == OBJECTS and jsonl.count == 3 and jsonl.errors == 0
+
+
+@pytest.mark.parametrize("text", ['{"scheme_name": "A"}', '{"schemes": [{"scheme_name": "A"}]}', '"A"'])
+def test_record_stream_json_must_be_an_array(text):
+    with pytest.raises(ValueError):
+        list(RecordStream([text]))
+
+
+def test_record_stream_flags_truncation():
+    records = RecordStream(chunked(json.dumps(OBJECTS)[:-30], 8))
+    list(records)
+    assert records.truncated
+
+
+@pytest.mark.parametrize("size", [1, 3, 4096])
+def test_bracket_inside_a_string_element_does_not_end_the_array(size):
+    text = '[{"scheme_name":"A"}, "note: see ] below", {"scheme_name":"B"}]'
+    records = RecordStream(chunked(text, size))
+    assert [o["scheme_name"] for o in records] == ["A", "B"]
+    assert records.errors == 1 and not records.truncated
+
+
+@pytest.mark.parametrize("size", [1, 2, 4096])
+def test_non_object_elements_are_counted(size):
+    text = '[{"a": 1}, 7, -1.5e3, true, null, "s\\"]", [1, {"x": 2}], {"b": 2}]'
+    parser = ArrayObjectParser(chatter=False, mark_errors=True)
+    out = [o for chunk in chunked(text, size) for o in parser.feed(chunk)] + parser.close()
+    assert [o for o in out if isinstance(o, dict)] == [{"a": 1}, {"b": 2}]
+    assert [o.reason for o in out if isinstance(o, BadElement)] == [
+        "expected an object, got '7'", "expected an object, got '-1.5e3'", "expected an object, got 'true'",
+        "expected an object, got 'null'", "expected an object, got a string", "expected an object, got list",
+    ]
+    assert parser.done and parser.errors == 6
+
+
+@pytest.mark.parametrize("size", [1, 4096])
+def test_array_starting_with_a_scalar_still_starts(size):
+    records = RecordStream(chunked('[1, {"scheme_name": "A"}]', size))
+    assert list(records) == [{"scheme_name": "A"}]
+    assert records.errors == 1 and not records.truncated
+
+
+def test_element_cut_off_at_the_end_is_an_error():
+    parser = ArrayObjectParser(chatter=False)
+    parser.feed('[{"a": 1}, "unterminated')
+    parser.close()
+    assert parser.errors == 1 and not parser.done
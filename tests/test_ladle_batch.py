@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+import ladle
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Batch mode with /check and translation replaced by local fakes."""
+    resp = {"eligible_schemes": [{"scheme_name": "Widow Pension", "benefits": "Rs 800"}]}
+    monkeypatch.setattr(ladle, "_check_for_notice", lambda base_url, session, payload: resp)
+    monkeypatch.setattr(ladle, "_translate_in_thread", lambda text: f"kn:{text}")
+
+
+def manifest(out_dir):
+    recs = {}
+    for line in (out_dir / "manifest.jsonl").read_text(encoding="utf-8").splitlines():
+        rec = json.loads(line)
+        recs[rec["id"]] = rec
+    return recs
+
+
+@pytest.mark.parametrize("name, text", [
+    ("profiles.jsonl", '{"id": "p1", "age": 30}\n{"id": "p2", "age": }\n"just a string"\n{"id": "p3", "age": 40}\n'),
+    ("profiles.json", '[\n{"id": "p1", "age": 30},\n{"id": "p2", "age": },\n{"id": "p3", "age": 40}\n]\n'),
+])
+def test_bad_rows_are_recorded_and_the_batch_resumes(offline, tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    out = tmp_path / "out"
+
+    totals = ladle.run_batch(str(path), str(out), "http://unused", audio=False)
+    recs = manifest(out)
+    assert recs["p1"]["status"] == recs["p3"]["status"] == "ok"
+    assert [r["stage"] for r in recs.values() if r["status"] == "error"] == ["parse"] * (totals["errors"])
+    assert totals["ok"] == 2 and totals["errors"] >= 1
+
+    again = ladle.run_batch(str(path), str(out), "http://unused", audio=False)
+    assert again["skipped"] == 2 and again["ok"] == 0
+
+
+def test_non_object_elements_get_parse_rows(offline, tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text('[7, {"id": "w", "age": 30}, 7, "a]b", {"id": "x", "age": 40}, [1], {"id": "y"}]', encoding="utf-8")
+    out = tmp_path / "out"
+
+    totals = ladle.run_batch(str(path), str(out), "http://unused", audio=False)
+    recs = manifest(out)
+    assert {pid for pid, r in recs.items() if r["status"] == "ok"} == {"w", "x", "y"}
+    errors = {pid: r for pid, r in recs.items() if r["status"] == "error"}
+    assert sorted(errors) == ["row1", "row3", "row4", "row6"]
+    assert all(r["stage"] == "parse" for r in errors.values())
+    assert errors["row4"]["error"] == "expected an object, got a string"
+    assert totals["ok"] == 3 and totals["errors"] == 4
+
+
+def test_a_file_that_is_not_an_array_is_refused(offline, tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text('{"id": "w"}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        ladle.run_batch(str(path), str(tmp_path / "out"), "http://unused", audio=False)
+
+
+def test_sanitised_ids_do_not_collide():
+    a, _ = ladle.profile_from_row({"id": "a/b"}, 1)
+    b, _ = ladle.profile_from_row({"id": "a_b"}, 2)
+    assert a != b and b == "a_b" and "/" not in a
+
+
+def test_only_bool_fields_take_y_and_n():
+    _pid, payload = ladle.profile_from_row({"gender": "N", "bpl": "y", "disability": "n", "age": "42", "widow": "yes"}, 1)
+    assert payload["gender"] == "N"
+    assert payload["bpl"] is True and payload["disability"] is False
+    assert payload["age"] == 42
+    assert payload["extra"] == {"widow": True}
@@ -0,0 +1,95 @@
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import ladle
+
+
+class FakeTranslator:
+    def __init__(self, barrier=None):
+        self.barrier = barrier
+
+    def translate(self, text, dest):
+        if self.barrier:
+            self.barrier.wait(timeout=5)  # raises BrokenBarrierError if calls are serialised
+        return SimpleNamespace(text=f"kn:{text}")
+
+
+def make_daemon(translators):
+    daemon = ladle.Daemon("http://unused", audio=False, translators=len(translators))
+    for t in translators:
+        daemon.translators.put(t)
+    return daemon
+
+
+@pytest.fixture
+def served(monkeypatch):
+    daemon = make_daemon([FakeTranslator()])
+    monkeypatch.setattr(ladle.DaemonHandler, "daemon", daemon)
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), ladle.DaemonHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield daemon, f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_unknown_route_is_404_and_handler_errors_are_502(served, monkeypatch):
+    daemon, url = served
+    assert requests.post(f"{url}/nope", json={}).status_code == 404
+
+    def broken_check(base_url, profile):
+        return {}["eligible_schemes"]  # a KeyError from inside the handler
+
+    monkeypatch.setattr(ladle, "call_check", broken_check)
+    resp = requests.post(f"{url}/check", json={"profile": {"age": 30}, "speak": False})
+    assert resp.status_code == 502
+    assert requests.post(f"{url}/translate", json={"text": "hello"}).json()["kannada"] == "kn:hello"
+
+    health = requests.get(f"{url}/health").json()
+    assert health["requests"] == 2 and health["errors"] == 1
+    assert health["translations"] == 1 and health["cached_translations"] == 1
+
+
+def test_uncached_translations_run_in_parallel():
+    barrier = threading.Barrier(2)
+    daemon = make_daemon([FakeTranslator(barrier), FakeTranslator(barrier)])
+    with ThreadPoolExecutor(2) as pool:
+        out = list(pool.map(daemon.translate, ["one", "two"]))
+    assert out == ["kn:one", "kn:two"]
+    assert daemon.translate("one") == "kn:one"
+    assert daemon.stats["translations"] == 2
+
+
+def test_translation_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(ladle, "TRANSLATION_CACHE", 3)
+    daemon = make_daemon([FakeTranslator()])
+    for text in ["a", "b", "c", "a", "d"]:
+        daemon.translate(text)
+    assert list(daemon.cache) == ["c", "a", "d"]
+
+
+@pytest.mark.parametrize("body", [b"[]", b'"x"', b"3", b"null"])
+def test_non_object_body_is_400(served, body):
+    _daemon, url = served
+    resp = requests.post(f"{url}/translate", data=body, headers={"Content-Type": "application/json"})
+    assert resp.status_code == 400
+    assert resp.json() == {"error": "request body must be a JSON object"}
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_bad_content_length_is_400(served, length):
+    daemon, url = served
+    host, port = url.rsplit("//", 1)[1].split(":")
+    with socket.create_connection((host, int(port)), timeout=5) as conn:
+        conn.sendall(f"POST /translate HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n{{}}".encode())
+        reply = conn.makefile("rb").read()
+    head, _, payload = reply.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 400")
+    assert json.loads(payload) == {"error": "invalid Content-Length"}
+    assert daemon.stats["errors"] == 0
@@ -0,0 +1,47 @@
+import json
+import random
+
+import requests
+
+import loadtest
+
+
+def test_load_json_upserts_a_fixed_set_of_ids(client):
+    seed = loadtest.synthetic_schemes(random.Random(1), 20)
+    assert [s["scheme_id"] for s in seed] == [f"loadtest-{k}" for k in range(20)]
+    client.post("/load_schemes", data={"paste_json": json.dumps(seed)})
+
+    rng = random.Random(2)
+    for _ in range(30):
+        batch = loadtest.synthetic_schemes(rng, loadtest.UPSERT_BATCH, 20)
+        assert len({s["scheme_id"] for s in batch}) == loadtest.UPSERT_BATCH
+        resp = client.post("/load_schemes", data={"paste_json": json.dumps(batch), "mode": "merge"})
+        assert resp.status_code == 200
+    assert resp.get_json()["schemes_count"] == 20
+
+
+class _Resp:
+    def __init__(self, resp):
+        self.ok = resp.status_code < 400
+        self.json = resp.get_json
+
+
+def test_failed_llm_call_is_reported(client, app_module, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise requests.ConnectionError("upstream down")
+
+    monkeypatch.setattr(app_module.requests, "post", refuse)
+    monkeypatch.setattr(app_module, "LOCAL_EXTRACTOR", False)
+    resp = client.post("/load_schemes", data={"paste_text": loadtest.SAMPLE_TEXT, "mode": "merge"})
+
+    assert resp.status_code == 200
+    assert "upstream down" in resp.get_json()["extraction"]["llm_error"]
+    assert loadtest.Driver.outcome("load_text", _Resp(resp)) == "llm_error"
+    assert app_module._extraction_summary()["llm_errors"] >= 1
+
+
+def test_summary_counts_llm_errors_separately():
+    summary = loadtest.summarize({"load_text": ([0.1, 0.2], 3, 2)}, 1.0)
+    assert summary["load_text"]["requests"] == 5
+    assert summary["load_text"]["errors"] == 3
+    assert summary["load_text"]["llm_errors"] == 2
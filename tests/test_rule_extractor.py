@@ -0,0 +1,47 @@
+import pytest
+
+from rule_extractor import extract_schemes_locally, extract_section
+
+
+@pytest.mark.parametrize("sentence, criteria", [
+    ("Applicants should be widows belonging to BPL families, aged 18 years and above.",
+     {"age_min": 18, "bpl_required": True, "widow_required": True}),
+    ("Annual income should not exceed Rs 2,00,000.", {"income_max": 200000}),
+    ("Applicants must be aged between 18 and 60 years.", {"age_min": 18, "age_max": 60}),
+    ("Open to SC/ST candidates only.", {"category_allowed": ["SC", "ST"]}),
+    ("Persons with 40% or more disability are eligible.", {"disability_percentage_min": 40, "disability_required": True}),
+    ("Family income must be below 2.5 lakh per annum.", {"income_max": 250000}),
+    ("Applicants must be residents of Karnataka.", {"state_allowed": ["Karnataka"]}),
+])
+def test_boilerplate_resolves_locally(sentence, criteria):
+    scheme, resolved = extract_section("Test Scheme", sentence)
+    assert resolved
+    assert scheme["criteria"] == criteria
+
+
+@pytest.mark.parametrize("sentence", [
+    "must not be BPL card holders",
+    "Farmers owning more than 10 acres are not eligible",
+    "Preference will be given to SC/ST candidates and women",
+    "Age relaxation of 5 years for SC/ST",
+    "This programme helps students from rural areas",
+    "Applicants must be residents of Karnataka and must not be government employees",
+    "Income should not be below Rs 1 lakh",
+    "Government employees are excluded",
+])
+def test_negated_soft_or_partial_sentences_go_to_llm(sentence):
+    _scheme, resolved = extract_section("Test Scheme", f"Applicants must be aged between 18 and 60 years.\n{sentence}")
+    assert not resolved
+
+
+def test_only_unresolved_sections_are_sent():
+    text = (
+        "Widow Pension Scheme\n"
+        "Applicants should be widows belonging to BPL families, aged 18 years and above.\n\n"
+        "Krishi Bhagya Yojane\n"
+        "Farmers owning more than 10 acres are not eligible.\n"
+    )
+    schemes, unresolved, stats = extract_schemes_locally(text)
+    assert [s["scheme_name"] for s in schemes] == ["Widow Pension Scheme"]
+    assert unresolved.startswith("Krishi Bhagya Yojane")
+    assert stats["sections_local"] == 1 and stats["sections_llm"] == 1
@@ -0,0 +1,61 @@
+import json
+
+
+def test_repeated_names_are_kept_apart(client, app_module):
+    schemes = [
+        {"criteria": {"age_min": 18}},
+        {"criteria": {"age_min": 60}},
+        {"criteria": {"age_min": 60}},
+        {"scheme_name": "Widow Pension", "criteria": {"widow_required": True}},
+    ]
+    r = client.post("/load_schemes", data={"paste_json": json.dumps(schemes)})
+    body = r.get_json()
+    assert r.status_code == 200
+    assert body["schemes_count"] == 4
+    assert body["duplicate_names"]["count"] == 2
+    assert {c["scheme_name"] for c in body["duplicate_names"]["schemes"]} == {"Unknown Scheme"}
+
+    # IDs are stable, so the same upload again changes nothing
+    r = client.post("/load_schemes", data={"paste_json": json.dumps(schemes), "mode": "merge"})
+    assert r.get_json()["changes"] == {"added": 0, "updated": 0, "deleted": 0, "unchanged": 4}
+
+
+def test_first_of_a_name_keeps_the_name_id(app_module):
+    batch = {}
+    first, second = app_module.normalize_schemes([{"scheme_name": "A"}, {"scheme_name": " a "}], batch)
+    assert first["scheme_id"] == app_module.scheme_id_for("A")
+    assert second["scheme_id"] != first["scheme_id"]
+    assert app_module.collision_summary(batch)["count"] == 1
+
+
+def test_explicit_ids_are_kept(app_module):
+    out = app_module.normalize_schemes([{"scheme_name": "A", "scheme_id": "x1"}, {"scheme_name": "A", "id": "x2"}])
+    assert [s["scheme_id"] for s in out] == ["x1", "x2"]
+
+
+def test_repeated_explicit_ids_are_refused(client, app_module):
+    client.post("/load_schemes", data={"paste_json": json.dumps([{"scheme_name": "Keep", "scheme_id": "k"}])})
+    dup = [{"scheme_name": "A", "scheme_id": "x1"}, {"scheme_name": "B", "scheme_id": "x1"}]
+    r = client.post("/load_schemes", data={"paste_json": json.dumps(dup), "mode": "replace"})
+    assert r.status_code == 400 and "x1" in r.get_json()["error"]
+    assert list(app_module.schemes_db) == ["k"]
+
+    batch = {}
+    out = app_module.normalize_schemes(dup, batch)
+    assert out[0]["scheme_id"] == "x1" and out[1]["scheme_id"] != "x1"
+    assert batch["duplicate_ids"] == ["x1"]
+
+
+def test_delete_by_name_removes_every_scheme_with_that_name(client, app_module):
+    schemes = [
+        {"scheme_name": "Widow Pension", "criteria": {"age_min": 18}},
+        {"scheme_name": "widow  pension", "criteria": {"age_min": 60}},
+        {"scheme_name": "Other", "scheme_id": "o1"},
+        {"scheme_name": "Third"},
+    ]
+    client.post("/load_schemes", data={"paste_json": json.dumps(schemes)})
+    assert len(app_module.schemes_db) == 4
+
+    r = client.post("/load_schemes", data={"paste_json": "[]", "mode": "merge", "delete": '["WIDOW PENSION", "o1"]'})
+    assert r.get_json()["changes"]["deleted"] == 3
+    assert [s["scheme_name"] for s in app_module.schemes_db.values()] == ["Third"]
@@ -0,0 +1,33 @@
+import json
+
+import scheme_search
+from scheme_search import SchemeSearchIndex
+
+
+def test_trailing_space_ends_the_last_word(client):
+    schemes = [{"scheme_name": "Widow Pension Scheme"}, {"scheme_name": "Pensioners Welfare"}]
+    client.post("/load_schemes", data={"paste_json": json.dumps(schemes)})
+
+    typing = client.get("/search", query_string={"q": "pens"}).get_json()
+    assert typing["completions"]
+    assert all(r["scheme_id"] for r in typing["results"])
+
+    done = client.get("/search", query_string={"q": "pens "}).get_json()
+    assert done["completions"] == []
+
+
+def test_champion_lists_survive_updates(monkeypatch):
+    monkeypatch.setattr(scheme_search, "LARGE_POSTINGS", 5)
+    monkeypatch.setattr(scheme_search, "CHAMPIONS", 4)
+    idx = SchemeSearchIndex()
+    for i in range(20):
+        idx.add(i, {"scheme_name": "pension", "benefits": " ".join(["filler"] * (i + 1))})
+    hits = [d for d, _ in idx.search("pension", limit=4)]
+    assert hits == [0, 1, 2, 3]
+    assert "pension" in idx.champions
+
+    idx.add(100, {"scheme_name": "pension pension"})  # beats every champion
+    idx.remove(0)
+    assert "pension" in idx.champions  # updated in place, not dropped
+    hits = [d for d, _ in idx.search("pension", limit=2)]
+    assert hits == [100, 1]
@@ -0,0 +1,83 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+import ward_export
+from ward_data import FISCAL_YEARS, iter_districts, iter_wards, js_round, years_between
+
+
+def rows_from(fmt: str, body: bytes) -> list:
+    text = body.decode("utf-8")
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(text)))
+    lines = [json.loads(line) for line in text.splitlines()]
+    if fmt == "jsonl":
+        return lines
+    schema = lines[0]["schema"]
+    rows = []
+    for group in lines[1:]:
+        cols = group["columns"]
+        rows += [{c: cols[c][i] for c in schema} for i in range(group["num_rows"])]
+    return rows
+
+
+def as_text(rows: list) -> list:
+    return [{k: str(v) for k, v in row.items()} for row in rows]
+
+
+def test_js_round_rounds_halves_up():
+    assert [js_round(x) for x in (0.5, 1.5, 2.5, -0.5, -1.5, 2.4999)] == [1, 2, 3, 0, -1, 2]
+
+
+@pytest.mark.parametrize("dataset", sorted(ward_export.DATASETS))
+def test_formats_carry_the_same_rows(client, dataset, monkeypatch):
+    monkeypatch.setattr(ward_export, "ROW_GROUP_SIZE", 7)
+    monkeypatch.setattr(ward_export, "CHUNK_BYTES", 512)
+    decoded = {}
+    for fmt in ward_export.FORMATS:
+        resp = client.get(f"/export/{dataset}?format={fmt}&from=2017-18&to=2019-20&compress=none")
+        assert resp.status_code == 200 and resp.is_streamed
+        decoded[fmt] = rows_from(fmt, resp.get_data())
+    assert decoded["jsonl"] == decoded["columnar"]
+    assert as_text(decoded["jsonl"]) == decoded["csv"]
+    assert {r["fiscal_year"] for r in decoded["jsonl"]} == {"2017-18", "2018-19", "2019-20"}
+
+
+def test_gzip_is_negotiated_and_decodes(client):
+    plain = client.get("/export/wards?format=jsonl&compress=none").get_data()
+    resp = client.get("/export/wards?format=jsonl", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resp.get_data()) == plain
+    assert "Content-Encoding" not in client.get("/export/wards?format=jsonl").headers
+
+
+def test_chunks_stay_bounded(monkeypatch):
+    monkeypatch.setattr(ward_export, "CHUNK_BYTES", 1024)
+    chunks = list(ward_export.export_stream("wards", "csv", FISCAL_YEARS))
+    assert len(chunks) > 1
+    assert max(len(c) for c in chunks) < 1024 + 512  # one row past the threshold at most
+
+
+def test_generator_is_reproducible_and_consistent():
+    year = FISCAL_YEARS[2]
+    assert list(iter_wards(year)) == list(iter_wards(year))
+    wards = list(iter_wards(year))
+    districts = list(iter_districts(year))
+    assert sum(d["wardCount"] for d in districts) == len(wards)
+    assert sum(d["totalAllocated"] for d in districts) == sum(w["fundAllocated"] for w in wards)
+    assert years_between("2018-19") == FISCAL_YEARS[2:]
+
+
+@pytest.mark.parametrize("url, code", [
+    ("/export/nope", 404),
+    ("/export/wards?format=parquet", 400),
+    ("/export/wards?from=1999-00", 400),
+    ("/export/wards?from=2020-21&to=2016-17", 400),
+    ("/export/wards?compress=brotli", 400),
+    ("/export/wards?compress=GZIP", 200),
+])
+def test_bad_requests(client, url, code):
+    assert client.get(url).status_code == code
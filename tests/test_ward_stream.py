@@ -0,0 +1,125 @@
+import json
+import socket
+import time
+
+import pytest
+
+import ward_stream
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    for name in ("wards", "districts", "counters"):
+        monkeypatch.setattr(ward_stream, name, {})
+    monkeypatch.setattr(ward_stream, "dirty", set())
+    monkeypatch.setattr(ward_stream, "stats", {"applied": 0, "skipped": 0, "commits": 0})
+    monkeypatch.setattr(ward_stream, "allow_new_wards", True)
+
+
+SEED_WARD = {
+    "id": "mysuru-ward-1", "name": "Mysuru Ward 1", "district": "Mysuru", "population": 1000,
+    "fundAllocated": 100, "fundUtilized": 50, "complaintCount": 10, "resolutionRate": 50, "slaScore": 70,
+    "schemes": [{"name": "Organic Farming", "allocated": 40, "utilized": 20}],
+}
+
+
+def test_snapshot_keeps_ward_schemes(tmp_path):
+    ward_stream.add_ward(SEED_WARD)
+    assert ward_stream.apply_event({"type": "disbursement", "ward_id": "mysuru-ward-1", "amount": 5, "scheme": "Organic Farming"})
+    out = tmp_path / "live.json"
+    ward_stream.commit(str(out))
+    ward = json.loads(out.read_text())["districts"][0]["wards"][0]
+    assert ward["schemes"] == [{"name": "Organic Farming", "allocated": 40, "utilized": 25}]
+    assert ward["fundUtilized"] == 55
+
+
+def test_unknown_wards_are_bounded(monkeypatch):
+    monkeypatch.setattr(ward_stream, "MAX_WARDS", 2)
+    ev = {"type": "grievance_filed", "district": "Mysuru"}
+    assert not ward_stream.apply_event({"type": "grievance_filed", "ward_id": "no-district"})
+    assert ward_stream.apply_event(dict(ev, ward_id="w1"))
+    assert ward_stream.apply_event(dict(ev, ward_id="w2"))
+    assert not ward_stream.apply_event(dict(ev, ward_id="w3"))
+    assert ward_stream.apply_event(dict(ev, ward_id="w1"))
+    assert set(ward_stream.wards) == {"w1", "w2"}
+
+    monkeypatch.setattr(ward_stream, "allow_new_wards", False)
+    monkeypatch.setattr(ward_stream, "MAX_WARDS", 10)
+    assert not ward_stream.apply_event(dict(ev, ward_id="w4"))
+
+
+def test_tail_drops_overlong_lines_without_buffering(monkeypatch, tmp_path):
+    monkeypatch.setattr(ward_stream, "MAX_LINE_BYTES", 32)
+    path = tmp_path / "events.jsonl"
+    path.write_text('{"a": 1}\n' + "x" * 200 + "\n" + '{"b": 2}\n' + "y" * 100, encoding="utf-8")
+
+    reads = []
+    real_open = open
+
+    def spy_open(*args, **kwargs):
+        f = real_open(*args, **kwargs)
+        real_readline = f.readline
+
+        class Spy:
+            def __getattr__(self, name):
+                return getattr(f, name)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return f.__exit__(*exc)
+
+            def readline(self, size=-1):
+                line = real_readline(size)
+                reads.append(len(line))
+                return line
+
+        return Spy()
+
+    monkeypatch.setattr(ward_stream, "open", spy_open, raising=False)
+    lines = list(ward_stream.tail_jsonl(str(path), follow=False))
+    assert lines == ['{"a": 1}\n', '{"b": 2}\n']
+    assert max(reads) <= 33
+
+
+def test_rounding_matches_math_round():
+    w = ward_stream.add_ward({"id": "w", "district": "D", "fundAllocated": 8, "fundUtilized": 1,
+                              "complaintCount": 0, "slaScore": 0})
+    assert w["utilizationRate"] == 13  # 12.5 rounds up, not to the even 12
+    assert ward_stream.districts["D"]["avgGovernanceScore"] == 5
+
+
+def test_negative_amounts_are_rejected():
+    ward_stream.add_ward(SEED_WARD)
+    assert not ward_stream.apply_event({"type": "allocation", "ward_id": "mysuru-ward-1", "amount": -50})
+    assert not ward_stream.apply_event({"type": "disbursement", "ward_id": "mysuru-ward-1", "amount": "-1"})
+    assert ward_stream.wards["mysuru-ward-1"]["fundAllocated"] == 100
+    assert ward_stream.districts["Mysuru"]["totalUtilized"] == 50
+
+
+def test_socket_drops_the_whole_overlong_line(monkeypatch):
+    monkeypatch.setattr(ward_stream, "MAX_LINE_BYTES", 32)
+    monkeypatch.setattr(ward_stream, "POLL_INTERVAL", 0.01)
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    lines = ward_stream.socket_lines("127.0.0.1", port)
+    assert next(lines) is None  # listening
+    got = []
+    with socket.create_connection(("127.0.0.1", port)) as conn:
+        conn.sendall(b'{"a": 1}\n' + b"x" * 40)
+        for _ in range(20):
+            line = next(lines)
+            if line is not None:
+                got.append(line)
+        conn.sendall(b'TAIL}\n{"b": 2}\n')
+        deadline = time.monotonic() + 5
+        while len(got) < 2 and time.monotonic() < deadline:
+            line = next(lines)
+            if line is not None:
+                got.append(line)
+    lines.close()
+    assert got == ['{"a": 1}', '{"b": 2}']
@@ -0,0 +1,141 @@
+import math
+
+# Python port of the ward generator in src/data/syntheticData.ts, so server-side
+# tools see the same districts, budget lines and scoring as the dashboard.
+
+DISTRICTS = [
+    {"name": "Bengaluru Urban", "population": 9621551, "wards": 8},
+    {"name": "Mysuru", "population": 3001127, "wards": 6},
+    {"name": "Belagavi", "population": 4779661, "wards": 6},
+    {"name": "Kalaburagi", "population": 2564892, "wards": 5},
+    {"name": "Dakshina Kannada", "population": 2089649, "wards": 5},
+    {"name": "Tumakuru", "population": 2678980, "wards": 5},
+    {"name": "Ballari", "population": 2532383, "wards": 5},
+    {"name": "Raichur", "population": 1924773, "wards": 4},
+    {"name": "Dharwad", "population": 1846993, "wards": 4},
+    {"name": "Shivamogga", "population": 1752753, "wards": 4},
+    {"name": "Haveri", "population": 1598506, "wards": 4},
+    {"name": "Chitradurga", "population": 1660378, "wards": 4},
+]
+
+BUDGET_SCHEMES = [
+    {"name": "Directorate of Agriculture", "code": "2401_00_001_1_01", "budgets": {"2016-17": 2486, "2017-18": 6011, "2018-19": 5507, "2019-20": 6217, "2020-21": 7302}},
+    {"name": "Krishi Bhagya Yojane", "code": "2401_00_102_0_27", "budgets": {"2016-17": 20000, "2017-18": 60000, "2018-19": 50000, "2019-20": 25000, "2020-21": 4000}},
+    {"name": "Supply of Seeds & Inputs", "code": "2401_00_103_0_15", "budgets": {"2016-17": 69780, "2017-18": 72359, "2018-19": 61530, "2019-20": 62823, "2020-21": 52103}},
+    {"name": "Organic Farming", "code": "2401_00_104_0_12", "budgets": {"2016-17": 5657, "2017-18": 4000, "2018-19": 10000, "2019-20": 8700, "2020-21": 4850}},
+    {"name": "Crop Insurance Scheme", "code": "2401_00_110_0_07", "budgets": {"2016-17": 67538, "2017-18": 84511, "2018-19": 84511, "2019-20": 84500, "2020-21": 90000}},
+    {"name": "PM Kisan Samman Nidhi", "code": "2401_00_800_0_05", "budgets": {"2016-17": 0, "2017-18": 0, "2018-19": 0, "2019-20": 0, "2020-21": 260000}},
+    {"name": "Farmer Support Schemes", "code": "2401_00_102_0_28", "budgets": {"2016-17": 10000, "2017-18": 7270, "2018-19": 10000, "2019-20": 24119, "2020-21": 1188}},
+    {"name": "Agriculture Training & Extension", "code": "2401_00_109_0_21", "budgets": {"2016-17": 8712, "2017-18": 9870, "2018-19": 7264, "2019-20": 5402, "2020-21": 5433}},
+]
+
+FISCAL_YEARS = ["2016-17", "2017-18", "2018-19", "2019-20", "2020-21"]
+
+
+# -----------------------
+# Helpers
+# -----------------------
+def js_round(x: float) -> int:
+    """Math.round semantics (halves round up), unlike Python's banker's round."""
+    return math.floor(x + 0.5)
+
+def seeded_random(seed: int):
+    s = seed
+
+    def rand():
+        nonlocal s
+        s = (s * 16807) % 2147483647
+        return (s - 1) / 2147483646
+
+    return rand
+
+def governance_score(utilization_rate: int, sla_score: int, resolution_rate: int) -> int:
+    return js_round(0.4 * utilization_rate + 0.3 * sla_score + 0.3 * resolution_rate)
+
+def risk_level(score: int) -> str:
+    if score >= 80:
+        return "green"
+    if score >= 60:
+        return "yellow"
+    return "red"
+
+def years_between(start: str = None, end: str = None) -> list:
+    """Inclusive fiscal-year range; unknown bounds raise ValueError."""
+    lo = FISCAL_YEARS.index(start) if start else 0
+    hi = FISCAL_YEARS.index(end) if end else len(FISCAL_YEARS) - 1
+    return FISCAL_YEARS[lo:hi + 1]
+
+
+# -----------------------
+# Generators (one ward at a time)
+# -----------------------
+def iter_district_wards(year: str):
+    """
+    Yields (district, wards) per district for one fiscal year.
+
+    The TS generator shares one random stream across every call, so its output
+    depends on UI history; here each year gets its own stream, which keeps
+    exports reproducible.
+    """
+    rand = seeded_random(42 + FISCAL_YEARS.index(year))
+    total_budget = sum(s["budgets"].get(year, 0) for s in BUDGET_SCHEMES)
+    district_share = total_budget / len(DISTRICTS)
+
+    for district in DISTRICTS:
+        avg_pop = district["population"] / district["wards"]
+        ward_pops = [js_round(avg_pop * (0.8 + rand() * 0.4)) for _ in range(district["wards"])]
+        total_pop = sum(ward_pops)
+        slug = "-".join(district["name"].split()).lower()
+
+        wards = []
+        for i, pop in enumerate(ward_pops):
+            pop_ratio = pop / total_pop
+            allocated = js_round(district_share * pop_ratio)
+
+            util_factor = 0.55 + rand() * 0.40
+            utilized = js_round(allocated * util_factor)
+            utilization_rate = js_round(utilized / allocated * 100) if allocated else 0
+
+            complaint_count = js_round(pop * (0.01 + rand() * 0.04))
+            resolution_rate = js_round((0.5 + rand() * 0.45) * 100)
+            sla_score = js_round((0.55 + rand() * 0.40) * 100)
+            score = governance_score(utilization_rate, sla_score, resolution_rate)
+
+            schemes = []
+            for s in BUDGET_SCHEMES[:5]:
+                alloc = js_round(s["budgets"].get(year, 0) / len(DISTRICTS) * pop_ratio)
+                util = js_round(alloc * util_factor * (0.9 + rand() * 0.2))
+                schemes.append({"name": s["name"], "allocated": alloc, "utilized": min(util, alloc)})
+
+            wards.append({
+                "id": f"{slug}-ward-{i + 1}",
+                "name": f"Ward {i + 1}",
+                "district": district["name"],
+                "population": pop,
+                "fundAllocated": allocated,
+                "fundUtilized": utilized,
+                "utilizationRate": utilization_rate,
+                "complaintCount": complaint_count,
+                "resolutionRate": resolution_rate,
+                "slaScore": sla_score,
+                "governanceScore": score,
+                "riskLevel": risk_level(score),
+                "schemes": schemes,
+            })
+
+        yield district, wards
+
+def iter_wards(year: str):
+    for _district, wards in iter_district_wards(year):
+        yield from wards
+
+def iter_districts(year: str):
+    for district, wards in iter_district_wards(year):
+        yield {
+            "name": district["name"],
+            "population": district["population"],
+            "totalAllocated": sum(w["fundAllocated"] for w in wards),
+            "totalUtilized": sum(w["fundUtilized"] for w in wards),
+            "wardCount": len(wards),
+            "avgGovernanceScore": js_round(sum(w["governanceScore"] for w in wards) / len(wards)),
+        }
@@ -0,0 +1,151 @@
+import io
+import csv
+import json
+import zlib
+
+from ward_data import iter_districts, iter_wards, js_round
+
+# ================== CONFIG ==================
+CHUNK_BYTES = 64 * 1024   # flush encoded output at roughly this size
+ROW_GROUP_SIZE = 1024     # rows per group in the columnar format
+# ===========================================
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "columnar": ("application/x-ndjson", "columnar.jsonl"),
+}
+
+
+# -----------------------
+# Datasets (rows are flat dicts, produced lazily per fiscal year)
+# -----------------------
+def _ward_rows(years):
+    for year in years:
+        for w in iter_wards(year):
+            yield {
+                "fiscal_year": year,
+                "ward_id": w["id"],
+                "ward_name": w["name"],
+                "district": w["district"],
+                "population": w["population"],
+                "fund_allocated": w["fundAllocated"],
+                "fund_utilized": w["fundUtilized"],
+                "utilization_rate": w["utilizationRate"],
+                "complaint_count": w["complaintCount"],
+                "resolution_rate": w["resolutionRate"],
+                "sla_score": w["slaScore"],
+                "governance_score": w["governanceScore"],
+                "risk_level": w["riskLevel"],
+            }
+
+def _grievance_rows(years):
+    for year in years:
+        for w in iter_wards(year):
+            yield {
+                "fiscal_year": year,
+                "ward_id": w["id"],
+                "district": w["district"],
+                "complaint_count": w["complaintCount"],
+                "resolution_rate": w["resolutionRate"],
+                "population": w["population"],
+                "complaint_ratio": f"{w['complaintCount'] / w['population']:.4f}",
+            }
+
+def _district_rows(years):
+    for year in years:
+        for d in iter_districts(year):
+            yield {
+                "fiscal_year": year,
+                "district": d["name"],
+                "population": d["population"],
+                "total_allocated": d["totalAllocated"],
+                "total_utilized": d["totalUtilized"],
+                "utilization_rate": js_round(d["totalUtilized"] / d["totalAllocated"] * 100) if d["totalAllocated"] else 0,
+                "ward_count": d["wardCount"],
+                "avg_governance_score": d["avgGovernanceScore"],
+            }
+
+DATASETS = {
+    "wards": (_ward_rows, [
+        "fiscal_year", "ward_id", "ward_name", "district", "population", "fund_allocated", "fund_utilized",
+        "utilization_rate", "complaint_count", "resolution_rate", "sla_score", "governance_score", "risk_level",
+    ]),
+    "grievances": (_grievance_rows, [
+        "fiscal_year", "ward_id", "district", "complaint_count", "resolution_rate", "population", "complaint_ratio",
+    ]),
+    "districts": (_district_rows, [
+        "fiscal_year", "district", "population", "total_allocated", "total_utilized", "utilization_rate",
+        "ward_count", "avg_governance_score",
+    ]),
+}
+
+
+# -----------------------
+# Encoders (each yields str chunks of about CHUNK_BYTES)
+# -----------------------
+def encode_csv(rows, columns):
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(columns)
+    for row in rows:
+        w.writerow([row.get(c) for c in columns])
+        if buf.tell() >= CHUNK_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+def encode_jsonl(rows, columns):
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps({c: row.get(c) for c in columns}, ensure_ascii=False) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts)
+
+def encode_columnar(rows, columns):
+    """
+    Parquet-style row groups without the pyarrow dependency: a schema line,
+    then one line per group holding a value array per column.
+    """
+    yield json.dumps({"schema": columns, "row_group_size": ROW_GROUP_SIZE}) + "\n"
+    group = {c: [] for c in columns}
+    n = index = 0
+    for row in rows:
+        for c in columns:
+            group[c].append(row.get(c))
+        n += 1
+        if n == ROW_GROUP_SIZE:
+            yield json.dumps({"row_group": index, "num_rows": n, "columns": group}, ensure_ascii=False) + "\n"
+            group = {c: [] for c in columns}
+            n = 0
+            index += 1
+    if n:
+        yield json.dumps({"row_group": index, "num_rows": n, "columns": group}, ensure_ascii=False) + "\n"
+
+ENCODERS = {"csv": encode_csv, "jsonl": encode_jsonl, "columnar": encode_columnar}
+COMPRESSIONS = ("gzip", "none")
+
+
+def gzip_stream(chunks):
+    comp = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for ch in chunks:
+        out = comp.compress(ch.encode("utf-8"))
+        if out:
+            yield out
+    yield comp.flush()
+
+
+def export_stream(dataset: str, fmt: str, years: list, gzip: bool = False):
+    """Lazily encode a dataset; memory stays at one chunk / row group."""
+    rows_fn, columns = DATASETS[dataset]
+    chunks = ENCODERS[fmt](rows_fn(years), columns)
+    if gzip:
+        return gzip_stream(chunks)
+    return (ch.encode("utf-8") for ch in chunks)
@@ -0,0 +1,372 @@
+import os
+import json
+import time
+import socket
+import argparse
+import selectors
+
+from ward_data import governance_score, js_round, risk_level
+
+# ================== CONFIG ==================
+BATCH_MAX_EVENTS = 500      # commit after this many applied events...
+BATCH_MAX_SECONDS = 2.0     # ...or after this long, whichever comes first
+POLL_INTERVAL = 0.25        # idle wait for tail/socket sources
+MAX_LINE_BYTES = 64 * 1024  # longer event lines are dropped, not buffered
+MAX_WARDS = 10000           # wards created from events stop here; later unknown ids are skipped
+MAX_WARD_SCHEMES = 50       # per-ward scheme entries an event can add
+DEFAULT_OUT = "live_wards.json"
+# ===========================================
+
+# Live state. Shapes follow Ward / DistrictData in src/data/syntheticData.ts,
+# so the snapshot can be dropped in wherever the dashboard reads ward data.
+wards = {}
+districts = {}
+counters = {}  # ward_id -> running tallies behind the derived rates
+dirty = set()
+stats = {"applied": 0, "skipped": 0, "commits": 0}
+allow_new_wards = True  # --known-wards-only turns this off
+
+
+# -----------------------
+# Helpers
+# -----------------------
+def _pct(num, den) -> int:
+    return js_round(num / den * 100) if den else 0
+
+def _amount(v):
+    try:
+        amount = float(v)
+    except (TypeError, ValueError):
+        return None
+    if amount != amount or amount in (float("inf"), float("-inf")):
+        return None
+    return int(amount) if amount.is_integer() else amount
+
+def _scheme(s: dict) -> dict:
+    return {
+        "name": str(s.get("name") or ""),
+        "allocated": _amount(s.get("allocated")) or 0,
+        "utilized": _amount(s.get("utilized")) or 0,
+    }
+
+
+# -----------------------
+# State setup
+# -----------------------
+def _empty_district(name: str) -> dict:
+    return {
+        "name": name,
+        "population": 0,
+        "totalAllocated": 0,
+        "totalUtilized": 0,
+        "wardCount": 0,
+        "avgGovernanceScore": 0,
+        "riskCounts": {"green": 0, "yellow": 0, "red": 0},
+        "_govSum": 0,
+    }
+
+def add_ward(ward: dict):
+    """Register a ward (Ward-shaped dict) and fold it into its district."""
+    wid = ward["id"]
+    w = {
+        "id": wid,
+        "name": ward.get("name") or wid,
+        "district": ward.get("district") or "Unknown",
+        "population": int(ward.get("population") or 0),
+        "fundAllocated": ward.get("fundAllocated") or 0,
+        "fundUtilized": ward.get("fundUtilized") or 0,
+        "complaintCount": int(ward.get("complaintCount") or 0),
+        "resolutionRate": int(ward.get("resolutionRate") or 0),
+        "slaScore": int(ward.get("slaScore") or 0),
+        "schemes": [_scheme(s) for s in ward.get("schemes") or [] if isinstance(s, dict)],
+    }
+    # Seeded rates become prior tallies: the SLA score counts as 100 observations.
+    counters[wid] = {
+        "resolved": js_round(w["complaintCount"] * w["resolutionRate"] / 100),
+        "sla_met": w["slaScore"],
+        "sla_total": 100 if ward.get("slaScore") is not None else 0,
+    }
+    _derive(w)
+    wards[wid] = w
+
+    d = districts.get(w["district"])
+    if d is None:
+        d = districts[w["district"]] = _empty_district(w["district"])
+    d["population"] += w["population"]
+    d["totalAllocated"] += w["fundAllocated"]
+    d["totalUtilized"] += w["fundUtilized"]
+    d["wardCount"] += 1
+    d["_govSum"] += w["governanceScore"]
+    d["riskCounts"][w["riskLevel"]] += 1
+    d["avgGovernanceScore"] = js_round(d["_govSum"] / d["wardCount"])
+    dirty.add(wid)
+    return w
+
+def load_seed(path: str) -> int:
+    """Seed state from a wards_YYYY.json export (list of DistrictData)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    n = 0
+    for d in data or []:
+        for w in d.get("wards", []) or []:
+            if isinstance(w, dict) and w.get("id"):
+                add_ward(w)
+                n += 1
+    return n
+
+
+# -----------------------
+# Incremental updates
+# -----------------------
+def _derive(w: dict):
+    c = counters[w["id"]]
+    w["utilizationRate"] = _pct(w["fundUtilized"], w["fundAllocated"])
+    w["resolutionRate"] = _pct(c["resolved"], w["complaintCount"])
+    w["slaScore"] = _pct(c["sla_met"], c["sla_total"])
+    w["governanceScore"] = governance_score(w["utilizationRate"], w["slaScore"], w["resolutionRate"])
+    w["riskLevel"] = risk_level(w["governanceScore"])
+
+def apply_event(ev: dict) -> bool:
+    """
+    Apply one event in O(1). Supported types:
+      allocation / disbursement   {"ward_id", "amount" >= 0}
+      grievance_filed             {"ward_id"}
+      grievance_resolved          {"ward_id", "within_sla": bool (optional)}
+    An allocation or disbursement with a "scheme" name also updates that
+    entry in the ward's schemes list. Unknown wards are created on first
+    sight when the event names a "district", up to MAX_WARDS; with
+    allow_new_wards off they are skipped.
+    """
+    kind = ev.get("type")
+    wid = ev.get("ward_id")
+    if not wid or kind not in ("allocation", "disbursement", "grievance_filed", "grievance_resolved"):
+        return False
+
+    w = wards.get(wid)
+    if w is None:
+        if not allow_new_wards or not ev.get("district") or len(wards) >= MAX_WARDS:
+            return False
+        w = add_ward({"id": wid, "name": ev.get("ward_name"), "district": ev.get("district")})
+    c = counters[wid]
+    d = districts[w["district"]]
+    old_alloc, old_util = w["fundAllocated"], w["fundUtilized"]
+    old_score, old_risk = w["governanceScore"], w["riskLevel"]
+
+    if kind in ("allocation", "disbursement"):
+        amount = _amount(ev.get("amount", 0))
+        if amount is None or amount < 0:
+            return False
+        field = "allocated" if kind == "allocation" else "utilized"
+        name = ev.get("scheme")
+        if name:
+            entry = next((s for s in w["schemes"] if s["name"] == name), None)
+            if entry is None:
+                if len(w["schemes"]) >= MAX_WARD_SCHEMES:
+                    return False
+                entry = {"name": str(name), "allocated": 0, "utilized": 0}
+                w["schemes"].append(entry)
+            entry[field] += amount
+        if kind == "allocation":
+            w["fundAllocated"] += amount
+        else:
+            w["fundUtilized"] += amount
+    elif kind == "grievance_filed":
+        w["complaintCount"] += 1
+    else:
+        c["resolved"] = min(c["resolved"] + 1, w["complaintCount"])
+        if "within_sla" in ev:
+            c["sla_total"] += 1
+            if ev["within_sla"]:
+                c["sla_met"] += 1
+
+    _derive(w)
+
+    d["totalAllocated"] += w["fundAllocated"] - old_alloc
+    d["totalUtilized"] += w["fundUtilized"] - old_util
+    d["_govSum"] += w["governanceScore"] - old_score
+    d["avgGovernanceScore"] = js_round(d["_govSum"] / d["wardCount"])
+    if w["riskLevel"] != old_risk:
+        d["riskCounts"][old_risk] -= 1
+        d["riskCounts"][w["riskLevel"]] += 1
+
+    dirty.add(wid)
+    return True
+
+
+# -----------------------
+# Micro-batched commits
+# -----------------------
+def build_snapshot() -> dict:
+    by_district = {}
+    for w in wards.values():
+        by_district.setdefault(w["district"], []).append(w)
+    out = []
+    for name, d in districts.items():
+        row = {k: v for k, v in d.items() if not k.startswith("_")}
+        row["wards"] = by_district.get(name, [])
+        out.append(row)
+    return {
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "events_applied": stats["applied"],
+        "districts": out,
+    }
+
+def commit(out_path: str):
+    """Atomically replace the snapshot file, only if something changed."""
+    if not dirty:
+        return
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(build_snapshot(), f)
+    os.replace(tmp_path, out_path)
+    stats["commits"] += 1
+    dirty.clear()
+
+
+# -----------------------
+# Event sources (yield raw lines; None means "idle tick")
+# -----------------------
+def tail_jsonl(path: str, follow: bool = True, from_end: bool = False):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        if from_end:
+            f.seek(0, os.SEEK_END)
+        buf = ""
+        discarding = False  # inside an over-long line; drop up to its newline
+        while True:
+            chunk = f.readline(MAX_LINE_BYTES + 1)
+            if not chunk:
+                if not follow:
+                    if buf.strip() and not discarding:
+                        yield buf
+                    return
+                yield None
+                time.sleep(POLL_INTERVAL)
+                continue
+            if discarding:
+                discarding = not chunk.endswith("\n")
+                continue
+            buf += chunk
+            if len(buf) > MAX_LINE_BYTES:
+                discarding = not buf.endswith("\n")
+                buf = ""
+                continue
+            if not buf.endswith("\n"):
+                # writer is mid-line; wait for the rest
+                continue
+            line, buf = buf, ""
+            yield line
+
+def socket_lines(host: str, port: int):
+    """Line-delimited JSON over TCP; any number of local producers."""
+    sel = selectors.DefaultSelector()
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    srv.bind((host, port))
+    srv.listen()
+    srv.setblocking(False)
+    sel.register(srv, selectors.EVENT_READ, data=None)
+    print(f"Listening for events on {host}:{port}")
+
+    try:
+        while True:
+            ready = sel.select(timeout=POLL_INTERVAL)
+            if not ready:
+                yield None
+                continue
+            for key, _ in ready:
+                if key.data is None:
+                    conn, _addr = srv.accept()
+                    conn.setblocking(False)
+                    sel.register(conn, selectors.EVENT_READ, data={"buf": b"", "discarding": False})
+                    continue
+                conn = key.fileobj
+                try:
+                    data = conn.recv(65536)
+                except (BlockingIOError, ConnectionError):
+                    data = b""
+                if not data:
+                    sel.unregister(conn)
+                    conn.close()
+                    continue
+                buf = key.data["buf"] + data
+                *lines, buf = buf.split(b"\n")
+                if key.data["discarding"] and lines:
+                    # the first piece ends the over-long line whose head was dropped
+                    lines.pop(0)
+                    key.data["discarding"] = False
+                if len(buf) > MAX_LINE_BYTES:
+                    buf = b""
+                    key.data["discarding"] = True
+                elif key.data["discarding"]:
+                    buf = b""
+                key.data["buf"] = buf
+                for line in lines:
+                    if len(line) <= MAX_LINE_BYTES:
+                        yield line.decode("utf-8", errors="ignore")
+    finally:
+        sel.close()
+        srv.close()
+
+
+# -----------------------
+# Pipeline
+# -----------------------
+def run(lines, out_path: str, batch_events: int = BATCH_MAX_EVENTS, batch_seconds: float = BATCH_MAX_SECONDS):
+    pending = 0
+    last_commit = time.monotonic()
+    try:
+        for line in lines:
+            if line is not None and line.strip():
+                try:
+                    ev = json.loads(line)
+                except ValueError:
+                    ev = None
+                if isinstance(ev, dict) and apply_event(ev):
+                    stats["applied"] += 1
+                    pending += 1
+                else:
+                    stats["skipped"] += 1
+
+            now = time.monotonic()
+            if pending >= batch_events or (dirty and now - last_commit >= batch_seconds):
+                commit(out_path)
+                pending = 0
+                last_commit = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        commit(out_path)
+    print(f"Applied {stats['applied']} events ({stats['skipped']} skipped), {stats['commits']} commits -> {out_path}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Stream disbursement/grievance events into live ward aggregates.")
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--tail", metavar="EVENTS.jsonl", help="follow a JSONL event file")
+    src.add_argument("--listen", metavar="HOST:PORT", help="accept line-delimited JSON on a local TCP socket")
+    p.add_argument("--seed", metavar="wards_YYYY.json", help="initial state from a dashboard export")
+    p.add_argument("--out", default=DEFAULT_OUT, help=f"snapshot path (default {DEFAULT_OUT})")
+    p.add_argument("--batch-events", type=int, default=BATCH_MAX_EVENTS)
+    p.add_argument("--batch-seconds", type=float, default=BATCH_MAX_SECONDS)
+    p.add_argument("--from-end", action="store_true", help="skip events already in the file")
+    p.add_argument("--no-follow", action="store_true", help="stop at end of file instead of waiting")
+    p.add_argument("--known-wards-only", action="store_true", help="skip events for wards not in --seed")
+    args = p.parse_args()
+
+    global allow_new_wards
+    allow_new_wards = not args.known_wards_only
+
+    if args.seed:
+        print(f"Seeded {load_seed(args.seed)} wards from {args.seed}")
+
+    if args.tail:
+        lines = tail_jsonl(args.tail, follow=not args.no_follow, from_end=args.from_end)
+    else:
+        host, _, port = args.listen.rpartition(":")
+        lines = socket_lines(host or "127.0.0.1", int(port))
+
+    run(lines, args.out, args.batch_events, args.batch_seconds)
+
+
+if __name__ == "__main__":
+    main()